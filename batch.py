@@ -0,0 +1,121 @@
+"""
+Chunked concurrent batch fetching untuk watchlist besar.
+
+Coin ids dipecah menjadi chunk dengan batas jumlah id dan panjang query
+string, lalu setiap chunk di-fetch paralel di thread pool. Hasil di-merge
+saat chunk selesai; chunk yang gagal tidak membatalkan chunk lain. Semua
+chunk berbagi satu deadline, termasuk chunk yang menunggu worker kosong.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def chunk_ids(coin_ids, max_ids=100, max_chars=1500):
+    """Pecah coin_ids menjadi list chunk dengan <= max_ids id dan <= max_chars karakter"""
+    chunks = []
+    current = []
+    current_chars = 0
+
+    for coin_id in coin_ids:
+        # +1 untuk koma pemisah di query string
+        added_chars = len(coin_id) + (1 if current else 0)
+        if current and (len(current) >= max_ids or current_chars + added_chars > max_chars):
+            chunks.append(current)
+            current = []
+            current_chars = 0
+            added_chars = len(coin_id)
+
+        current.append(coin_id)
+        current_chars += added_chars
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class ChunkedFetcher:
+    def __init__(self, fetch_chunk, max_workers=4, max_ids=100, max_chars=1500):
+        # fetch_chunk(list_of_ids, priority, deadline) -> dict coin_id -> data (boleh partial / kosong)
+        self.fetch_chunk = fetch_chunk
+        self.max_workers = max_workers
+        self.max_ids = max_ids
+        self.max_chars = max_chars
+
+        self.executor = None
+        self.executor_lock = threading.Lock()
+
+        # Statistik fetch terakhir
+        self.stats_lock = threading.Lock()
+        self.last_chunk_count = 0
+        self.last_failed_chunks = 0
+
+    def get_executor(self):
+        """Lazy init thread pool"""
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="price-fetch"
+                )
+            return self.executor
+
+    def fetch(self, coin_ids, priority=None, on_chunk=None, deadline=None):
+        """Fetch semua coin_ids per chunk secara paralel, return dict hasil merge
+
+        deadline (time.monotonic()) berlaku untuk seluruh fetch; chunk yang
+        baru dapat worker setelah deadline tidak dikirim.
+        """
+        chunks = chunk_ids(coin_ids, self.max_ids, self.max_chars)
+        self.last_chunk_count = len(chunks)
+        self.last_failed_chunks = 0
+
+        if not chunks:
+            return {}
+
+        # Satu chunk tidak perlu lewat thread pool
+        if len(chunks) == 1:
+            results = self.run_chunk(chunks[0], priority, deadline)
+            if on_chunk and results:
+                on_chunk(results)
+            return results
+
+        merged = {}
+        executor = self.get_executor()
+        futures = [executor.submit(self.run_chunk, chunk, priority, deadline) for chunk in chunks]
+
+        # Merge hasil sesuai urutan selesai, bukan urutan submit
+        for future in as_completed(futures):
+            results = future.result()
+            if results:
+                merged.update(results)
+                if on_chunk:
+                    on_chunk(results)
+
+        return merged
+
+    def run_chunk(self, chunk, priority=None, deadline=None):
+        """Fetch satu chunk, error dicatat dan tidak menggagalkan chunk lain"""
+        if deadline is not None and time.monotonic() >= deadline:
+            print(f"Skipping chunk of {len(chunk)} coins: refresh deadline passed")
+            results = None
+        else:
+            try:
+                results = self.fetch_chunk(chunk, priority, deadline)
+            except Exception as e:
+                print(f"Error fetching chunk of {len(chunk)} coins: {e}")
+                results = None
+
+        if not results:
+            with self.stats_lock:
+                self.last_failed_chunks += 1
+            return {}
+        return results
+
+    def shutdown(self):
+        """Stop thread pool"""
+        with self.executor_lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+                self.executor = None
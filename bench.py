@@ -0,0 +1,260 @@
+"""
+Benchmark suite untuk PriceEngine terhadap local stand-in CoinGecko API.
+
+Setiap ukuran watchlist dijalankan di subprocess terpisah (peak RSS tidak
+tercampur) dan diukur:
+
+- refresh latency end-to-end (cold cache, warm cache, dan revalidate:
+  cache expired tapi harga upstream belum berubah -> conditional 304)
+- API calls dan bytes dari server per refresh
+- CPU time engine per refresh (CPU fake server dikurangkan)
+- peak RSS
+- render cost: label + menu diff + status bar frame (tanpa rumps)
+
+Hasil ditulis sebagai JSON supaya bisa dibandingkan antar commit:
+
+    python3 bench.py --sizes 2,50,500,5000 --latency 0.05 --output bench.json
+    python3 bench.py --compare old.json new.json
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+DEFAULT_SIZES = (2, 50, 500, 5000)
+
+
+def peak_rss_kb():
+    """Peak RSS proses ini dalam KB (ru_maxrss = KB di Linux, bytes di macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def summarize(samples):
+    """Ringkasan sample dalam milidetik"""
+    ordered = sorted(samples)
+    return {
+        'n': len(ordered),
+        'mean_ms': statistics.mean(ordered) * 1000,
+        'p50_ms': ordered[len(ordered) // 2] * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+def measure_render(coin_ids, engine):
+    """Biaya satu render pass (label, menu diff, frames) setelah quote baru dan saat steady"""
+    from labels import LabelCache
+    from menu_model import KeyedMenu
+    from render import Frame
+
+    labels = LabelCache(engine.get_symbol_from_coin_id)
+    menu = KeyedMenu(lambda key, title: object(), lambda key, handle: None, lambda handle, title: None)
+
+    def render_pass():
+        price_data = engine.snapshot().quotes
+        single = len(coin_ids) == 1
+        entries = []
+        frames = {}
+        for coin_id in coin_ids:
+            coin_labels = labels.get(coin_id, price_data.get(coin_id))
+            entries.append((coin_id, coin_labels.menu))
+            data = price_data.get(coin_id)
+            if data is not None:
+                title = coin_labels.title_with_change if single else coin_labels.title
+                frames[coin_id] = Frame(title, data.trend)
+        menu.sync(entries)
+        return frames
+
+    start = time.perf_counter()
+    render_pass()
+    first = time.perf_counter() - start
+
+    steady = []
+    for _ in range(5):
+        start = time.perf_counter()
+        render_pass()
+        steady.append(time.perf_counter() - start)
+
+    return {
+        'first_ms': first * 1000,
+        'steady_ms': statistics.mean(steady) * 1000,
+        'menu': menu.stats(),
+        'labels_formatted': labels.formatted,
+    }
+
+
+def run_size(size, latency, payload_bytes, rounds):
+    """Benchmark satu ukuran watchlist (dijalankan di worker subprocess)"""
+    from engine import PriceEngine
+    from fake_coingecko import FakeCoinGeckoServer
+    from rate_limiter import PRIORITY_INTERACTIVE, TokenBucketLimiter
+
+    # Harga upstream tidak bergerak selama benchmark (revalidate = 304)
+    server = FakeCoinGeckoServer(latency=latency, payload_bytes=payload_bytes, tick_interval=3600).start()
+    workdir = tempfile.mkdtemp(prefix="cryptoticker-bench-")
+    coin_ids = [f"coin-{i}" for i in range(size)]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = PriceEngine(config_file=os.path.join(workdir, "config.json"))
+        engine.tick_log.root = os.path.join(workdir, "ticks")
+        engine.base_url = server.base_url
+        # Limiter tidak ikut diukur: yang dibandingkan adalah kerja engine per refresh
+        engine.rate_limiter = TokenBucketLimiter(calls_per_minute=1e9, burst=1e6,
+                                                 min_interval=0, interactive_reserve=0)
+        engine.coins = list(coin_ids)
+
+    def one_refresh(mode):
+        if mode != 'warm':
+            engine.price_cache.clear()
+        if mode == 'cold':
+            engine.validators.clear()
+        server.reset_stats()
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.refresh(priority=PRIORITY_INTERACTIVE)
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu_start
+        server_stats = server.stats()
+        return (elapsed, cpu - server_stats['cpu_seconds'], sum(server_stats['calls'].values()),
+                server_stats['bytes_sent'])
+
+    results = {}
+    for mode in ('cold', 'warm', 'revalidate'):
+        latencies, cpu_times, calls, sent = [], [], [], []
+        for _ in range(rounds):
+            elapsed, cpu, api_calls, bytes_sent = one_refresh(mode)
+            latencies.append(elapsed)
+            cpu_times.append(cpu)
+            calls.append(api_calls)
+            sent.append(bytes_sent)
+        results[mode] = {
+            'latency': summarize(latencies),
+            'cpu_ms': statistics.mean(cpu_times) * 1000,
+            'api_calls_per_refresh': statistics.mean(calls),
+            'bytes_per_refresh': statistics.mean(sent),
+        }
+
+    quotes = len(engine.snapshot().quotes)
+    render = measure_render(coin_ids, engine)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.stop()
+    server.stop()
+
+    return {
+        'coins': size,
+        'quotes': quotes,
+        'refresh': results,
+        'render': render,
+        'cache': engine.cache_stats(),
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+
+def compare(old_file, new_file):
+    """Print perbandingan dua file hasil benchmark"""
+    with open(old_file) as f:
+        old = {r['coins']: r for r in json.load(f)['results']}
+    with open(new_file) as f:
+        new = {r['coins']: r for r in json.load(f)['results']}
+
+    metrics = (
+        ('cold p50 ms', lambda r: r['refresh']['cold']['latency']['p50_ms']),
+        ('warm p50 ms', lambda r: r['refresh']['warm']['latency']['p50_ms']),
+        ('cold calls', lambda r: r['refresh']['cold']['api_calls_per_refresh']),
+        ('cold cpu ms', lambda r: r['refresh']['cold']['cpu_ms']),
+        ('reval cpu ms', lambda r: r['refresh'].get('revalidate', r['refresh']['cold'])['cpu_ms']),
+        ('reval bytes', lambda r: r['refresh'].get('revalidate', r['refresh']['cold']).get('bytes_per_refresh', 0)),
+        ('render ms', lambda r: r['render']['first_ms']),
+        ('peak rss kb', lambda r: r['peak_rss_kb']),
+    )
+    for size in sorted(set(old) & set(new)):
+        print(f"{size} coins")
+        for name, get in metrics:
+            before, after = get(old[size]), get(new[size])
+            change = (after - before) / before * 100 if before else 0.0
+            print(f"  {name:<12} {before:>10.1f} -> {after:>10.1f} ({change:+.1f}%)")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark PriceEngine dengan fake CoinGecko lokal")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Ukuran watchlist, dipisah koma")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latency fake server per request (detik)")
+    parser.add_argument("--payload-bytes", type=int, default=0, help="Padding per coin di response")
+    parser.add_argument("--rounds", type=int, default=5, help="Refresh per mode (cold/warm/revalidate)")
+    parser.add_argument("--output", default=None, help="Tulis JSON ke file (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Bandingkan dua file hasil")
+    parser.add_argument("--worker", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if args.worker is not None:
+        result = run_size(args.worker, args.latency, args.payload_bytes, args.rounds)
+        print(json.dumps(result))
+        return
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(',') if s):
+        print(f"Benchmarking {size} coins...", file=sys.stderr)
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", str(size),
+             "--latency", str(args.latency), "--payload-bytes", str(args.payload_bytes),
+             "--rounds", str(args.rounds)],
+            capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            print(completed.stderr, file=sys.stderr)
+            raise SystemExit(f"Benchmark worker for {size} coins failed")
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'latency': args.latency,
+            'payload_bytes': args.payload_bytes,
+            'rounds': args.rounds,
+            'timestamp': time.time(),
+        },
+        'results': results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Circuit breaker per API endpoint.
+
+closed     request jalan normal; failure beruntun dihitung
+open       request langsung gagal (fail fast) sampai reset_timeout lewat
+half_open  tepat satu probe request boleh jalan; sukses -> closed,
+           gagal -> open lagi dengan reset_timeout dua kali lipat (max)
+"""
+
+import threading
+import time
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=3, reset_timeout=30.0, max_reset_timeout=300.0,
+                 on_change=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.on_change = on_change  # callback(breaker, old_state, new_state)
+
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+        # Statistik
+        self.rejected = 0
+        self.opens = 0
+
+    def allow(self):
+        """True jika request boleh jalan; di half_open hanya untuk satu probe"""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                changed = self.transition(HALF_OPEN)
+            else:
+                changed = None
+            if self.probe_in_flight:
+                self.rejected += 1
+                allowed = False
+            else:
+                self.probe_in_flight = True
+                allowed = True
+        self.notify(changed)
+        return allowed
+
+    def is_probe(self):
+        with self.lock:
+            return self.state == HALF_OPEN and self.probe_in_flight
+
+    def release(self):
+        """Request yang di-allow batal dikirim (mis. deadline habis): probe boleh dicoba lagi"""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.probe_in_flight = False
+            self.reset_timeout = self.base_reset_timeout
+            changed = self.transition(CLOSED) if self.state != CLOSED else None
+        self.notify(changed)
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            changed = None
+            if self.state == HALF_OPEN:
+                # Probe gagal: buka lagi, tunggu lebih lama
+                self.probe_in_flight = False
+                self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+                changed = self.transition(OPEN)
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                changed = self.transition(OPEN)
+        self.notify(changed)
+
+    def transition(self, state):
+        # Dipanggil dengan self.lock dipegang
+        old = self.state
+        self.state = state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+            self.opens += 1
+        return (old, state)
+
+    def notify(self, changed):
+        if changed is not None and self.on_change is not None:
+            try:
+                self.on_change(self, *changed)
+            except Exception as e:
+                print(f"Error in circuit breaker callback: {e}")
+
+    def retry_in(self):
+        """Detik sampai probe berikutnya boleh jalan (0 jika tidak open)"""
+        with self.lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def stats(self):
+        with self.lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'opens': self.opens,
+                'reset_timeout': self.reset_timeout,
+            }
+
+
+class BreakerRegistry:
+    def __init__(self, on_change=None, **breaker_options):
+        self.on_change = on_change
+        self.breaker_options = breaker_options
+        self.breakers = {}
+        self.lock = threading.Lock()
+
+    def get(self, name):
+        """Breaker untuk endpoint, dibuat saat pertama dipakai"""
+        with self.lock:
+            breaker = self.breakers.get(name)
+            if breaker is None:
+                breaker = self.breakers[name] = CircuitBreaker(name, on_change=self.on_change,
+                                                               **self.breaker_options)
+            return breaker
+
+    def open_endpoints(self):
+        with self.lock:
+            breakers = list(self.breakers.values())
+        return [breaker.name for breaker in breakers if breaker.state != CLOSED]
+
+    def stats(self):
+        with self.lock:
+            breakers = list(self.breakers.values())
+        return {breaker.name: breaker.stats() for breaker in breakers}
@@ -0,0 +1,199 @@
+"""
+Bounded TTL/LRU cache dengan stale-while-revalidate.
+
+Entry yang sudah lewat TTL tetap bisa dilayani (dengan flag stale) selama
+masih dalam stale window, sementara caller menjadwalkan refresh di
+background. Entry paling lama tidak dipakai dibuang saat cache penuh.
+
+ValidatorCache menyimpan ETag / Last-Modified per URL (satu URL per chunk)
+beserta quote hasil parse terakhir, untuk conditional request: response
+304 berarti quote lama masih berlaku tanpa download dan parse ulang.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheEntry:
+    __slots__ = ('value', 'stored_at', 'expires_at', 'stale_until')
+
+    def __init__(self, value, stored_at, expires_at, stale_until):
+        self.value = value
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+
+class PriceCache:
+    def __init__(self, max_entries=1000, ttl=30.0, stale_ttl=600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl  # Default TTL fresh (detik)
+        self.stale_ttl = stale_ttl  # Berapa lama setelah expired masih boleh dilayani stale
+
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+
+    def set(self, key, value, ttl=None, stale_ttl=None):
+        """Simpan value dengan TTL dan stale window per-entry (default self.ttl / self.stale_ttl)"""
+        now = time.monotonic()
+        ttl = self.ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        entry = CacheEntry(value, now, now + ttl, now + ttl + stale_ttl)
+
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def lookup(self, key, allow_stale=True):
+        """Return (value, is_stale) atau (None, False) jika miss"""
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+
+            if now < entry.expires_at:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry.value, False
+
+            if allow_stale and now < entry.stale_until:
+                self.entries.move_to_end(key)
+                self.stale_hits += 1
+                return entry.value, True
+
+            # Terlalu lama, buang
+            if now >= entry.stale_until:
+                del self.entries[key]
+            self.misses += 1
+            return None, False
+
+    def get(self, key):
+        """Return value jika masih fresh, None jika expired atau tidak ada"""
+        value, _ = self.lookup(key, allow_stale=False)
+        return value
+
+    def peek(self, key):
+        """Return (value, age_seconds) tanpa mengubah LRU order dan counters"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None, None
+            return entry.value, time.monotonic() - entry.stored_at
+
+    def resize(self, max_entries):
+        """Ubah kapasitas; entry LRU dibuang jika kapasitas mengecil"""
+        with self.lock:
+            self.max_entries = max_entries
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """Hapus satu entry"""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """Hapus semua entry (counters tetap)"""
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def stats(self):
+        """Hit/miss/stale counters dan hit ratio"""
+        with self.lock:
+            lookups = self.hits + self.misses + self.stale_hits
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale_hits': self.stale_hits,
+                'evictions': self.evictions,
+                'hit_ratio': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
+
+
+class Validators:
+    __slots__ = ('etag', 'last_modified', 'quotes')
+
+    def __init__(self, etag, last_modified, quotes):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.quotes = quotes  # dict coin_id -> Quote dari response 200 terakhir
+
+    def headers(self):
+        """Header conditional request"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ValidatorCache:
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # url -> Validators
+        self.lock = threading.Lock()
+
+        # Counters
+        self.not_modified = 0
+        self.evictions = 0
+
+    def get(self, url):
+        with self.lock:
+            validators = self.entries.get(url)
+            if validators is not None:
+                self.entries.move_to_end(url)
+            return validators
+
+    def set(self, url, etag, last_modified, quotes):
+        """Simpan validator dari response 200; tanpa ETag/Last-Modified entry dibuang"""
+        with self.lock:
+            if not etag and not last_modified:
+                self.entries.pop(url, None)
+                return
+            self.entries[url] = Validators(etag, last_modified, quotes)
+            self.entries.move_to_end(url)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_not_modified(self):
+        with self.lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'not_modified': self.not_modified,
+                'evictions': self.evictions,
+            }
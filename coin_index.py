@@ -0,0 +1,313 @@
+"""
+Offline coin-id index untuk symbol resolution dan autocomplete.
+
+Index dibangun dari snapshot bulk /coins/list (plus ranking market cap
+dari /coins/markets), disimpan di disk dan di-refresh di background.
+Lookup symbol/nama memakai hash map, autocomplete memakai sorted keys
+(prefix, via bisect) dan trigram index (substring). Resolusi symbol yang
+pernah dipakai disimpan supaya konsisten antar run.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+
+
+UNRANKED = 10 ** 9
+
+
+def write_json_atomic(path, data):
+    """Tulis JSON ke file tmp lalu rename, supaya file tidak pernah setengah jadi"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def trigrams(text):
+    """Set trigram dari text (text pendek dipakai apa adanya)"""
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class IndexData:
+    """Struktur lookup immutable; diganti utuh saat index di-rebuild"""
+
+    def __init__(self, coins):
+        # coins: list of (id, symbol, name, rank)
+        self.coins = {}
+        self.by_symbol = {}
+        self.by_name = {}
+        key_ids = {}
+
+        for coin_id, symbol, name, rank in coins:
+            symbol = symbol.lower()
+            name_key = name.lower()
+            self.coins[coin_id] = (symbol, name, rank)
+            self.by_symbol.setdefault(symbol, []).append(coin_id)
+            self.by_name.setdefault(name_key, []).append(coin_id)
+            for key in (symbol, name_key, coin_id):
+                key_ids.setdefault(key, set()).add(coin_id)
+
+        rank_of = self.rank_of
+        for table in (self.by_symbol, self.by_name):
+            for ids in table.values():
+                ids.sort(key=rank_of)
+
+        self.key_ids = {key: sorted(ids, key=rank_of) for key, ids in key_ids.items()}
+        self.sorted_keys = sorted(self.key_ids)
+
+        self.trigram_keys = {}
+        for key in self.sorted_keys:
+            for gram in trigrams(key):
+                self.trigram_keys.setdefault(gram, set()).add(key)
+
+    def rank_of(self, coin_id):
+        entry = self.coins.get(coin_id)
+        return entry[2] if entry else UNRANKED
+
+    def prefix_keys(self, prefix):
+        """Semua keys yang diawali prefix (bisect di sorted_keys)"""
+        start = bisect.bisect_left(self.sorted_keys, prefix)
+        keys = []
+        for key in self.sorted_keys[start:]:
+            if not key.startswith(prefix):
+                break
+            keys.append(key)
+        return keys
+
+    def substring_keys(self, query):
+        """Keys yang mengandung query, kandidat dari intersection trigram"""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        candidates = None
+        for gram in grams:
+            keys = self.trigram_keys.get(gram)
+            if not keys:
+                return []
+            candidates = set(keys) if candidates is None else candidates & keys
+        return [key for key in candidates if query in key]
+
+
+class CoinIndex:
+    def __init__(self, index_file="coin_index.json", resolved_file="resolved_symbols.json",
+                 max_age=24 * 3600, market_pages=4):
+        self.index_file = index_file
+        self.resolved_file = resolved_file
+        self.max_age = max_age
+        self.market_pages = market_pages  # 250 coins per page untuk ranking market cap
+
+        self.data = IndexData([])
+        self.built_at = 0
+        self.resolved = {}
+        self.lock = threading.Lock()
+
+        self.refresh_thread = None
+        self.stop_event = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Load snapshot index dan resolusi lama dari disk"""
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r') as f:
+                    snapshot = json.load(f)
+                coins = [tuple(entry) for entry in snapshot.get('coins', []) if len(entry) == 4]
+                data = IndexData(coins)
+                with self.lock:
+                    self.data = data
+                    self.built_at = snapshot.get('built_at', 0)
+                print(f"Coin index loaded: {len(coins)} coins")
+        except Exception as e:
+            print(f"Error loading coin index: {e}")
+
+        try:
+            if os.path.exists(self.resolved_file):
+                with open(self.resolved_file, 'r') as f:
+                    resolved = json.load(f)
+                if isinstance(resolved, dict):
+                    with self.lock:
+                        self.resolved = resolved
+        except Exception as e:
+            print(f"Error loading resolved symbols: {e}")
+
+    def save_resolved(self):
+        """Simpan resolusi symbol ke disk"""
+        try:
+            with self.lock:
+                resolved = dict(self.resolved)
+            write_json_atomic(self.resolved_file, resolved)
+        except Exception as e:
+            print(f"Error saving resolved symbols: {e}")
+
+    # ------------------------------------------------------------------
+    # Build / refresh
+    # ------------------------------------------------------------------
+
+    def is_stale(self):
+        """True jika snapshot belum ada atau lebih tua dari max_age"""
+        return time.time() - self.built_at > self.max_age
+
+    def build(self, coins_list, markets=None):
+        """Build index dari response /coins/list dan (opsional) /coins/markets"""
+        ranks = {}
+        for market in markets or []:
+            if isinstance(market, dict) and market.get('id'):
+                rank = market.get('market_cap_rank')
+                if isinstance(rank, int) and rank > 0:
+                    ranks[market['id']] = rank
+
+        coins = []
+        for coin in coins_list:
+            if not isinstance(coin, dict):
+                continue
+            coin_id = coin.get('id')
+            symbol = coin.get('symbol')
+            name = coin.get('name')
+            if isinstance(coin_id, str) and isinstance(symbol, str) and isinstance(name, str):
+                coins.append((coin_id, symbol.lower(), name, ranks.get(coin_id, UNRANKED)))
+
+        if not coins:
+            print("Coin index build skipped: empty /coins/list response")
+            return False
+
+        data = IndexData(coins)
+        built_at = time.time()
+        with self.lock:
+            self.data = data
+            self.built_at = built_at
+
+        try:
+            write_json_atomic(self.index_file, {'built_at': built_at, 'coins': coins})
+        except Exception as e:
+            print(f"Error saving coin index: {e}")
+
+        print(f"Coin index built: {len(coins)} coins, {len(ranks)} ranked")
+        return True
+
+    def refresh(self, fetch_json, base_url):
+        """Download /coins/list dan ranking market cap, lalu rebuild index"""
+        coins_list = fetch_json(f"{base_url}/coins/list")
+        if not isinstance(coins_list, list):
+            return False
+
+        markets = []
+        for page in range(1, self.market_pages + 1):
+            page_data = fetch_json(
+                f"{base_url}/coins/markets?vs_currency=usd&order=market_cap_desc&per_page=250&page={page}"
+            )
+            if not isinstance(page_data, list) or not page_data:
+                break
+            markets.extend(page_data)
+
+        return self.build(coins_list, markets)
+
+    def start_background_refresh(self, fetch_json, base_url, on_change=None):
+        """Load index dari disk lalu refresh di background saat stale, cek ulang setiap jam
+
+        on_change() dipanggil (di thread refresh) setiap kali index selesai
+        di-load atau di-rebuild.
+        """
+        if self.refresh_thread is not None and self.refresh_thread.is_alive():
+            return
+        self.stop_event.clear()
+
+        def notify():
+            if on_change is None:
+                return
+            try:
+                on_change()
+            except Exception as e:
+                print(f"Error in coin index callback: {e}")
+
+        def refresh_loop():
+            # Load snapshot lama di thread ini supaya startup tidak tertahan
+            if not self.built_at:
+                self.load()
+                if self.built_at:
+                    notify()
+
+            while not self.stop_event.is_set():
+                if self.is_stale():
+                    try:
+                        if self.refresh(fetch_json, base_url):
+                            notify()
+                    except Exception as e:
+                        print(f"Error refreshing coin index: {e}")
+                self.stop_event.wait(3600)
+
+        self.refresh_thread = threading.Thread(target=refresh_loop, name="coin-index", daemon=True)
+        self.refresh_thread.start()
+
+    def stop(self):
+        """Stop background refresh"""
+        self.stop_event.set()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.data.coins)
+
+    def resolve(self, symbol):
+        """Symbol/nama/id -> coin id tanpa API call, None jika tidak dikenal"""
+        symbol = symbol.lower().strip()
+        data = self.data
+
+        resolved = self.resolved.get(symbol)
+        if resolved:
+            return resolved
+
+        # Symbol ambigu diselesaikan oleh ranking market cap (sudah terurut)
+        for table in (data.by_symbol, data.by_name):
+            ids = table.get(symbol)
+            if ids:
+                return ids[0]
+
+        if symbol in data.coins:
+            return symbol
+        return None
+
+    def remember(self, symbol, coin_id):
+        """Simpan resolusi symbol -> coin id supaya konsisten antar run"""
+        symbol = symbol.lower().strip()
+        with self.lock:
+            if self.resolved.get(symbol) == coin_id:
+                return
+            self.resolved[symbol] = coin_id
+        self.save_resolved()
+
+    def search(self, query, limit=10):
+        """Autocomplete: return list of (id, symbol, name) untuk prefix/substring query"""
+        query = query.lower().strip()
+        if not query:
+            return []
+
+        data = self.data
+        keys = data.prefix_keys(query)
+        if len(keys) < limit:
+            seen = set(keys)
+            keys.extend(key for key in data.substring_keys(query) if key not in seen)
+
+        ids = set()
+        for key in keys:
+            ids.update(data.key_ids[key])
+
+        # Exact symbol match dulu, lalu market cap rank
+        def sort_key(coin_id):
+            symbol, name, rank = data.coins[coin_id]
+            return (symbol != query, rank, len(name))
+
+        results = []
+        for coin_id in sorted(ids, key=sort_key)[:limit]:
+            symbol, name, _ = data.coins[coin_id]
+            results.append((coin_id, symbol.upper(), name))
+        return results
@@ -0,0 +1,1416 @@
+"""
+PriceEngine - core headless CryptoTicker tanpa dependency rumps.
+
+Bisa dipakai sebagai library (lihat CryptoTicker di main.py) atau
+dijalankan langsung sebagai daemon:
+
+    python3 engine.py
+"""
+
+import os
+import signal
+import threading
+import time
+import json
+
+from batch import ChunkedFetcher
+from breaker import BreakerRegistry, OPEN, STATE_VALUES
+from cache import PriceCache, ValidatorCache
+from coin_index import CoinIndex
+from fx import BASE_CURRENCY, FxTable, build_matrix, parse_exchange_rates
+from history import PriceHistory
+from labels import format_price
+from metrics import MetricsRegistry, MetricsServer, endpoint_for
+from profiler import Profiler, env_enabled as profiling_env_enabled
+from quotes import decode_simple_price
+from providers import CoinGeckoProvider, ExchangeTickerProvider, HedgedFetcher
+from rate_limiter import TokenBucketLimiter, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from refresh import RefreshCoordinator
+from retry import RetryBudget, backoff_delay, parse_retry_after
+from scheduler import Scheduler
+from state import SnapshotStore
+from streaming import StreamIngestor
+from lastprices import LastKnownPrices
+from ticklog import TickLog
+from transport import HttpTransport, COINGECKO_BASE_URL, import_requests
+
+
+DEFAULT_COINS = ["bitcoin", "ethereum"]
+
+
+class PriceEngine:
+    def __init__(self, config_file="config.json"):
+        # Watchlist & quotes: immutable snapshot, dibaca tanpa lock dan
+        # diganti dengan satu atomic swap oleh writer (copy-on-write)
+        self.store = SnapshotStore(DEFAULT_COINS)
+        self.refresh_interval = 300  # Default 5 minutes (300 seconds)
+        self.coin_cycle_interval = 5  # Disimpan di config, dipakai oleh UI
+        self.config_file = config_file
+        self.monitoring_active = False
+
+        # Subscribers: callback(event, payload)
+        self.subscribers = []
+        self.subscribers_lock = threading.Lock()
+
+        # Pooled keep-alive HTTP session, dipakai semua fetch path
+        self.transport = HttpTransport()
+        self.base_url = COINGECKO_BASE_URL
+
+        # Chunked concurrent fetch untuk watchlist besar; workers = ukuran
+        # connection pool supaya setiap chunk punya koneksi sendiri
+        self.chunked_fetcher = ChunkedFetcher(
+            self.fetch_quotes_chunk,
+            max_workers=self.transport.pool_maxsize,
+            max_ids=100,
+            max_chars=1500
+        )
+
+        # CoinGecko sebagai primary; secondary provider (exchange ticker API)
+        # dari config dipakai sebagai hedge saat primary lambat
+        self.hedged_fetcher = HedgedFetcher([CoinGeckoProvider(self.fetch_price_chunk)])
+        self.provider_configs = []
+
+        # Single-flight refresh: semua permintaan refresh lewat satu worker
+        self.refresher = RefreshCoordinator(self.run_refresh)
+
+        # Price history per coin (ring buffer, 1440 sample per coin)
+        self.history = PriceHistory(capacity=1440)
+
+        # Retry settings untuk API calls: jittered exponential backoff dari
+        # retry_delay sampai max_backoff, Retry-After dihormati, dan semua
+        # chunk, attempt dan FX call satu refresh selesai sebelum satu deadline
+        self.max_retries = 3
+        self.retry_delay = 3  # Base backoff (detik)
+        self.max_backoff = 30
+        self.max_call_seconds = 30  # Deadline per refresh, maksimal separuh polling interval
+        self.min_attempt_seconds = 1.0  # Retry hanya jika masih ada waktu untuk satu attempt
+
+        # Retry maksimal 20% dari request dalam 60 detik terakhir (minimal 3)
+        self.retry_budget = RetryBudget(ratio=0.2, min_retries=3, window=60)
+
+        # Rate limiting protection: token bucket 25 calls/menit, minimum 2 detik
+        # antar calls, interactive request didahulukan dari background polling
+        self.rate_limiter = TokenBucketLimiter(
+            calls_per_minute=25,
+            burst=5,
+            min_interval=2.0,
+            interactive_reserve=1
+        )
+        self.last_api_call = 0
+
+        # Circuit breaker per endpoint: setelah 3 failure beruntun request
+        # langsung gagal selama 30 detik, lalu satu probe menentukan recovery
+        self.breakers = BreakerRegistry(on_change=self.on_breaker_change,
+                                        failure_threshold=3, reset_timeout=30)
+
+        # Caching untuk mengurangi API calls
+        # Bounded LRU, fresh 30 detik, setelah itu boleh dilayani stale
+        # (stale-while-revalidate) sampai 10 menit. Kapasitas mengikuti watchlist
+        # (lihat price_cache_size) supaya watchlist besar tidak saling evict
+        self.cache_ttl = 30
+        self.price_cache = PriceCache(max_entries=self.price_cache_size(DEFAULT_COINS),
+                                      ttl=self.cache_ttl, stale_ttl=600)
+
+        # ETag / Last-Modified per chunk URL untuk conditional request (304)
+        self.validators = ValidatorCache(max_entries=512)
+
+        # Adaptive rate limiting
+        self.consecutive_rate_limits = 0
+        self.base_refresh_interval = 300
+
+        # Symbol to CoinGecko ID mapping untuk coins populer
+        self.symbol_to_id = {
+            "btc": "bitcoin",
+            "eth": "ethereum",
+            "bnb": "binancecoin",
+            "ada": "cardano",
+            "sol": "solana",
+            "doge": "dogecoin",
+            "matic": "matic-network",
+            "polygon": "matic-network",
+            "link": "chainlink",
+            "dot": "polkadot",
+            "ltc": "litecoin",
+            "bch": "bitcoin-cash",
+            "xlm": "stellar",
+            "xrp": "ripple",
+            "avax": "avalanche-2",
+            "atom": "cosmos",
+            "near": "near",
+            "ftm": "fantom",
+            "algo": "algorand",
+            "tron": "tron",
+            "trx": "tron",
+            "icp": "internet-computer",
+            "apt": "aptos",
+            "arb": "arbitrum",
+            "op": "optimism",
+            "ldo": "lido-dao",
+            "shib": "shiba-inu",
+            "uni": "uniswap",
+            "mkr": "maker",
+            "crv": "curve-dao-token",
+            "snx": "synthetix-network-token",
+            "comp": "compound-governance-token",
+            "sushi": "sushi"
+        }
+
+        # Canonical symbol untuk coin id yang punya lebih dari satu alias
+        self.canonical_symbols = {
+            "matic-network": "matic",
+            "tron": "trx",
+        }
+
+        # Reverse index coin id -> symbol, dibangun sekali
+        self.symbol_lock = threading.Lock()
+        self.id_to_symbol = {}
+        self.build_symbol_index()
+
+        # Offline coin-id index (disimpan di folder yang sama dengan config)
+        data_dir = os.path.dirname(config_file)
+        self.coin_index = CoinIndex(
+            index_file=os.path.join(data_dir, "coin_index.json"),
+            resolved_file=os.path.join(data_dir, "resolved_symbols.json")
+        )
+
+        # Tick log binary untuk history yang bertahan antar restart
+        self.tick_log = TickLog(root=os.path.join(data_dir, "ticks"))
+
+        # Last-known quotes untuk warm start; ditulis paling cepat
+        # persist_delay detik setelah quote berubah
+        self.last_prices = LastKnownPrices(os.path.join(data_dir, "last_prices.json"))
+        self.persist_delay = 10.0
+        self.restored_at = None  # Timestamp quote tertua yang di-restore (None = cold start)
+
+        # Display currency; harga di-fetch dalam USD dan dikonversi lokal
+        # pakai reference table /exchange_rates (di-cache 10 menit)
+        self.display_currency = BASE_CURRENCY
+        self.fx = FxTable(ttl=600)
+
+        # Optional push-based ingestion; polling tetap jadi fallback
+        self.stream_url = None
+        self.stream = None
+
+        # Satu scheduler (timer heap) untuk polling engine dan cycling UI
+        self.scheduler = Scheduler("price-scheduler")
+        self.stop_event = threading.Event()
+
+        # Runtime metrics (Prometheus text / JSON); server hanya jalan jika
+        # metrics_port atau metrics_socket di-set di config
+        self.metrics = MetricsRegistry()
+        self.metrics_port = None
+        self.metrics_socket = None
+        self.metrics_server = None
+        self.setup_metrics()
+
+        # Opt-in profiling (env CRYPTOTICKER_PROFILE=1, menu atau SIGUSR1)
+        self.profiler = Profiler(directory=os.path.join(data_dir, "profiles"))
+        if profiling_env_enabled():
+            self.set_profiling(True)
+
+    def setup_metrics(self):
+        """Daftarkan metric untuk fetch, cache, rate limit dan refresh"""
+        m = self.metrics
+        self.m_request_duration = m.histogram(
+            "http_request_duration_seconds", "API request latency per endpoint", ["endpoint"])
+        self.m_requests = m.counter(
+            "http_requests_total", "API responses per endpoint and status", ["endpoint", "status"])
+        self.m_response_bytes = m.counter(
+            "http_response_bytes_total", "Decoded response body bytes per endpoint", ["endpoint"])
+        self.m_unchanged_quotes = m.counter(
+            "unchanged_quotes_total", "Quotes reused because last_updated_at did not move")
+        self.m_retries = m.counter(
+            "http_retries_total", "API request retries per endpoint", ["endpoint"])
+        self.m_rate_limited = m.counter(
+            "http_rate_limited_total", "HTTP 429 responses per endpoint", ["endpoint"])
+        self.m_backoff_seconds = m.counter(
+            "backoff_sleep_seconds_total", "Seconds slept in retry and 429 backoff")
+        self.m_limiter_wait = m.counter(
+            "rate_limiter_wait_seconds_total", "Seconds spent waiting for a rate limiter token", ["priority"])
+        self.m_refresh_duration = m.histogram(
+            "refresh_duration_seconds", "Duration of one price refresh")
+        self.m_refreshes = m.counter(
+            "refreshes_total", "Price refreshes by result", ["result"])
+        self.m_coin_failures = m.counter(
+            "coin_fetch_failures_total", "Coins missing from a refresh", ["coin"])
+        self.m_circuit_state = m.gauge(
+            "circuit_state", "Circuit breaker state per endpoint (0 closed, 1 half-open, 2 open)", ["endpoint"])
+        self.m_circuit_transitions = m.counter(
+            "circuit_transitions_total", "Circuit breaker state changes", ["endpoint", "state"])
+        self.m_circuit_fast_failures = m.counter(
+            "circuit_fast_failures_total", "Requests rejected by an open circuit", ["endpoint"])
+        self.m_deadline_exceeded = m.counter(
+            "request_deadline_exceeded_total", "API calls given up to stay within their deadline", ["endpoint"])
+        self.m_retry_budget_denied = m.counter(
+            "retry_budget_denied_total", "Retries skipped because the retry budget was spent", ["endpoint"])
+
+        m.gauge("cache_hit_ratio", "Price cache hit ratio", fn=lambda: self.price_cache.stats()['hit_ratio'])
+        m.gauge("cache_entries", "Price cache entries", fn=lambda: self.price_cache.stats()['entries'])
+        m.gauge("refresh_interval_seconds", "Configured refresh interval after adaptive adjustment",
+                fn=lambda: self.refresh_interval)
+        m.gauge("effective_refresh_interval_seconds", "Polling interval actually scheduled",
+                fn=self.poll_interval)
+        m.gauge("consecutive_rate_limits", "Consecutive 429 responses", fn=lambda: self.consecutive_rate_limits)
+        m.gauge("retry_ratio", "Retries per request in the retry budget window",
+                fn=lambda: self.retry_budget.stats()['retry_ratio'])
+        m.gauge("watchlist_coins", "Coins in the watchlist", fn=lambda: len(self.coins))
+        m.counter("hedged_requests_total", "Requests hedged to a secondary provider",
+                  fn=lambda: self.hedged_fetcher.stats()['hedges'])
+        m.counter("hedge_cancelled_requests_total",
+                  "Losing hedged requests cancelled while queued in the rate limiter",
+                  fn=lambda: self.hedged_fetcher.stats()['cancelled'])
+        m.gauge("hedge_delay_seconds", "Current hedge delay (p95 of primary latency)",
+                fn=self.hedged_fetcher.hedge_delay)
+        m.gauge("scheduler_wakeups_per_minute", "Scheduler thread wakeups per minute",
+                fn=lambda: self.scheduler.stats()['wakeups_per_minute'])
+
+    def start_metrics_server(self, port=None, unix_socket=None):
+        """Expose /metrics dan /metrics.json di port lokal atau Unix socket"""
+        if self.metrics_server is not None:
+            return self.metrics_server
+        port = port if port is not None else self.metrics_port
+        unix_socket = unix_socket or self.metrics_socket
+        if port is None and not unix_socket:
+            return None
+        try:
+            self.metrics_server = MetricsServer(self.metrics, port=port or 0, unix_socket=unix_socket).start()
+            print(f"Metrics available at {self.metrics_server.address}")
+        except OSError as e:
+            print(f"Could not start metrics server: {e}")
+        return self.metrics_server
+
+    def set_profiling(self, enabled):
+        """Aktifkan/matikan profiling; snapshot tracemalloc dijadwalkan berkala"""
+        if enabled:
+            self.profiler.enable()
+            self.scheduler.schedule("profiler-snapshot", self.profiler.take_snapshot,
+                                    delay=self.profiler.snapshot_interval,
+                                    interval=self.profiler.snapshot_interval)
+            self.scheduler.start()
+        else:
+            self.scheduler.cancel("profiler-snapshot")
+            self.profiler.take_snapshot()
+            self.profiler.disable()
+        return self.profiler.enabled
+
+    def toggle_profiling(self):
+        return self.set_profiling(not self.profiler.enabled)
+
+    def on_profiling_signal(self, signum, frame):
+        # Jangan toggle di dalam signal frame: main thread bisa sedang memegang
+        # Profiler.lock (record_stage/finish_cycle) dan lock itu tidak reentrant
+        threading.Thread(target=self.toggle_profiling, name="profiler-toggle", daemon=True).start()
+
+    def install_profiling_signal(self):
+        """SIGUSR1 toggle profiling (hanya bisa dari main thread, tidak ada di Windows)"""
+        if not hasattr(signal, 'SIGUSR1'):
+            return False
+        try:
+            signal.signal(signal.SIGUSR1, self.on_profiling_signal)
+        except ValueError:
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Subscribe / publish
+    # ------------------------------------------------------------------
+
+    def subscribe(self, callback):
+        """Daftarkan callback(event, payload), return fungsi unsubscribe"""
+        with self.subscribers_lock:
+            self.subscribers.append(callback)
+
+        def unsubscribe():
+            with self.subscribers_lock:
+                if callback in self.subscribers:
+                    self.subscribers.remove(callback)
+
+        return unsubscribe
+
+    def emit(self, event, payload=None):
+        """Kirim event ke semua subscribers, error di subscriber tidak menghentikan engine"""
+        with self.subscribers_lock:
+            subscribers = list(self.subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(event, payload)
+            except Exception as e:
+                print(f"Error in subscriber for '{event}': {e}")
+
+    def notify(self, subtitle, message):
+        """Kirim notifikasi ke UI (jika ada) lewat event 'notify'"""
+        self.emit("notify", {"subtitle": subtitle, "message": message})
+
+    def snapshot(self):
+        """Snapshot (coins, quotes, index, version) saat ini: immutable, tanpa lock dan copy"""
+        return self.store.current
+
+    @property
+    def coins(self):
+        """Watchlist saat ini (tuple, read-only)"""
+        return self.store.current.coins
+
+    @coins.setter
+    def coins(self, coins):
+        self.price_cache.resize(self.price_cache_size(coins))
+        self.store.update(lambda snapshot: snapshot.replace(coins=coins))
+
+    @staticmethod
+    def price_cache_size(coins):
+        """Kapasitas price cache untuk watchlist: minimal 1000, 2x jumlah coin"""
+        return max(1000, 2 * len(coins))
+
+    @property
+    def price_data(self):
+        """Quote terakhir per coin watchlist (mapping read-only)"""
+        return self.store.current.quotes
+
+    @price_data.setter
+    def price_data(self, quotes):
+        self.store.update(lambda snapshot: snapshot.replace(quotes=quotes))
+
+    def cache_stats(self):
+        """Hit/miss/stale counters dari price cache"""
+        return self.price_cache.stats()
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+
+    def load_config(self):
+        """Load konfigurasi dari file dengan proper error handling"""
+        try:
+            if os.path.exists(self.config_file):
+                with open(self.config_file, 'r') as f:
+                    config = json.load(f)
+
+                    # Validate config structure
+                    if isinstance(config, dict):
+                        # Validate coins list
+                        coins = config.get('coins', list(DEFAULT_COINS))
+                        if isinstance(coins, list) and all(isinstance(coin, str) for coin in coins):
+                            self.coins = coins
+                        else:
+                            print("Invalid coins format in config, using defaults")
+                            self.coins = list(DEFAULT_COINS)
+
+                        # Validate refresh interval - dengan minimum 60 detik
+                        refresh_interval = config.get('refresh_interval', 300)
+                        if isinstance(refresh_interval, int) and refresh_interval >= 60:
+                            self.refresh_interval = refresh_interval
+                            self.base_refresh_interval = refresh_interval
+                        else:
+                            print("Invalid refresh interval in config, using default (300s)")
+                            self.refresh_interval = 300
+                            self.base_refresh_interval = 300
+
+                        # Optional streaming mode (WebSocket ticker url)
+                        stream_url = config.get('stream_url')
+                        if stream_url is None or (isinstance(stream_url, str) and stream_url.startswith(('ws://', 'wss://'))):
+                            self.stream_url = stream_url
+                        else:
+                            print("Invalid stream url in config, streaming disabled")
+                            self.stream_url = None
+
+                        # Optional secondary providers untuk hedged fetching
+                        providers = config.get('providers', [])
+                        if isinstance(providers, list) and all(
+                                isinstance(p, dict) and isinstance(p.get('url'), str) for p in providers):
+                            for provider in providers:
+                                self.add_provider(provider.get('name', provider['url']), provider['url'],
+                                                  provider.get('quote_asset', 'USDT'))
+                        else:
+                            print("Invalid providers in config, using CoinGecko only")
+
+                        # Display currency (usd, eur, idr, jpy, btc, ...)
+                        currency = config.get('currency', BASE_CURRENCY)
+                        if isinstance(currency, str) and currency.isalnum():
+                            self.display_currency = currency.lower()
+                        else:
+                            print("Invalid currency in config, using USD")
+                            self.display_currency = BASE_CURRENCY
+
+                        # Optional metrics endpoint (port lokal atau Unix socket)
+                        metrics_port = config.get('metrics_port')
+                        if metrics_port is None or (isinstance(metrics_port, int) and 0 <= metrics_port < 65536):
+                            self.metrics_port = metrics_port
+                        else:
+                            print("Invalid metrics port in config, metrics server disabled")
+                            self.metrics_port = None
+                        metrics_socket = config.get('metrics_socket')
+                        self.metrics_socket = metrics_socket if isinstance(metrics_socket, str) else None
+
+                        # Validate coin cycle interval
+                        cycle_interval = config.get('coin_cycle_interval', 5)
+                        if isinstance(cycle_interval, int) and cycle_interval > 0:
+                            self.coin_cycle_interval = cycle_interval
+                        else:
+                            print("Invalid cycle interval in config, using default (5s)")
+                            self.coin_cycle_interval = 5
+                    else:
+                        print("Invalid config format, using defaults")
+                        self.reset_to_defaults()
+            else:
+                print("Config file not found, using defaults")
+                self.reset_to_defaults()
+
+        except json.JSONDecodeError as e:
+            print(f"Config file corrupted: {e}, using defaults")
+            self.reset_to_defaults()
+        except Exception as e:
+            print(f"Error loading config: {e}, using defaults")
+            self.reset_to_defaults()
+
+        # Warm start: tampilkan quote terakhir sebelum network I/O pertama
+        self.restore_last_prices()
+
+    def reset_to_defaults(self):
+        """Reset ke konfigurasi default"""
+        self.store.update(lambda snapshot: snapshot.replace(coins=DEFAULT_COINS, quotes={}))
+
+        # Clear cache dan history
+        self.price_cache.clear()
+        self.price_cache.resize(self.price_cache_size(DEFAULT_COINS))
+        self.history.clear()
+        self.display_currency = BASE_CURRENCY
+
+        # Reset intervals
+        self.refresh_interval = 300
+        self.base_refresh_interval = 300
+        self.coin_cycle_interval = 5
+
+        # Reset rate limiting
+        self.consecutive_rate_limits = 0
+        self.scheduler.reschedule("poll")
+
+        self.emit("reset")
+
+    def save_config(self):
+        """Simpan konfigurasi ke file dengan proper error handling"""
+        try:
+            config = {
+                'coins': list(self.coins),
+                'refresh_interval': self.refresh_interval,
+                'coin_cycle_interval': self.coin_cycle_interval
+            }
+            if self.display_currency != BASE_CURRENCY:
+                config['currency'] = self.display_currency
+            if self.provider_configs:
+                config['providers'] = self.provider_configs
+            if self.stream_url:
+                config['stream_url'] = self.stream_url
+            if self.metrics_port is not None:
+                config['metrics_port'] = self.metrics_port
+            if self.metrics_socket:
+                config['metrics_socket'] = self.metrics_socket
+
+            with open(self.config_file, 'w') as f:
+                json.dump(config, f, indent=2)
+
+        except Exception as e:
+            print(f"Error saving config: {e}")
+
+    # ------------------------------------------------------------------
+    # API access
+    # ------------------------------------------------------------------
+
+    def check_rate_limit(self, priority=PRIORITY_BACKGROUND, timeout=None, cancel=None):
+        """Tunggu token dari rate limiter sesuai prioritas request, False jika timeout atau dibatalkan"""
+        start = time.monotonic()
+        acquired = self.rate_limiter.acquire(priority, timeout=timeout, cancel=cancel)
+        self.m_limiter_wait.inc(time.monotonic() - start,
+                                priority="interactive" if priority == PRIORITY_INTERACTIVE else "background")
+        if acquired:
+            self.last_api_call = time.time()
+        return acquired
+
+    def rate_budget(self):
+        """Sisa budget API dan statistik limiter, untuk perencanaan refresh"""
+        stats = self.rate_limiter.stats()
+        stats['remaining_background'] = self.rate_limiter.remaining(PRIORITY_BACKGROUND)
+        stats['remaining_interactive'] = self.rate_limiter.remaining(PRIORITY_INTERACTIVE)
+        return stats
+
+    def make_api_request(self, url, timeout=20, priority=PRIORITY_BACKGROUND, deadline=None, headers=None,
+                         attempt=None):
+        """Make API request with enhanced rate limiting and retry mechanism
+
+        Saat circuit endpoint open, langsung return None tanpa request
+        (dan tanpa memakai rate limit token); di half-open hanya satu probe
+        tanpa retry.
+
+        Tunggu rate limiter, semua attempt dan backoff harus selesai sebelum
+        deadline (time.monotonic(), default call_deadline() dari sekarang);
+        refresh memberi satu deadline yang sama untuk semua call-nya.
+        Retry yang tidak muat sebelum deadline atau melebihi retry budget
+        tidak dijalankan, sehingga caller dapat hasil atau None dalam waktu
+        terbatas.
+
+        Dengan headers conditional (If-None-Match / If-Modified-Since),
+        response 304 juga dianggap sukses dan dikembalikan ke caller.
+
+        attempt (providers.FetchAttempt) ditandai started setelah rate limit
+        token didapat; jika dibatalkan selama antri (hedge sudah menang),
+        return None tanpa memakai token.
+        """
+        endpoint = endpoint_for(url)
+        if deadline is None:
+            deadline = time.monotonic() + self.call_deadline()
+        elif time.monotonic() >= deadline:
+            print(f"Deadline passed before request to {endpoint}")
+            self.m_deadline_exceeded.inc(endpoint=endpoint)
+            return None
+
+        breaker = self.breakers.get(endpoint)
+        if not breaker.allow():
+            self.m_circuit_fast_failures.inc(endpoint=endpoint)
+            return None
+
+        if not self.check_rate_limit(priority, timeout=max(0.0, deadline - time.monotonic()), cancel=attempt):
+            breaker.release()
+            if attempt is not None and attempt.cancelled:
+                print(f"Queued request to {endpoint} cancelled, hedged request already answered")
+                return None
+            print(f"Rate limiter wait exceeds deadline for {endpoint}")
+            self.m_deadline_exceeded.inc(endpoint=endpoint)
+            return None
+        if attempt is not None and not attempt.mark_started():
+            # Dibatalkan tepat setelah token didapat
+            breaker.release()
+            return None
+
+        self.retry_budget.record_request()
+        attempts = 1 if breaker.is_probe() else self.max_retries
+        requests = import_requests()
+
+        for try_index in range(attempts):
+            retry_after = None
+            try:
+                start = time.perf_counter()
+                try:
+                    response = self.transport.get(url, timeout=timeout, headers=headers, deadline=deadline)
+                finally:
+                    self.m_request_duration.observe(time.perf_counter() - start, endpoint=endpoint)
+                self.m_requests.inc(endpoint=endpoint, status=str(response.status_code))
+                self.m_response_bytes.inc(len(response.content), endpoint=endpoint)
+
+                if response.status_code == 200 or (response.status_code == 304 and headers):
+                    # Reset consecutive rate limits on success
+                    self.consecutive_rate_limits = 0
+                    breaker.record_success()
+                    return response
+                elif response.status_code == 429:  # Rate limit
+                    breaker.record_failure()
+                    self.consecutive_rate_limits += 1
+                    self.m_rate_limited.inc(endpoint=endpoint)
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    print(f"Rate limited (attempt {try_index + 1}), Retry-After: {retry_after}")
+
+                    # Adaptive rate limiting - increase refresh interval
+                    if self.consecutive_rate_limits >= 2:
+                        self.adaptive_rate_limit_adjustment()
+
+                else:
+                    print(f"API returned status {response.status_code}")
+                    # 4xx selain 429 berarti endpoint masih hidup
+                    if response.status_code >= 500:
+                        breaker.record_failure()
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    else:
+                        breaker.record_success()
+                        return None
+
+            except requests.exceptions.Timeout:
+                print(f"Request timeout on attempt {try_index + 1}")
+                self.m_requests.inc(endpoint=endpoint, status="timeout")
+                breaker.record_failure()
+            except requests.exceptions.ConnectionError:
+                print(f"Connection error on attempt {try_index + 1}")
+                self.m_requests.inc(endpoint=endpoint, status="connection_error")
+                breaker.record_failure()
+            except requests.exceptions.RequestException as e:
+                print(f"Request error on attempt {try_index + 1}: {e}")
+                self.m_requests.inc(endpoint=endpoint, status="error")
+                breaker.record_failure()
+
+            # Circuit terbuka (oleh request ini atau request lain): stop retry
+            if breaker.state == OPEN or try_index == attempts - 1:
+                break
+
+            # Retry-After dari server menggantikan backoff sendiri
+            delay = retry_after if retry_after is not None else backoff_delay(
+                try_index, self.retry_delay, self.max_backoff)
+            if time.monotonic() + delay + self.min_attempt_seconds > deadline:
+                print(f"Giving up on {endpoint}: retry in {delay:.1f}s would pass the deadline")
+                self.m_deadline_exceeded.inc(endpoint=endpoint)
+                break
+            if not self.retry_budget.try_retry():
+                print(f"Giving up on {endpoint}: retry budget exhausted")
+                self.m_retry_budget_denied.inc(endpoint=endpoint)
+                break
+
+            self.m_retries.inc(endpoint=endpoint)
+            self.m_backoff_seconds.inc(delay)
+            time.sleep(delay)
+
+        return None
+
+    def call_deadline(self):
+        """Detik maksimal untuk satu refresh (semua chunk, retry dan FX), max separuh polling interval"""
+        return min(self.max_call_seconds, self.poll_interval() / 2)
+
+    def on_breaker_change(self, breaker, old_state, new_state):
+        """Catat perubahan state circuit di metrics dan publish event 'breaker'"""
+        print(f"Circuit {breaker.name}: {old_state} -> {new_state}")
+        self.m_circuit_state.set(STATE_VALUES[new_state], endpoint=breaker.name)
+        self.m_circuit_transitions.inc(endpoint=breaker.name, state=new_state)
+        self.emit("breaker", {
+            'endpoint': breaker.name,
+            'state': new_state,
+            'previous': old_state,
+            'retry_in': breaker.retry_in(),
+        })
+
+    def circuit_status(self):
+        """State circuit per endpoint yang pernah dipakai"""
+        return self.breakers.stats()
+
+    def adaptive_rate_limit_adjustment(self):
+        """Adjust refresh interval berdasarkan rate limiting"""
+        old_interval = self.refresh_interval
+        # Increase interval by 50% with minimum 2 minutes
+        self.refresh_interval = max(120, int(self.refresh_interval * 1.5))
+
+        if self.refresh_interval != old_interval:
+            print(f"Adaptive rate limiting: refresh interval increased to {self.refresh_interval}s")
+            self.scheduler.reschedule("poll")
+            self.notify(
+                "Rate Limit Protection",
+                f"Refresh interval increased to {self.refresh_interval}s to prevent rate limiting"
+            )
+
+    def get_cached_price(self, coin_id):
+        """Get price dari cache jika masih valid"""
+        return self.price_cache.get(coin_id)
+
+    def set_cached_price(self, coin_id, data):
+        """Set price ke cache"""
+        self.price_cache.set(coin_id, data, stale_ttl=self.cache_stale_ttl())
+
+    def cache_stale_ttl(self):
+        """Stale window cache (detik), minimal dua poll interval
+
+        Quote dari poll sebelumnya tetap bisa dilayani stale oleh fetch() dan
+        dipakai ulang saat last_updated_at tidak berubah.
+        """
+        return max(self.price_cache.stale_ttl, 2 * self.poll_interval())
+
+    def get_multiple_coin_prices(self, coin_ids, priority=PRIORITY_BACKGROUND, allow_stale=False,
+                                 deadline=None):
+        """Batch API call untuk multiple coins - OPTIMASI UTAMA
+
+        Dengan allow_stale=True, entry yang sudah expired langsung dilayani
+        sebagai Quote dengan stale=True dan refresh untuk coin tersebut dijadwalkan di
+        background (stale-while-revalidate).
+
+        Semua chunk berbagi satu deadline (default call_deadline() dari sekarang).
+        """
+        if not coin_ids:
+            return {}
+
+        # Check cache first
+        cached_data = {}
+        uncached_coins = []
+        stale_coins = []
+
+        for coin_id in coin_ids:
+            cached, is_stale = self.price_cache.lookup(coin_id, allow_stale=allow_stale)
+            if cached is None:
+                uncached_coins.append(coin_id)
+            elif is_stale:
+                cached_data[coin_id] = cached.as_stale()
+                stale_coins.append(coin_id)
+            else:
+                cached_data[coin_id] = cached
+
+        if stale_coins:
+            self.request_refresh(coins=stale_coins, priority=PRIORITY_BACKGROUND)
+
+        if not uncached_coins:
+            return cached_data
+
+        # Fetch per chunk secara paralel, chunk yang gagal tidak membatalkan yang lain
+        if deadline is None:
+            deadline = time.monotonic() + self.call_deadline()
+        with self.profiler.stage("fetch"):
+            fetched = self.chunked_fetcher.fetch(uncached_coins, priority, deadline=deadline)
+        cached_data.update(fetched)
+
+        # Persist quote baru ke tick log (append-only, binary)
+        if fetched:
+            with self.profiler.stage("tick_log"):
+                self.tick_log.write(fetched)
+
+        if self.chunked_fetcher.last_chunk_count > 1:
+            print(f"Batch fetch: {self.chunked_fetcher.last_chunk_count} chunks, "
+                  f"{self.chunked_fetcher.last_failed_chunks} failed")
+
+        return cached_data
+
+    def add_provider(self, name, base_url, quote_asset="USDT"):
+        """Tambah exchange ticker API sebagai secondary (hedge) provider"""
+        if any(p['name'] == name for p in self.provider_configs):
+            return False
+        self.hedged_fetcher.add_provider(ExchangeTickerProvider(
+            name, base_url, self.transport, self.known_symbol, quote_asset))
+        self.provider_configs.append({'name': name, 'url': base_url, 'quote_asset': quote_asset})
+        return True
+
+    def fetch_quotes_chunk(self, coin_ids, priority=PRIORITY_BACKGROUND, deadline=None):
+        """Fetch satu chunk lewat hedged providers; quote dari secondary ikut di-cache"""
+        results = self.hedged_fetcher.fetch(coin_ids, priority, deadline)
+        for coin_id, quote in results.items():
+            if quote.source not in (None, 'coingecko'):
+                self.set_cached_price(coin_id, quote)
+        return results
+
+    def fetch_price_chunk(self, coin_ids, priority=PRIORITY_BACKGROUND, deadline=None, attempt=None):
+        """Satu API call /simple/price untuk satu chunk coin ids
+
+        Request dikirim conditional dengan validator chunk sebelumnya; 304
+        berarti quote lama di-cache ulang tanpa download dan parse.
+        """
+        try:
+            # Urutan ids stabil supaya URL (dan validator-nya) sama antar poll
+            coins_param = ','.join(sorted(coin_ids))
+            url = (f"{self.base_url}/simple/price?ids={coins_param}&vs_currencies=usd"
+                   f"&include_24hr_change=true&include_last_updated_at=true")
+
+            validators = self.validators.get(url)
+            response = self.make_api_request(url, priority=priority, deadline=deadline,
+                                             headers=validators.headers() if validators else None,
+                                             attempt=attempt)
+            if not response:
+                return {}
+
+            if response.status_code == 304:
+                self.validators.record_not_modified()
+                now = time.time()
+                for coin_id, coin_info in validators.quotes.items():
+                    coin_info.revalidate(now)
+                    self.set_cached_price(coin_id, coin_info)
+                return dict(validators.quotes)
+
+            results = self.parse_price_response(response.content, coin_ids)
+            self.validators.set(url, response.headers.get('ETag'), response.headers.get('Last-Modified'), results)
+            return results
+
+        except Exception as e:
+            print(f"Error in batch price fetch: {e}")
+            return {}
+
+    def parse_price_response(self, payload, coin_ids):
+        """Decode + validasi body /simple/price (bytes), cache dan return dict coin_id -> Quote
+
+        Coin yang last_updated_at-nya belum bergerak memakai Quote object
+        lama, jadi label, history dan tick log tidak memproses ulang.
+        """
+        try:
+            quotes = decode_simple_price(payload, coin_ids)
+        except ValueError as e:
+            print(f"Invalid batch price response: {e}")
+            return {}
+
+        results = {}
+        for coin_id, quote in quotes.items():
+            # Upstream belum update sejak quote yang di-cache
+            if quote.last_updated_at is not None:
+                previous, _ = self.price_cache.peek(coin_id)
+                if (previous is not None and previous.last_updated_at == quote.last_updated_at
+                        and previous.current_price == quote.current_price):
+                    self.m_unchanged_quotes.inc()
+                    previous.revalidate(quote.timestamp)
+                    quote = previous
+
+            # Cache the result
+            self.set_cached_price(coin_id, quote)
+            results[coin_id] = quote
+
+        if len(results) < len(coin_ids):
+            missing = [coin_id for coin_id in coin_ids if coin_id not in results]
+            print(f"No valid data for {missing} in batch response")
+
+        return results
+
+    # ------------------------------------------------------------------
+    # Currencies
+    # ------------------------------------------------------------------
+
+    def coin_for_currency(self, code):
+        """Coin id untuk crypto currency code (btc -> bitcoin), None untuk fiat"""
+        return self.symbol_to_id.get(code)
+
+    def needs_fx_table(self):
+        """True jika display currency tidak bisa dihitung dari harga watchlist saja"""
+        currency = self.display_currency
+        if currency == BASE_CURRENCY:
+            return False
+        return self.coin_for_currency(currency) not in self.store.current
+
+    def refresh_fx_rates(self, priority=PRIORITY_BACKGROUND, deadline=None):
+        """Fetch reference table /exchange_rates (satu call untuk semua currency)"""
+        response = self.make_api_request(f"{self.base_url}/exchange_rates", priority=priority,
+                                         deadline=deadline)
+        if not response:
+            return False
+        try:
+            rates = parse_exchange_rates(response.json())
+        except ValueError as e:
+            print(f"Invalid exchange rates response: {e}")
+            return False
+        if not self.fx.update(rates):
+            print("Exchange rates response has no usable rates")
+            return False
+        return True
+
+    def quote_matrix(self, currencies=None):
+        """Harga watchlist dalam setiap currency (QuoteMatrix), dihitung lokal dari harga USD"""
+        if currencies is None:
+            currencies = self.fx.currencies()
+        usd_prices = {coin_id: quote.current_price for coin_id, quote in self.store.current.quotes.items()}
+        rates = self.fx.rates_for(currencies, usd_prices, self.coin_for_currency)
+        return build_matrix(usd_prices, rates)
+
+    def display_prices(self):
+        """(currency, dict coin_id -> harga) untuk display; fallback USD jika rate belum ada"""
+        currency = self.display_currency
+        if currency == BASE_CURRENCY:
+            return currency, None
+        prices = self.quote_matrix([currency]).column(currency)
+        if not prices:
+            return BASE_CURRENCY, None
+        return currency, prices
+
+    def set_currency(self, currency):
+        """Ganti display currency, fetch reference table jika perlu"""
+        self.display_currency = currency.lower()
+        self.save_config()
+        if self.needs_fx_table() and self.fx.is_stale():
+            self.request_refresh(priority=PRIORITY_INTERACTIVE)
+        self.emit("currency", self.display_currency)
+        return self.display_currency
+
+    def get_coin_price(self, coin_id):
+        """Fallback method untuk single coin - tetap ada untuk compatibility"""
+        batch_data = self.get_multiple_coin_prices([coin_id])
+        return batch_data.get(coin_id)
+
+    def fetch(self, coin_ids=None, priority=PRIORITY_INTERACTIVE, allow_stale=True):
+        """Fetch harga untuk coin_ids (default: watchlist) tanpa mengubah state engine
+
+        Quote yang expired dilayani langsung dengan stale=True sambil
+        direvalidasi di background. Hanya untuk pemakaian sebagai library:
+        UI dan polling memakai update_prices(), yang selalu minta quote fresh
+        (TTL 30 detik hanya menggabungkan refresh yang berdekatan).
+        """
+        if coin_ids is None:
+            coin_ids = self.coins
+        return self.get_multiple_coin_prices(coin_ids, priority, allow_stale=allow_stale)
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def update_prices(self, priority=PRIORITY_BACKGROUND, coins=None):
+        """Update harga coins (default: seluruh watchlist) lalu publish event 'prices'
+
+        Dipanggil oleh refresh worker; caller lain sebaiknya pakai refresh()
+        atau request_refresh() supaya refresh yang bersamaan digabung.
+        """
+        snapshot = self.store.current
+        coins_snapshot = snapshot.coins
+
+        if not coins_snapshot and coins is None:
+            self.price_data = {}
+            self.emit("prices", self.price_data)
+            return
+
+        # Partial refresh: fetch coins yang diminta (juga revalidasi cache untuk
+        # coin di luar watchlist), tapi price_data hanya berisi coin watchlist
+        partial = coins is not None
+        if partial:
+            coins_snapshot = list(coins)
+
+        started = time.perf_counter()
+        # Satu deadline untuk seluruh refresh: semua chunk (juga yang antri
+        # worker), retry dan FX call
+        deadline = time.monotonic() + self.call_deadline()
+        try:
+            # OPTIMASI: Single batch call untuk semua coins
+            print(f"Fetching prices for {len(coins_snapshot)} coins in batch...")
+            with self.profiler.stage("get_multiple_coin_prices"):
+                new_price_data = self.get_multiple_coin_prices(coins_snapshot, priority, deadline=deadline)
+
+            failed_coins = []
+            for coin in coins_snapshot:
+                if coin not in new_price_data:
+                    failed_coins.append(coin)
+
+            # Coin yang gagal (mis. circuit open) tetap tampil dengan quote
+            # terakhir yang diketahui, ditandai stale
+            last_known = self.last_known_quotes([c for c in failed_coins if c in snapshot])
+
+            # Publish snapshot baru; partial refresh di-merge ke quotes lama.
+            # Filter pakai watchlist saat publish (coin yang dihapus selama fetch tidak masuk)
+            def merge(current):
+                merged = dict(current.quotes) if partial else {}
+                merged.update(last_known)
+                merged.update(new_price_data)
+                return current.replace(quotes={c: q for c, q in merged.items() if c in current.index})
+
+            published = self.store.update(merge).quotes
+            self.schedule_persist()
+
+            # Simpan sample ke history (quote dari cache di-skip karena timestamp sama)
+            with self.profiler.stage("history"):
+                self.history.record_quotes(new_price_data)
+
+            # Log statistics
+            success_count = len(new_price_data)
+            total_count = len(coins_snapshot)
+            print(f"Price update: {success_count}/{total_count} coins successful")
+
+            if failed_coins:
+                print(f"Failed to get prices for: {failed_coins}")
+                for coin in failed_coins:
+                    self.m_coin_failures.inc(coin=coin)
+
+            # Reference table untuk konversi currency (hanya jika perlu dan stale)
+            if self.needs_fx_table() and self.fx.is_stale():
+                with self.profiler.stage("fx"):
+                    self.refresh_fx_rates(priority, deadline)
+
+            result = "ok" if not failed_coins else "partial" if new_price_data else "failed"
+            self.m_refreshes.inc(result=result)
+            self.m_refresh_duration.observe(time.perf_counter() - started)
+
+            # Termasuk render di subscriber (status bar, menu)
+            with self.profiler.stage("emit"):
+                self.emit("prices", published)
+
+        except Exception as e:
+            print(f"Error updating prices: {e}")
+            self.m_refreshes.inc(result="error")
+            self.m_refresh_duration.observe(time.perf_counter() - started)
+            self.emit("error", e)
+
+    def last_known_quotes(self, coin_ids):
+        """Quote terakhir (price_data atau cache, walau expired) untuk coin_ids, ditandai stale"""
+        previous = self.store.current.quotes
+        quotes = {coin_id: previous[coin_id] for coin_id in coin_ids if coin_id in previous}
+
+        for coin_id in coin_ids:
+            if coin_id not in quotes:
+                cached, _ = self.price_cache.peek(coin_id)
+                if cached is not None:
+                    quotes[coin_id] = cached
+
+        # Quote yang sudah stale dipakai apa adanya (label tidak diformat ulang)
+        return {coin_id: quote.as_stale() for coin_id, quote in quotes.items()}
+
+    def restore_last_prices(self):
+        """Publish quote terakhir dari disk (ditandai stale) untuk watchlist, return jumlah coin"""
+        coins_snapshot = self.store.current.coins
+        restored = self.last_prices.load(coins_snapshot)
+        if not restored:
+            return 0
+
+        # Quote live yang sudah masuk lebih dulu tidak ditimpa
+        def merge(current):
+            merged = {c: q for c, q in restored.items() if c in current.index}
+            merged.update(current.quotes)
+            return current.replace(quotes=merged)
+
+        self.emit("prices", self.store.update(merge).quotes)
+
+        # Fetch pertama bisa ditunda hanya jika semua coin watchlist ter-cover
+        if all(coin_id in restored for coin_id in coins_snapshot):
+            self.restored_at = min(quote.validated_at for quote in restored.values())
+        print(f"Restored last known prices for {len(restored)} coins")
+        return len(restored)
+
+    def schedule_persist(self):
+        """Debounce: simpan last-known quotes persist_delay detik setelah perubahan pertama"""
+        if not self.scheduler.is_scheduled("persist"):
+            self.scheduler.schedule("persist", self.persist_last_prices, delay=self.persist_delay)
+
+    def persist_last_prices(self):
+        """Simpan quotes saat ini ke last_prices.json (atomic)"""
+        quotes = self.store.current.quotes
+        if quotes:
+            self.last_prices.save(quotes)
+
+    def apply_quotes(self, quotes):
+        """Masukkan quote dari sumber push (stream) ke cache, history, tick log dan price_data"""
+        for coin_id, quote in quotes.items():
+            self.set_cached_price(coin_id, quote)
+        self.history.record_quotes(quotes)
+        self.tick_log.write(quotes)
+
+        def merge(current):
+            merged = dict(current.quotes)
+            merged.update((c, q) for c, q in quotes.items() if c in current.index)
+            return current.replace(quotes=merged)
+
+        self.emit("prices", self.store.update(merge).quotes)
+        self.schedule_persist()
+
+    def start_stream(self, url=None):
+        """Start streaming ingestion dari WebSocket ticker url"""
+        if url:
+            self.stream_url = url
+        if not self.stream_url or self.stream is not None:
+            return
+
+        # Hanya symbol dari mapping atau coin index: symbol tebakan bisa jadi
+        # ticker coin lain
+        self.stream = StreamIngestor(self.stream_url, self.known_symbol, self.apply_quotes)
+        self.stream.set_watchlist(self.coins)
+
+        # Resubscribe otomatis saat watchlist berubah
+        def on_event(event, payload):
+            if event == "coins" and self.stream is not None:
+                self.stream.set_watchlist(payload)
+        self.unsubscribe_stream = self.subscribe(on_event)
+        self.stream.start()
+
+    def on_coin_index_change(self):
+        """Index selesai di-load/rebuild: coin yang symbol-nya baru diketahui ikut di-stream"""
+        stream = self.stream
+        if stream is not None:
+            stream.set_watchlist(self.coins)
+
+    def stop_stream(self):
+        """Stop streaming ingestion (polling tetap jalan)"""
+        if self.stream is None:
+            return
+        self.stream.stop()
+        self.unsubscribe_stream()
+        self.stream = None
+
+    def run_refresh(self, coins, priority):
+        """Entry point untuk RefreshCoordinator worker"""
+        with self.profiler.cycle("refresh"):
+            self.update_prices(priority=priority, coins=coins)
+
+    def request_refresh(self, coins=None, priority=PRIORITY_BACKGROUND, delay=0.0):
+        """Minta refresh tanpa menunggu; digabung dengan refresh lain yang pending"""
+        return self.refresher.request(coins, priority, delay)
+
+    def refresh(self, coins=None, priority=PRIORITY_BACKGROUND, timeout=None):
+        """Minta refresh dan tunggu sampai refresh yang mencakup permintaan ini selesai"""
+        return self.refresher.refresh(coins, priority, timeout)
+
+    def schedule_update(self, delay=1.0, priority=PRIORITY_BACKGROUND, coins=None):
+        """Jadwalkan refresh setelah delay (lewat single-flight worker)"""
+        return self.request_refresh(coins, priority, delay)
+
+    def poll_interval(self):
+        """Adaptive refresh interval berdasarkan jumlah coins"""
+        current_interval = self.refresh_interval
+        coin_count = len(self.coins)
+
+        # Increase interval jika banyak coins
+        if coin_count > 10:
+            current_interval = int(current_interval * 1.5)
+        elif coin_count > 5:
+            current_interval = int(current_interval * 1.2)
+        return current_interval
+
+    def poll_job(self):
+        """Scheduled polling: minta refresh tanpa memblokir scheduler thread
+
+        Saat stream aktif hanya coin yang tidak ter-cover stream yang di-poll.
+        """
+        if self.stream is not None and self.stream.connected:
+            missing = self.stream.stale_coins(self.coins)
+            if missing:
+                self.request_refresh(coins=missing)
+        else:
+            self.request_refresh()
+        print(f"Next refresh in {self.poll_interval()}s (monitoring {len(self.coins)} coins)")
+
+    def start(self, initial_delay=3.0):
+        """Mulai monitoring harga di background dengan adaptive interval"""
+        if self.monitoring_active:
+            return
+
+        self.monitoring_active = True
+        self.stop_event.clear()
+
+        # Streaming mode (jika dikonfigurasi), polling tetap jadi fallback
+        self.start_stream()
+
+        # Metrics endpoint (jika dikonfigurasi)
+        self.start_metrics_server()
+
+        # Offline coin index: load dari disk dan rebuild di background jika stale
+        self.coin_index.start_background_refresh(self.fetch_json, self.base_url,
+                                                 on_change=self.on_coin_index_change)
+
+        # Initial price update dengan delay, lalu setiap poll_interval();
+        # retry 30 detik setelah error. Quote dari disk yang lebih muda dari
+        # poll_interval() baru di-refresh saat umurnya mencapai interval itu
+        if self.restored_at is not None:
+            age = time.time() - self.restored_at
+            initial_delay = max(initial_delay, self.poll_interval() - age)
+            print(f"Last known prices are {age:.0f}s old, first refresh in {initial_delay:.0f}s")
+        self.scheduler.schedule("poll", self.poll_job, delay=initial_delay,
+                                interval=self.poll_interval, retry_delay=30)
+        self.scheduler.start()
+
+    def stop(self):
+        """Stop monitoring thread dan tutup HTTP connection pool"""
+        self.monitoring_active = False
+        self.stop_event.set()
+        self.scheduler.stop()
+        # Simpan quote yang masih menunggu debounce
+        if self.scheduler.cancel("persist"):
+            self.persist_last_prices()
+        self.stop_stream()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        self.coin_index.stop()
+        self.refresher.stop()
+        self.chunked_fetcher.shutdown()
+        self.hedged_fetcher.shutdown()
+        self.transport.close()
+        self.tick_log.close()
+
+    def wait(self, timeout=None):
+        """Block sampai stop() dipanggil (untuk mode daemon)"""
+        return self.stop_event.wait(timeout)
+
+    # ------------------------------------------------------------------
+    # Watchlist
+    # ------------------------------------------------------------------
+
+    def set_refresh_interval(self, interval):
+        """Set refresh interval dengan minimum 60 detik, return interval yang dipakai"""
+        interval = max(60, interval)
+        self.refresh_interval = interval
+        self.base_refresh_interval = interval
+        self.consecutive_rate_limits = 0  # Reset rate limit counter
+        self.save_config()
+        # Jadwal polling langsung pakai interval baru
+        self.scheduler.reschedule("poll")
+        return interval
+
+    def set_cycle_interval(self, interval):
+        """Set coin cycling interval"""
+        self.coin_cycle_interval = interval
+        self.save_config()
+        self.emit("cycle_interval", interval)
+
+    def add_coin(self, coin_id):
+        """Tambah coin ke watchlist, return True jika coin baru ditambahkan"""
+        def add(current):
+            if coin_id in current:
+                return None
+            return current.replace(coins=current.coins + (coin_id,))
+
+        snapshot = self.store.update(add)
+        if snapshot is None:
+            return False
+
+        self.price_cache.resize(self.price_cache_size(snapshot.coins))
+        self.save_config()
+        self.emit("coins", snapshot.coins)
+        return True
+
+    def remove_coin(self, coin_id):
+        """Hapus coin dari watchlist, return True jika coin ada dan dihapus"""
+        def remove(current):
+            if coin_id not in current:
+                return None
+            # Coin dan quote-nya hilang dalam satu snapshot
+            quotes = {c: q for c, q in current.quotes.items() if c != coin_id}
+            return current.replace(coins=[c for c in current.coins if c != coin_id], quotes=quotes)
+
+        snapshot = self.store.update(remove)
+        if snapshot is None:
+            return False
+
+        # Remove from cache
+        self.price_cache.delete(coin_id)
+        self.price_cache.resize(self.price_cache_size(snapshot.coins))
+        self.history.drop(coin_id)
+
+        self.save_config()
+        self.emit("coins", snapshot.coins)
+        return True
+
+    def get_coin_id_from_symbol(self, symbol):
+        """Convert symbol ke CoinGecko ID: mapping lokal, offline index, lalu /search"""
+        symbol = symbol.lower().strip()
+
+        # Check mapping lokal first
+        if symbol in self.symbol_to_id:
+            return self.symbol_to_id[symbol]
+
+        # Offline index (tanpa API call)
+        coin_id = self.coin_index.resolve(symbol)
+        if coin_id:
+            self.coin_index.remember(symbol, coin_id)
+            return coin_id
+
+        # Jika tidak ada di index, coba search di CoinGecko
+        coin_id = self.search_coin_id(symbol)
+        if coin_id:
+            self.coin_index.remember(symbol, coin_id)
+        return coin_id
+
+    def search_coin_id(self, symbol):
+        """Live /search fallback untuk symbol yang belum ada di offline index"""
+        try:
+            search_url = f"{self.base_url}/search?query={symbol}"
+            response = self.make_api_request(search_url, priority=PRIORITY_INTERACTIVE)
+
+            if response:
+                search_data = response.json()
+                coins = search_data.get('coins', [])
+
+                # Validate response structure
+                if not isinstance(coins, list):
+                    print("Invalid API response structure")
+                    return None
+
+                # Cari exact match dengan symbol
+                for coin in coins:
+                    if isinstance(coin, dict) and coin.get('symbol', '').lower() == symbol:
+                        return coin.get('id')
+
+                # Jika tidak ada exact match, ambil yang pertama jika ada
+                if coins and isinstance(coins[0], dict):
+                    return coins[0].get('id')
+
+        except Exception as e:
+            print(f"Error searching coin: {e}")
+
+        return None
+
+    def search_coins(self, query, limit=10):
+        """Autocomplete dari offline index: list of (id, symbol, name)"""
+        return self.coin_index.search(query, limit)
+
+    def fetch_json(self, url):
+        """GET url lewat rate limiter (background priority), return parsed JSON atau None"""
+        # Coin list besar dan bukan bagian dari refresh cycle: deadline lebih longgar
+        response = self.make_api_request(url, timeout=60, priority=PRIORITY_BACKGROUND,
+                                         deadline=time.monotonic() + 120)
+        if not response:
+            return None
+        try:
+            return response.json()
+        except ValueError as e:
+            print(f"Invalid JSON from {url}: {e}")
+            return None
+
+    def build_symbol_index(self):
+        """Precompute reverse index coin id -> canonical symbol dari symbol_to_id"""
+        id_to_symbol = {}
+        for symbol, coin_id in self.symbol_to_id.items():
+            # Symbol pertama di mapping yang menang, kecuali ada canonical override
+            id_to_symbol.setdefault(coin_id, symbol.upper())
+        for coin_id, symbol in self.canonical_symbols.items():
+            id_to_symbol[coin_id] = symbol.upper()
+
+        with self.symbol_lock:
+            self.id_to_symbol = id_to_symbol
+
+    def get_symbol_from_coin_id(self, coin_id):
+        """Convert coin ID ke symbol untuk display (O(1), hasil di-memoize)"""
+        symbol = self.known_symbol(coin_id)
+        if symbol is not None:
+            return symbol
+        # Fallback untuk display saja: bagian pertama dari coin ID (tidak
+        # di-memoize supaya symbol asli dipakai setelah index selesai di-load)
+        return coin_id.split('-')[0].upper()[:4]
+
+    def known_symbol(self, coin_id):
+        """Symbol dari mapping atau coin index, None jika belum diketahui
+
+        Untuk stream dan exchange pair; jangan pakai symbol tebakan karena
+        bisa jadi ticker coin lain.
+        """
+        symbol = self.id_to_symbol.get(coin_id)
+        if symbol is not None:
+            return symbol
+
+        # Offline index tahu symbol asli untuk coin di luar mapping
+        entry = self.coin_index.data.coins.get(coin_id)
+        if entry is None:
+            return None
+
+        symbol = entry[0].upper()
+        with self.symbol_lock:
+            self.id_to_symbol[coin_id] = symbol
+        return symbol
+
+
+def main():
+    """Jalankan PriceEngine sebagai daemon headless (tanpa status bar)"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Headless CryptoTicker price engine")
+    parser.add_argument("--config", default="config.json", help="Path ke config file")
+    parser.add_argument("--once", action="store_true", help="Fetch sekali, print, lalu exit")
+    parser.add_argument("--stream", default=None, help="WebSocket ticker url untuk streaming mode")
+    parser.add_argument("--currency", default=None, help="Display currency / pair (usd, eur, idr, jpy, btc, ...)")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Expose /metrics di port lokal")
+    parser.add_argument("--metrics-socket", default=None, help="Expose /metrics di Unix socket")
+    args = parser.parse_args()
+
+    engine = PriceEngine(config_file=args.config)
+    engine.load_config()
+    if args.stream:
+        engine.stream_url = args.stream
+    if args.currency:
+        engine.display_currency = args.currency.lower()
+    if args.metrics_port is not None:
+        engine.metrics_port = args.metrics_port
+    if args.metrics_socket:
+        engine.metrics_socket = args.metrics_socket
+
+    def print_prices(event, payload):
+        if event == "prices":
+            stamp = time.strftime("%H:%M:%S")
+            currency, prices = engine.display_prices()
+            for coin_id, data in payload.items():
+                symbol = engine.get_symbol_from_coin_id(coin_id)
+                price = prices.get(coin_id, data.current_price) if prices else data.current_price
+                print(f"[{stamp}] {symbol}: {format_price(price, currency)} ({data.change_percent:+.2f}%)")
+        elif event == "notify":
+            print(f"[notify] {payload['subtitle']}: {payload['message']}")
+
+    engine.subscribe(print_prices)
+    engine.install_profiling_signal()
+
+    if args.once:
+        engine.refresh(priority=PRIORITY_INTERACTIVE)
+        engine.stop()
+        return
+
+    print("🚀 Starting CryptoTicker engine (headless)...")
+    print("⚠️  Tekan Ctrl+C untuk menghentikan")
+    engine.start(initial_delay=0)
+    try:
+        engine.wait()
+    except KeyboardInterrupt:
+        engine.stop()
+
+
+if __name__ == "__main__":
+    main()
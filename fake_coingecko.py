@@ -0,0 +1,271 @@
+"""
+Local stand-in CoinGecko REST API untuk benchmark dan test offline.
+
+Endpoint yang di-support:
+
+    GET /api/v3/simple/price?ids=bitcoin,ethereum&vs_currencies=usd&include_24hr_change=true
+    GET /api/v3/search?query=btc
+    GET /api/v3/exchange_rates
+
+Latency per request (termasuk tail: sebagian kecil request jauh lebih
+lambat) dan ukuran payload (padding per coin) bisa diatur.
+Response (status line + headers + body) ditulis dengan satu write supaya
+hasil benchmark tidak terkena artefak Nagle / delayed ACK (~40 ms).
+
+Response 200 membawa ETag dan Last-Modified; request dengan If-None-Match
+atau If-Modified-Since yang masih cocok dijawab 304 tanpa body. Dengan
+tick_interval > 0 harga hanya bergerak sekali per tick (seperti upstream
+yang meng-update harga berkala), jadi validator bisa cocok antar poll.
+
+Jalankan sendiri:
+
+    python3 fake_coingecko.py --port 8766 --latency 0.2
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from http import HTTPStatus
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeCoinGeckoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server.owner
+        cpu_start = time.thread_time()
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        endpoint = parsed.path.rsplit('/', 1)[-1]
+
+        latency = server.request_latency()
+        if latency:
+            time.sleep(latency)
+
+        if server.fail_status:
+            # Simulasi outage
+            headers = {"Retry-After": server.retry_after} if server.retry_after is not None else None
+            sent = self.send_json(server.fail_status, {"error": "unavailable"}, headers)
+            server.record(endpoint, cpu_start, sent)
+            return
+
+        last_modified = None
+        if parsed.path.endswith('/simple/price'):
+            ids = query.get('ids', [''])[0].split(',')
+            body = server.simple_price([coin_id for coin_id in ids if coin_id])
+            last_modified = max((entry['last_updated_at'] for entry in body.values()), default=None)
+        elif parsed.path.endswith('/search'):
+            body = server.search(query.get('query', [''])[0])
+        elif parsed.path.endswith('/exchange_rates'):
+            body = server.exchange_rates()
+        else:
+            sent = self.send_json(404, {"error": "not found"})
+            server.record(endpoint, cpu_start, sent)
+            return
+
+        payload = json.dumps(body).encode()
+        etag = '"' + hashlib.sha1(payload).hexdigest()[:20] + '"'
+        headers = {"ETag": etag}
+        if last_modified is not None:
+            headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+        if self.not_modified(etag, last_modified):
+            sent = self.send_json(304, None, headers)
+            server.record(endpoint, cpu_start, sent, not_modified=True)
+            return
+
+        sent = self.send_json(200, body, headers, payload=payload)
+        server.record(endpoint, cpu_start, sent)
+
+    def not_modified(self, etag, last_modified):
+        """Validator dari client masih cocok (If-None-Match didahulukan)"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(',')]
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since and last_modified is not None:
+            try:
+                return last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def send_json(self, status, body, headers=None, payload=None):
+        """Kirim response, return jumlah bytes yang ditulis"""
+        if status == 304:
+            payload = b""
+        elif payload is None:
+            payload = json.dumps(body).encode()
+        reason = HTTPStatus(status).phrase
+        extra = "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+        head = (
+            f"HTTP/1.1 {status} {reason}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"{extra}"
+            "\r\n"
+        ).encode('latin-1')
+        # Satu write untuk headers + body
+        self.wfile.write(head + payload)
+        self.wfile.flush()
+        return len(head) + len(payload)
+
+
+class FakeCoinGeckoServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, payload_bytes=0, known_ids=None,
+                 tail_probability=0.0, tail_latency=0.0, tick_interval=0.0):
+        self.host = host
+        self.port = port
+        self.latency = latency  # Detik per request
+        self.tail_probability = tail_probability  # Peluang satu request kena tail_latency
+        self.tail_latency = tail_latency
+        self.payload_bytes = payload_bytes  # Padding tambahan per coin di response
+        self.known_ids = known_ids  # None = semua id dianggap valid
+        self.tick_interval = tick_interval  # 0 = harga bergerak di setiap request
+        self.fail_status = None  # Mis. 503: semua request gagal dengan status ini
+        self.retry_after = None  # Header Retry-After untuk response fail_status
+
+        self.prices = {}
+        self.lock = threading.Lock()
+        self.httpd = None
+
+        # Statistik per endpoint
+        self.calls = {}
+        self.cpu_seconds = 0.0
+        self.bytes_sent = 0
+        self.not_modified = 0
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/api/v3"
+
+    def start(self):
+        """Start server di background thread, return self"""
+        self.httpd = ThreadingHTTPServer((self.host, self.port), FakeCoinGeckoHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.owner = self
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, name="fake-coingecko", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def request_latency(self):
+        if self.tail_probability and random.random() < self.tail_probability:
+            return self.tail_latency
+        return self.latency
+
+    def record(self, endpoint, cpu_start, sent=0, not_modified=False):
+        with self.lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            self.cpu_seconds += time.thread_time() - cpu_start
+            self.bytes_sent += sent
+            if not_modified:
+                self.not_modified += 1
+
+    def reset_stats(self):
+        with self.lock:
+            self.calls = {}
+            self.cpu_seconds = 0.0
+            self.bytes_sent = 0
+            self.not_modified = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                'calls': dict(self.calls),
+                'cpu_seconds': self.cpu_seconds,
+                'bytes_sent': self.bytes_sent,
+                'not_modified': self.not_modified,
+            }
+
+    def quote(self, coin_id):
+        """Random walk price untuk satu coin: (price, change_percent, updated_at)"""
+        now = time.time()
+        with self.lock:
+            price, open_price, updated_at = self.prices.get(coin_id, (None, None, None))
+            if price is None:
+                price = open_price = random.uniform(0.001, 50000)
+                updated_at = now
+            elif now - updated_at >= self.tick_interval:
+                price *= 1 + random.gauss(0, 0.001)
+                updated_at = now
+            self.prices[coin_id] = (price, open_price, updated_at)
+        return price, (price - open_price) / open_price * 100, int(updated_at)
+
+    def simple_price(self, ids):
+        padding = 'x' * self.payload_bytes if self.payload_bytes else None
+        body = {}
+        for coin_id in ids:
+            if self.known_ids is not None and coin_id not in self.known_ids:
+                continue
+            price, change, updated_at = self.quote(coin_id)
+            entry = {'usd': price, 'usd_24h_change': change, 'last_updated_at': updated_at}
+            if padding:
+                entry['padding'] = padding
+            body[coin_id] = entry
+        return body
+
+    def exchange_rates(self):
+        """Reference table relatif ke BTC, format sama dengan /exchange_rates"""
+        btc_usd, _, _ = self.quote('bitcoin')
+        per_usd = {'usd': 1.0, 'eur': 0.92, 'gbp': 0.79, 'jpy': 151.0, 'idr': 15700.0, 'btc': 1 / btc_usd}
+        units = {'usd': '$', 'eur': '€', 'gbp': '£', 'jpy': '¥', 'idr': 'Rp', 'btc': 'BTC'}
+        return {'rates': {
+            code: {
+                'name': code.upper(),
+                'unit': units[code],
+                'value': rate * btc_usd,
+                'type': 'crypto' if code == 'btc' else 'fiat',
+            }
+            for code, rate in per_usd.items()
+        }}
+
+    def search(self, query):
+        query = query.lower()
+        return {'coins': [{
+            'id': f"{query}-coin",
+            'symbol': query.upper(),
+            'name': query.title(),
+            'market_cap_rank': 1,
+        }]} if query else {'coins': []}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local stand-in CoinGecko REST API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency per request (detik)")
+    parser.add_argument("--payload-bytes", type=int, default=0, help="Padding per coin di response")
+    parser.add_argument("--tail-probability", type=float, default=0.0, help="Peluang request lambat")
+    parser.add_argument("--tail-latency", type=float, default=0.0, help="Latency request lambat (detik)")
+    parser.add_argument("--tick-interval", type=float, default=0.0, help="Harga bergerak sekali per N detik")
+    args = parser.parse_args()
+
+    server = FakeCoinGeckoServer(args.host, args.port, args.latency, args.payload_bytes,
+                                 tail_probability=args.tail_probability,
+                                 tail_latency=args.tail_latency,
+                                 tick_interval=args.tick_interval).start()
+    print(f"Fake CoinGecko API listening on {server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
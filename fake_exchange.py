@@ -0,0 +1,234 @@
+"""
+Local stand-in exchange WebSocket ticker stream (dan REST ticker API)
+untuk test dan benchmark streaming mode / secondary provider secara offline.
+
+Protocol mengikuti gaya stream exchange pada umumnya:
+
+    -> {"method": "SUBSCRIBE", "params": ["btcusdt@ticker"], "id": 1}
+    <- {"result": null, "id": 1}
+    <- {"e": "24hrTicker", "E": 1700000000000, "s": "BTCUSDT", "c": "45000.12", "P": "1.25"}
+
+REST ticker (FakeTickerApiServer):
+
+    GET /api/v3/ticker/24hr?symbols=["BTCUSDT","ETHUSDT"]
+    <- [{"symbol": "BTCUSDT", "lastPrice": "45000.12", "priceChangePercent": "1.25", "closeTime": ...}]
+
+Jalankan sendiri:
+
+    python3 fake_exchange.py --port 8765 --rate 5
+"""
+
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import ws
+
+
+class FakeExchangeServer:
+    def __init__(self, host="127.0.0.1", port=0, rate=2.0, drop_after=None):
+        self.host = host
+        self.port = port
+        self.rate = rate  # Update per detik per symbol
+        self.drop_after = drop_after  # Putus koneksi setelah N detik (test reconnect)
+
+        self.prices = {}
+        self.prices_lock = threading.Lock()
+        self.server_socket = None
+        self.running = False
+        self.connections = 0
+        self.messages_sent = 0
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/ws"
+
+    def start(self):
+        """Start server di background thread, return self"""
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket.bind((self.host, self.port))
+        self.server_socket.listen(16)
+        self.port = self.server_socket.getsockname()[1]
+        self.running = True
+        threading.Thread(target=self.accept_loop, name="fake-exchange", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.running = False
+        if self.server_socket is not None:
+            self.server_socket.close()
+
+    def accept_loop(self):
+        while self.running:
+            try:
+                client, _ = self.server_socket.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.handle_client, args=(client,), daemon=True).start()
+
+    def next_tick(self, stream_symbol):
+        """Random walk price untuk satu symbol"""
+        with self.prices_lock:
+            price, open_price = self.prices.get(stream_symbol, (None, None))
+            if price is None:
+                price = open_price = random.uniform(0.5, 50000)
+            price *= 1 + random.gauss(0, 0.0005)
+            self.prices[stream_symbol] = (price, open_price)
+        change = (price - open_price) / open_price * 100
+        return {
+            "e": "24hrTicker",
+            "E": int(time.time() * 1000),
+            "s": stream_symbol.upper(),
+            "c": f"{price:.8g}",
+            "P": f"{change:.3f}",
+        }
+
+    def handle_client(self, client):
+        try:
+            conn = ws.accept(client)
+        except (ws.WebSocketError, OSError):
+            client.close()
+            return
+
+        self.connections += 1
+        subscriptions = set()
+        lock = threading.Lock()
+        connected_at = time.time()
+
+        def reader():
+            try:
+                while True:
+                    message = json.loads(conn.recv())
+                    params = [p.split('@')[0] for p in message.get('params', [])]
+                    with lock:
+                        if message.get('method') == 'SUBSCRIBE':
+                            subscriptions.update(params)
+                        elif message.get('method') == 'UNSUBSCRIBE':
+                            subscriptions.difference_update(params)
+                    conn.send_text(json.dumps({"result": None, "id": message.get('id')}))
+            except (ws.WebSocketError, OSError, ValueError):
+                conn.closed = True
+
+        threading.Thread(target=reader, daemon=True).start()
+
+        interval = 1.0 / self.rate if self.rate > 0 else 1.0
+        try:
+            while self.running and not conn.closed:
+                if self.drop_after is not None and time.time() - connected_at > self.drop_after:
+                    break
+                with lock:
+                    symbols = list(subscriptions)
+                for symbol in symbols:
+                    conn.send_text(json.dumps(self.next_tick(symbol)))
+                    self.messages_sent += 1
+                time.sleep(interval)
+        except (ws.WebSocketError, OSError):
+            pass
+        finally:
+            conn.close()
+
+
+class FakeTickerApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server.owner
+        parsed = urlparse(self.path)
+        if server.latency:
+            time.sleep(server.latency)
+
+        if not parsed.path.endswith('/ticker/24hr'):
+            self.send_json(404, {"code": -1, "msg": "not found"})
+            return
+        try:
+            symbols = json.loads(parse_qs(parsed.query).get('symbols', ['[]'])[0])
+        except ValueError:
+            self.send_json(400, {"code": -1100, "msg": "invalid symbols"})
+            return
+        self.send_json(200, [server.ticker(str(symbol)) for symbol in symbols])
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        head = (
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "\r\n"
+        ).encode('latin-1')
+        # Satu write untuk headers + body (hindari artefak Nagle / delayed ACK)
+        self.wfile.write(head + payload)
+        self.wfile.flush()
+
+
+class FakeTickerApiServer:
+    """Stand-in REST ticker API (secondary provider) dengan latency yang bisa diatur"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.prices = {}
+        self.lock = threading.Lock()
+        self.httpd = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self.httpd = ThreadingHTTPServer((self.host, self.port), FakeTickerApiHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.owner = self
+        self.port = self.httpd.server_address[1]
+        threading.Thread(target=self.httpd.serve_forever, name="fake-ticker-api", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def ticker(self, symbol):
+        with self.lock:
+            price, open_price = self.prices.get(symbol, (None, None))
+            if price is None:
+                price = open_price = random.uniform(0.5, 50000)
+            price *= 1 + random.gauss(0, 0.0005)
+            self.prices[symbol] = (price, open_price)
+        return {
+            "symbol": symbol,
+            "lastPrice": f"{price:.8g}",
+            "priceChangePercent": f"{(price - open_price) / open_price * 100:.3f}",
+            "closeTime": int(time.time() * 1000),
+        }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local stand-in exchange ticker WebSocket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=2.0, help="Update per detik per symbol")
+    parser.add_argument("--drop-after", type=float, default=None, help="Putus koneksi setelah N detik")
+    args = parser.parse_args()
+
+    server = FakeExchangeServer(args.host, args.port, args.rate, args.drop_after).start()
+    print(f"Fake exchange stream listening on {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Multi-currency dan cross-pair quotes yang dihitung lokal.
+
+Upstream hanya di-fetch dalam USD (/simple/price) plus satu reference
+table /exchange_rates (fiat + crypto utama, relatif ke BTC) yang di-cache.
+Harga dalam currency lain = outer product vektor harga USD dengan vektor
+rate (unit currency per 1 USD). Untuk cross pair (ETH/BTC), rate crypto
+diambil dari harga watchlist terbaru jika coin-nya ada di watchlist.
+
+Menambah currency tidak menambah API call maupun ukuran payload.
+"""
+
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+BASE_CURRENCY = "usd"
+
+CURRENCY_SYMBOLS = {
+    "usd": "$",
+    "eur": "€",
+    "gbp": "£",
+    "jpy": "¥",
+    "idr": "Rp",
+    "btc": "₿",
+}
+
+
+def parse_exchange_rates(payload):
+    """Response /exchange_rates (relatif ke BTC) -> dict currency -> unit per 1 USD"""
+    rates = payload.get('rates') if isinstance(payload, dict) else None
+    if not isinstance(rates, dict):
+        return {}
+
+    usd = rates.get(BASE_CURRENCY, {}).get('value')
+    if not isinstance(usd, (int, float)) or usd <= 0:
+        return {}
+
+    result = {}
+    for code, info in rates.items():
+        value = info.get('value') if isinstance(info, dict) else None
+        if isinstance(value, (int, float)) and value > 0:
+            result[code.lower()] = value / usd
+    return result
+
+
+class QuoteMatrix:
+    """Harga setiap coin (baris) dalam setiap currency (kolom)"""
+
+    __slots__ = ('coin_ids', 'currencies', 'values', 'row', 'col')
+
+    def __init__(self, coin_ids, currencies, values):
+        self.coin_ids = coin_ids
+        self.currencies = currencies
+        self.values = values  # ndarray (n, m) atau list of lists
+        self.row = {coin_id: i for i, coin_id in enumerate(coin_ids)}
+        self.col = {currency: j for j, currency in enumerate(currencies)}
+
+    def get(self, coin_id, currency):
+        i = self.row.get(coin_id)
+        j = self.col.get(currency)
+        if i is None or j is None:
+            return None
+        value = self.values[i][j]
+        return None if value != value else float(value)  # NaN = rate tidak tersedia
+
+    def column(self, currency):
+        """dict coin_id -> harga dalam currency"""
+        j = self.col.get(currency)
+        if j is None:
+            return {}
+        if np is not None:
+            column = self.values[:, j]
+            return {coin_id: float(v) for coin_id, v in zip(self.coin_ids, column) if v == v}
+        return {coin_id: row[j] for coin_id, row in zip(self.coin_ids, self.values) if row[j] == row[j]}
+
+
+def build_matrix(usd_prices, rates):
+    """Outer product harga USD (n) x rate per USD (m) -> QuoteMatrix
+
+    usd_prices: dict coin_id -> harga USD
+    rates: dict currency -> unit currency per 1 USD (NaN jika tidak tersedia)
+    """
+    coin_ids = list(usd_prices)
+    currencies = list(rates)
+    if np is not None:
+        prices = np.fromiter((usd_prices[c] for c in coin_ids), dtype=np.float64, count=len(coin_ids))
+        vector = np.fromiter((rates[c] for c in currencies), dtype=np.float64, count=len(currencies))
+        values = np.outer(prices, vector)
+    else:
+        vector = [rates[c] for c in currencies]
+        values = [[usd_prices[c] * rate for rate in vector] for c in coin_ids]
+    return QuoteMatrix(coin_ids, currencies, values)
+
+
+class FxTable:
+    def __init__(self, ttl=600):
+        self.ttl = ttl  # Detik sebelum reference table di-fetch ulang
+        self.lock = threading.Lock()
+        self.rates = {BASE_CURRENCY: 1.0}
+        self.fetched_at = 0.0
+
+    def update(self, rates):
+        if not rates:
+            return False
+        with self.lock:
+            self.rates = dict(rates, **{BASE_CURRENCY: 1.0})
+            self.fetched_at = time.time()
+        return True
+
+    def is_stale(self):
+        return time.time() - self.fetched_at > self.ttl
+
+    def currencies(self):
+        with self.lock:
+            return sorted(self.rates)
+
+    def rates_for(self, currencies, usd_prices=None, coin_for_currency=None):
+        """Vektor rate per USD untuk currencies
+
+        Rate crypto (mis. btc) diambil dari harga watchlist terbaru jika
+        coin_for_currency(code) ada di usd_prices; selain itu dari table.
+        """
+        with self.lock:
+            table = self.rates
+        result = {}
+        for code in currencies:
+            code = code.lower()
+            coin_id = coin_for_currency(code) if coin_for_currency is not None else None
+            if usd_prices and coin_id in usd_prices and usd_prices[coin_id] > 0:
+                result[code] = 1.0 / usd_prices[coin_id]
+            else:
+                result[code] = table.get(code, float('nan'))
+        return result
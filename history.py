@@ -0,0 +1,164 @@
+"""
+Per-coin price history dalam ring buffer berbasis typed array.
+
+Setiap coin punya dua array('d') dengan kapasitas tetap (timestamp dan
+price), jadi append O(1) dan memory tetap capacity * 16 byte per coin
+berapa lama pun aplikasi berjalan. Read last N / time window memakai
+NumPy jika tersedia (vectorized), dan array slicing + bisect jika tidak.
+"""
+
+import bisect
+import threading
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class PriceRing:
+    __slots__ = ('capacity', 'times', 'prices', 'head', 'count', 'lock')
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.prices = array('d', bytes(8 * capacity))
+        self.head = 0  # Index tulis berikutnya
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def append(self, timestamp, price):
+        """Tambah satu sample (O(1)); sample tertua ditimpa jika penuh"""
+        with self.lock:
+            self.times[self.head] = timestamp
+            self.prices[self.head] = price
+            self.head = (self.head + 1) % self.capacity
+            if self.count < self.capacity:
+                self.count += 1
+
+    def last_timestamp(self):
+        """Timestamp sample terbaru, None jika kosong"""
+        if not self.count:
+            return None
+        return self.times[(self.head - 1) % self.capacity]
+
+    def ordered(self, n=None):
+        """Return (times, prices) untuk n sample terakhir, urut dari yang tertua"""
+        with self.lock:
+            count = self.count if n is None else max(0, min(n, self.count))
+            start = (self.head - count) % self.capacity
+            end = start + count
+
+            if np is not None:
+                times = np.frombuffer(self.times, dtype=np.float64)
+                prices = np.frombuffer(self.prices, dtype=np.float64)
+                if end <= self.capacity:
+                    return times[start:end].copy(), prices[start:end].copy()
+                wrap = end - self.capacity
+                return (np.concatenate((times[start:], times[:wrap])),
+                        np.concatenate((prices[start:], prices[:wrap])))
+
+            if end <= self.capacity:
+                return self.times[start:end], self.prices[start:end]
+            wrap = end - self.capacity
+            return (self.times[start:] + self.times[:wrap],
+                    self.prices[start:] + self.prices[:wrap])
+
+
+class PriceHistory:
+    def __init__(self, capacity=1440):
+        self.capacity = capacity
+        self.rings = {}
+        self.lock = threading.Lock()
+
+    def ring(self, coin_id, create=False):
+        """Ring buffer untuk coin (dibuat jika create=True)"""
+        ring = self.rings.get(coin_id)
+        if ring is None and create:
+            with self.lock:
+                ring = self.rings.get(coin_id)
+                if ring is None:
+                    ring = PriceRing(self.capacity)
+                    self.rings[coin_id] = ring
+        return ring
+
+    def append(self, coin_id, timestamp, price):
+        """Tambah sample; sample dengan timestamp <= sample terakhir di-skip"""
+        ring = self.ring(coin_id, create=True)
+        last = ring.last_timestamp()
+        if last is not None and timestamp <= last:
+            return False
+        ring.append(timestamp, price)
+        return True
+
+    def record_quotes(self, quotes):
+        """Feed dari update_prices: dict coin_id -> Quote"""
+        recorded = 0
+        for coin_id, quote in quotes.items():
+            timestamp = quote.timestamp
+            if timestamp is not None and self.append(coin_id, timestamp, quote.current_price):
+                recorded += 1
+        return recorded
+
+    def drop(self, coin_id):
+        """Hapus history coin (mis. saat coin dihapus dari watchlist)"""
+        with self.lock:
+            self.rings.pop(coin_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.rings.clear()
+
+    def last(self, coin_id, n):
+        """(times, prices) untuk n sample terakhir"""
+        ring = self.ring(coin_id)
+        if ring is None:
+            return self.empty()
+        return ring.ordered(n)
+
+    def window(self, coin_id, start, end=None):
+        """(times, prices) untuk sample dengan start <= timestamp <= end"""
+        ring = self.ring(coin_id)
+        if ring is None:
+            return self.empty()
+
+        times, prices = ring.ordered()
+        if np is not None:
+            lo = int(np.searchsorted(times, start, side='left'))
+            hi = len(times) if end is None else int(np.searchsorted(times, end, side='right'))
+        else:
+            lo = bisect.bisect_left(times, start)
+            hi = len(times) if end is None else bisect.bisect_right(times, end)
+        return times[lo:hi], prices[lo:hi]
+
+    def stats(self, coin_id, start, end=None):
+        """Min/max/mean/first/last dan change % untuk satu time window (None jika kosong)"""
+        _, prices = self.window(coin_id, start, end)
+        if not len(prices):
+            return None
+
+        if np is not None:
+            low, high, mean = float(prices.min()), float(prices.max()), float(prices.mean())
+        else:
+            low, high, mean = min(prices), max(prices), sum(prices) / len(prices)
+
+        first, last = float(prices[0]), float(prices[-1])
+        return {
+            'count': len(prices),
+            'min': low,
+            'max': high,
+            'mean': mean,
+            'first': first,
+            'last': last,
+            'change_percent': (last - first) / first * 100 if first else 0.0,
+        }
+
+    def memory_bytes(self):
+        """Total memory buffer (bytes), tetap capacity * 16 per coin"""
+        return len(self.rings) * self.capacity * 16
+
+    def empty(self):
+        if np is not None:
+            return np.empty(0), np.empty(0)
+        return array('d'), array('d')
@@ -0,0 +1,102 @@
+"""
+Formatting dan memoized display labels untuk status bar dan menu.
+
+Label per coin dihitung sekali per quote baru. Selama quote object yang
+sama (belum ada refresh), render path hanya mengambil string dari cache.
+"""
+
+import threading
+
+from fx import BASE_CURRENCY, CURRENCY_SYMBOLS
+
+
+TREND_SYMBOLS = {"up": "▲", "down": "▼"}
+
+# Quote terakhir yang diketahui saat fetch gagal (mis. circuit open)
+STALE_MARKER = "*"
+
+
+def format_price(price, currency=BASE_CURRENCY):
+    """Format price dengan koma ribuan dan presisi sesuai besarnya harga"""
+    if price < 0.0001:
+        number = f"{price:.8f}"
+    elif price < 0.01:
+        number = f"{price:.6f}"
+    elif price < 1:
+        number = f"{price:.4f}"
+    elif price < 100:
+        number = f"{price:,.2f}"
+    else:
+        number = f"{price:,.0f}"
+
+    symbol = CURRENCY_SYMBOLS.get(currency)
+    if symbol is None:
+        # Cross pair / currency tanpa simbol: "0.0531 ETH"
+        return f"{number} {currency.upper()}"
+    return f"{symbol}{number}"
+
+
+class CoinLabels:
+    __slots__ = ('quote', 'symbol', 'price', 'currency', 'title', 'title_with_change', 'menu')
+
+    def __init__(self, quote, symbol, price=None, currency=BASE_CURRENCY):
+        self.quote = quote
+        self.symbol = symbol
+        self.price = price
+        self.currency = currency
+
+        if quote is None:
+            self.title = f"{symbol}: Loading..."
+            self.title_with_change = self.title
+            self.menu = self.title
+            return
+
+        # price = harga dalam display currency (default: current_price USD)
+        price_str = format_price(quote.current_price if price is None else price, currency)
+        self.title = f"{symbol}: {price_str}"
+
+        # Tampilkan persentase change jika significant
+        if abs(quote.change_percent) >= 0.1:
+            self.title_with_change = f"{self.title} ({quote.change_percent:+.1f}%)"
+        else:
+            self.title_with_change = self.title
+
+        trend_symbol = TREND_SYMBOLS.get(quote.trend, "=")
+        self.menu = f"{self.title} {trend_symbol}"
+
+        if quote.stale:
+            self.title += STALE_MARKER
+            self.title_with_change += STALE_MARKER
+            self.menu += " (stale)"
+
+
+class LabelCache:
+    def __init__(self, symbol_for):
+        # symbol_for(coin_id) -> display symbol
+        self.symbol_for = symbol_for
+        self.labels = {}
+        self.lock = threading.Lock()
+
+        self.formatted = 0  # Berapa kali label benar-benar diformat ulang
+
+    def get(self, coin_id, quote, price=None, currency=BASE_CURRENCY):
+        """Return CoinLabels untuk coin; diformat ulang hanya jika quote (atau currency/harga konversi) berubah"""
+        labels = self.labels.get(coin_id)
+        if (labels is not None and labels.quote is quote
+                and labels.currency == currency and labels.price == price):
+            return labels
+
+        labels = CoinLabels(quote, self.symbol_for(coin_id), price, currency)
+        with self.lock:
+            self.labels[coin_id] = labels
+            self.formatted += 1
+        return labels
+
+    def invalidate(self, coin_ids=None):
+        """Buang label untuk coin_ids (default: semua), mis. saat coin dihapus"""
+        with self.lock:
+            if coin_ids is None:
+                self.labels.clear()
+            else:
+                for coin_id in coin_ids:
+                    self.labels.pop(coin_id, None)
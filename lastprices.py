@@ -0,0 +1,122 @@
+"""
+Last-known prices di disk untuk warm start.
+
+Quote terakhir per coin (beserta waktu fetch) disimpan ke last_prices.json
+di folder yang sama dengan config.json. Saat startup quote ini dipublish
+sebelum ada network I/O, ditandai stale, sehingga status bar langsung
+menampilkan harga alih-alih "Loading...". File ditulis atomic (tmp lalu
+rename); engine men-debounce penulisan supaya tidak setiap refresh.
+
+Ukur waktu load untuk watchlist besar:
+
+    python3 lastprices.py --coins 500
+"""
+
+import json
+import os
+import threading
+import time
+
+from coin_index import write_json_atomic
+from quotes import Quote, valid_number
+
+
+FORMAT_VERSION = 2
+
+
+class LastKnownPrices:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()  # Serialize penulisan (scheduler thread vs stop())
+
+        # Statistik
+        self.saves = 0
+        self.saved_at = None
+
+    def load(self, coin_ids=None):
+        """dict coin_id -> Quote (stale=True) dari disk; {} jika file tidak ada atau rusak"""
+        try:
+            if not os.path.exists(self.path):
+                return {}
+            with open(self.path, 'r') as f:
+                snapshot = json.load(f)
+            if not isinstance(snapshot, dict) or snapshot.get('version') != FORMAT_VERSION:
+                return {}
+            entries = snapshot.get('quotes')
+            if not isinstance(entries, dict):
+                return {}
+        except Exception as e:
+            print(f"Error loading last known prices: {e}")
+            return {}
+
+        wanted = entries.keys() if coin_ids is None else coin_ids
+        quotes = {}
+        for coin_id in wanted:
+            entry = entries.get(coin_id)
+            # [price, change_percent, timestamp, last_updated_at, source, validated_at]
+            if not isinstance(entry, list) or len(entry) != 6:
+                continue
+            price, change, timestamp, updated, source, validated = entry
+            if not valid_number(price) or price <= 0 or not valid_number(timestamp):
+                continue
+            quotes[coin_id] = Quote(price, change if valid_number(change) else 0.0, timestamp,
+                                    updated if valid_number(updated) else None,
+                                    source if isinstance(source, str) else None, stale=True,
+                                    validated_at=validated if valid_number(validated) else None)
+        return quotes
+
+    def save(self, quotes):
+        """Tulis quotes (dict coin_id -> Quote) ke disk, return True jika berhasil"""
+        entries = {
+            coin_id: [quote.current_price, quote.change_percent, quote.timestamp,
+                      quote.last_updated_at, quote.source, quote.validated_at]
+            for coin_id, quote in quotes.items()
+        }
+        try:
+            with self.lock:
+                write_json_atomic(self.path, {
+                    'version': FORMAT_VERSION,
+                    'saved_at': time.time(),
+                    'quotes': entries,
+                })
+                self.saves += 1
+                self.saved_at = time.time()
+            return True
+        except Exception as e:
+            print(f"Error saving last known prices: {e}")
+            return False
+
+    def stats(self):
+        return {'saves': self.saves, 'saved_at': self.saved_at}
+
+
+def main():
+    """Waktu save/load last_prices.json untuk N coin"""
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Benchmark last-known prices persistence")
+    parser.add_argument("--coins", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    coin_ids = [f"coin-{i}" for i in range(args.coins)]
+    quotes = {coin_id: Quote(100.0 + i, 1.5, time.time(), int(time.time())) for i, coin_id in enumerate(coin_ids)}
+    store = LastKnownPrices(os.path.join(tempfile.mkdtemp(), "last_prices.json"))
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        store.save(quotes)
+    save_ms = (time.perf_counter() - start) / args.repeat * 1000
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        loaded = store.load(coin_ids)
+    load_ms = (time.perf_counter() - start) / args.repeat * 1000
+
+    size = os.path.getsize(store.path)
+    print(f"{len(loaded)} coins, {size / 1024:.1f} KiB: save {save_ms:.2f} ms, load {load_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,136 +1,103 @@
+import time
 
-
-import os
-import sys
-import warnings
-from io import StringIO
-
-# Suppress semua urllib3 warnings dengan multiple methods
-warnings.filterwarnings('ignore', category=UserWarning, module='urllib3')
-warnings.filterwarnings('ignore', message='.*urllib3.*')
-os.environ['PYTHONWARNINGS'] = 'ignore'
-
-# Temporarily redirect stderr untuk capture urllib3 warnings
-class WarningFilter:
-    def __init__(self, target):
-        self.target = target
-        
-    def write(self, message):
-        if 'urllib3' not in message and 'NotOpenSSLWarning' not in message and 'warnings.warn' not in message:
-            self.target.write(message)
-            
-    def flush(self):
-        self.target.flush()
-
-# Apply stderr filter
-original_stderr = sys.stderr
-sys.stderr = WarningFilter(original_stderr)
+# Titik awal untuk time-to-first-frame
+STARTED_AT = time.perf_counter()
 
 import rumps
-import requests
-import threading
-import time
-import json
-from datetime import datetime, timedelta
 
-# Restore stderr after imports
-sys.stderr = original_stderr
+from breaker import CLOSED, OPEN
+from engine import PriceEngine
+from labels import LabelCache
+from menu_model import KeyedMenu
+from render import Frame, StatusRenderer
+from rate_limiter import PRIORITY_INTERACTIVE
+
+# Key untuk placeholder saat watchlist kosong
+EMPTY_COINS_KEY = "__empty__"
 
 class CryptoTicker(rumps.App):
-    def __init__(self):
+    def __init__(self, engine=None):
         super(CryptoTicker, self).__init__("Loading...")
         self.icon = None
         self.quit_button = "Exit"
         
-        # Data storage
-        self.coins = ["bitcoin", "ethereum"]  # Default coins
-        self.refresh_interval = 300  # Changed default to 5 minutes (300 seconds)
-        self.price_data = {}
-        self.config_file = "config.json"
-        self.monitoring_active = True
+        # Semua fetch, cache & monitoring ada di PriceEngine (headless)
+        self.engine = engine if engine is not None else PriceEngine()
         
-        # Lock untuk proteksi akses bersamaan ke coins & price_data
-        self.data_lock = threading.Lock()
-        # Lock terpisah untuk coins dan coin index untuk mencegah race condition
-        self.coins_lock = threading.Lock()
+        # Display labels di-memoize per quote, diformat ulang hanya saat quote baru
+        self.labels = LabelCache(self.engine.get_symbol_from_coin_id)
         
-        # Coin cycling untuk status bar
+        # Coin cycling untuk status bar; int assignment atomic, reader
+        # meng-clamp index sendiri jadi tidak perlu lock
         self.current_coin_index = 0
-        self.coin_cycle_interval = 5  # Changed default to 5 seconds
-        
-        # Retry settings untuk API calls
-        self.max_retries = 3
-        self.retry_delay = 3  # Increased delay
-        
-        # Rate limiting protection
-        self.last_api_call = 0
-        self.min_api_interval = 2.0  # Minimum 2 detik antar API calls
-        self.api_call_count = 0
-        self.api_call_window_start = time.time()
-        self.max_calls_per_minute = 25  # Conservative limit
-        
-        # Caching untuk mengurangi API calls
-        self.price_cache = {}
-        self.cache_ttl = 30  # Cache valid untuk 30 detik
-        
-        # Adaptive rate limiting
-        self.consecutive_rate_limits = 0
-        self.base_refresh_interval = 300  # Changed default to 5 minutes
         
         # Icon paths untuk trend indicators
         self.up_icon_path = "up.png"
         self.down_icon_path = "down.png"
         self.default_icon_path = "ticker.png"
         
-        # Symbol to CoinGecko ID mapping untuk coins populer
-        self.symbol_to_id = {
-            "btc": "bitcoin",
-            "eth": "ethereum", 
-            "bnb": "binancecoin",
-            "ada": "cardano",
-            "sol": "solana",
-            "doge": "dogecoin",
-            "matic": "matic-network",
-            "polygon": "matic-network",
-            "link": "chainlink",
-            "dot": "polkadot",
-            "ltc": "litecoin",
-            "bch": "bitcoin-cash",
-            "xlm": "stellar",
-            "xrp": "ripple",
-            "avax": "avalanche-2",
-            "atom": "cosmos",
-            "near": "near",
-            "ftm": "fantom",
-            "algo": "algorand",
-            "tron": "tron",
-            "trx": "tron",
-            "icp": "internet-computer",
-            "apt": "aptos",
-            "arb": "arbitrum",
-            "op": "optimism",
-            "ldo": "lido-dao",
-            "shib": "shiba-inu",
-            "uni": "uniswap",
-            "mkr": "maker",
-            "crv": "curve-dao-token",
-            "snx": "synthetix-network-token",
-            "comp": "compound-governance-token",
-            "sushi": "sushi"
-        }
-        
-        # Load configuration
-        self.load_config()
-        
-        # Set default icon saat aplikasi dimulai
-        self.update_trend_icon("neutral")
+        # Title/icon hanya ditulis ke status item jika frame berubah
+        self.renderer = StatusRenderer(self.write_title, self.write_icon, self.engine.scheduler)
+        
+        # Frame per coin, di-precompute saat quote baru masuk; (coins, frames)
+        # dipublish sebagai satu tuple sehingga reader tidak perlu lock
+        self.frame_state = ((), {})
+        self.display_prices = (self.engine.display_currency, None)
+        
+        # Time-to-first-frame (detik sejak main.py di-import sampai frame harga pertama)
+        self.first_frame_seconds = None
+        self.engine.metrics.gauge(
+            "time_to_first_frame_seconds", "Startup time until the first price frame was shown",
+            fn=lambda: self.first_frame_seconds)
+        
+        # Load configuration; last known prices dari disk langsung dipakai
+        # sebagai frame pertama (stale) sebelum fetch pertama
+        self.engine.load_config()
+        self.update_frames()
+        self.update_status_bar()
         
         # Setup menu
         self.setup_menu()
         
-        # Start price monitoring
+        # SIGUSR1 toggle profiling
+        self.engine.install_profiling_signal()
+        
+        # Subscribe ke event engine lalu start monitoring
+        self.engine.subscribe(self.on_engine_event)
         self.start_price_monitoring()
     
+    def on_engine_event(self, event, payload):
+        """Handle event dari PriceEngine"""
+        if event == "prices":
+            self.update_frames()
+            self.update_status_bar()
+            # Update menu coins untuk menampilkan harga terbaru
+            self.update_coins_menu()
+        elif event == "notify":
+            rumps.notification(
+                title="CryptoTicker",
+                subtitle=payload['subtitle'],
+                message=payload['message']
+            )
+        elif event == "error":
+            # Set default icon saat error
+            self.show_status("Error")
+        elif event == "breaker":
+            self.update_api_status()
+            self.notify_breaker(payload)
+        elif event == "currency":
+            self.update_menu_checkmarks()
+            self.update_frames()
+            self.update_status_bar()
+            self.update_coins_menu()
+        elif event in ("coins", "cycle_interval"):
+            self.start_coin_cycling()
+        elif event == "reset":
+            self.start_coin_cycling()
+            self.current_coin_index = 0
+            self.update_frames()
+            self.show_status("Loading...")
+    
     def setup_menu(self):
         """Setup aplikasi menu"""
         # Add coins menu with custom input
@@ -168,18 +135,51 @@ class CryptoTicker(rumps.App):
             self.cycling_menu_items[interval] = menu_item
             self.cycling_menu.add(menu_item)
         
-        # Current coins submenu
+        # Display currency submenu (dikonversi lokal dari harga USD)
+        self.currency_menu = rumps.MenuItem("Currency")
+        self.currency_menu_items = {}
+        
+        currency_options = [
+            ("usd", "USD"),
+            ("eur", "EUR"),
+            ("idr", "IDR"),
+            ("jpy", "JPY"),
+            ("btc", "BTC pair"),
+            ("eth", "ETH pair")
+        ]
+        
+        for currency, label in currency_options:
+            menu_item = rumps.MenuItem(label, callback=lambda sender, c=currency: self.set_currency(c))
+            self.currency_menu_items[currency] = menu_item
+            self.currency_menu.add(menu_item)
+        
+        # Current coins submenu, di-update incremental per coin
         self.coins_menu = rumps.MenuItem("Current Coins")
+        self.coins_menu_model = KeyedMenu(
+            self.create_coin_menu_item,
+            self.remove_coin_menu_item,
+            self.set_coin_menu_title,
+        )
+        
+        # Status circuit breaker per endpoint API (read-only)
+        self.api_status_menu = rumps.MenuItem("API: OK")
+        
+        # Opt-in profiling (juga lewat env CRYPTOTICKER_PROFILE=1 atau SIGUSR1)
+        self.profiling_menu = rumps.MenuItem("Profiling", callback=self.toggle_profiling)
+        self.profiling_menu.state = 1 if self.engine.profiler.enabled else 0
         
         # Main menu - added "Reset to Default"
         self.menu = [
             add_coins_menu,
             self.refresh_menu,
             self.cycling_menu,
+            self.currency_menu,
             self.coins_menu,
             rumps.separator,
             rumps.MenuItem("Reset to Default", callback=self.reset_to_default),
             rumps.MenuItem("Manual Refresh", callback=self.manual_refresh),
+            self.api_status_menu,
+            self.profiling_menu,
             rumps.separator,
         ]
         
@@ -187,25 +187,61 @@ class CryptoTicker(rumps.App):
         self.update_menu_checkmarks()
         self.update_coins_menu()
     
+    def update_api_status(self):
+        """Tampilkan endpoint yang circuit-nya tidak closed di menu API status"""
+        down = {endpoint: stats for endpoint, stats in self.engine.circuit_status().items()
+                if stats['state'] != CLOSED}
+        if not down:
+            self.api_status_menu.title = "API: OK"
+            return
+        parts = [f"{endpoint} {stats['state'].replace('_', '-')}" for endpoint, stats in sorted(down.items())]
+        self.api_status_menu.title = f"API: {', '.join(parts)}"
+    
+    def notify_breaker(self, payload):
+        """Notifikasi saat endpoint mulai gagal (open) dan saat pulih (closed)"""
+        if payload['state'] == OPEN and payload['previous'] == CLOSED:
+            rumps.notification(
+                title="CryptoTicker",
+                subtitle="API Unavailable",
+                message=f"{payload['endpoint']} is failing, showing last known prices. "
+                        f"Retrying in {payload['retry_in']:.0f}s"
+            )
+        elif payload['state'] == CLOSED:
+            rumps.notification(
+                title="CryptoTicker",
+                subtitle="API Recovered",
+                message=f"{payload['endpoint']} is responding again"
+            )
+    
     def update_menu_checkmarks(self):
         """Update checkmarks pada menu berdasarkan setting saat ini"""
         # Update refresh interval checkmarks
         for interval, menu_item in self.refresh_menu_items.items():
-            menu_item.state = 1 if interval == self.refresh_interval else 0
+            menu_item.state = 1 if interval == self.engine.refresh_interval else 0
         
         # Update cycling interval checkmarks
         for interval, menu_item in self.cycling_menu_items.items():
-            menu_item.state = 1 if interval == self.coin_cycle_interval else 0
+            menu_item.state = 1 if interval == self.engine.coin_cycle_interval else 0
+        
+        # Update currency checkmarks
+        for currency, menu_item in self.currency_menu_items.items():
+            menu_item.state = 1 if currency == self.engine.display_currency else 0
+    
+    def icon_for_trend(self, trend):
+        """Icon path berdasarkan trend"""
+        if trend == "up":
+            return self.up_icon_path
+        elif trend == "down":
+            return self.down_icon_path
+        return self.default_icon_path
     
-    def update_trend_icon(self, trend):
-        """Update icon berdasarkan trend"""
+    def write_title(self, title):
+        self.title = title
+    
+    def write_icon(self, icon):
+        """Tulis icon ke status item"""
         try:
-            if trend == "up":
-                self.icon = self.up_icon_path
-            elif trend == "down":
-                self.icon = self.down_icon_path
-            else:
-                self.icon = self.default_icon_path
+            self.icon = icon
         except Exception as e:
             print(f"Error updating trend icon: {e}")
             # Fallback ke default icon
@@ -214,425 +250,71 @@ class CryptoTicker(rumps.App):
             except:
                 self.icon = None
     
-    def load_config(self):
-        """Load konfigurasi dari file dengan proper error handling"""
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    
-                    # Validate config structure
-                    if isinstance(config, dict):
-                        # Validate coins list
-                        coins = config.get('coins', ["bitcoin", "ethereum"])
-                        if isinstance(coins, list) and all(isinstance(coin, str) for coin in coins):
-                            self.coins = coins
-                        else:
-                            print("Invalid coins format in config, using defaults")
-                            self.coins = ["bitcoin", "ethereum"]
-                        
-                        # Validate refresh interval - dengan minimum 60 detik
-                        refresh_interval = config.get('refresh_interval', 300) # Changed default to 300
-                        if isinstance(refresh_interval, int) and refresh_interval >= 60:
-                            self.refresh_interval = refresh_interval
-                            self.base_refresh_interval = refresh_interval
-                        else:
-                            print("Invalid refresh interval in config, using default (300s)")
-                            self.refresh_interval = 300
-                            self.base_refresh_interval = 300
-                        
-                        # Validate coin cycle interval
-                        cycle_interval = config.get('coin_cycle_interval', 5) # Changed default to 5
-                        if isinstance(cycle_interval, int) and cycle_interval > 0:
-                            self.coin_cycle_interval = cycle_interval
-                        else:
-                            print("Invalid cycle interval in config, using default (5s)")
-                            self.coin_cycle_interval = 5
-                    else:
-                        print("Invalid config format, using defaults")
-                        self.reset_to_defaults()
-            else:
-                print("Config file not found, using defaults")
-                self.reset_to_defaults()
-                
-        except json.JSONDecodeError as e:
-            print(f"Config file corrupted: {e}, using defaults")
-            self.reset_to_defaults()
-        except Exception as e:
-            print(f"Error loading config: {e}, using defaults")
-            self.reset_to_defaults()
-    
-    def reset_to_defaults(self):
-        """Reset ke konfigurasi default"""
-        with self.coins_lock:
-            self.coins = ["bitcoin", "ethereum"]
-            self.current_coin_index = 0
-        
-        with self.data_lock:
-            self.price_data = {}
-        
-        # Clear cache
-        self.price_cache = {}
-        
-        # Reset intervals
-        self.refresh_interval = 300
-        self.base_refresh_interval = 300
-        self.coin_cycle_interval = 5
-        
-        # Reset rate limiting
-        self.consecutive_rate_limits = 0
-        
-        # Update title
-        self.title = "Loading..."
-    
-    def save_config(self):
-        """Simpan konfigurasi ke file dengan proper error handling"""
-        try:
-            # Save new config
-            config = {
-                'coins': self.coins,
-                'refresh_interval': self.refresh_interval,
-                'coin_cycle_interval': self.coin_cycle_interval
-            }
-            
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
-                
-        except Exception as e:
-            print(f"Error saving config: {e}")
-    
-    def check_rate_limit(self):
-        """Check apakah kita dalam rate limit dan tunggu jika perlu"""
-        current_time = time.time()
-        
-        # Reset counter jika sudah lebih dari 1 menit
-        if current_time - self.api_call_window_start > 60:
-            self.api_call_count = 0
-            self.api_call_window_start = current_time
-        
-        # Tunggu jika terlalu banyak calls dalam 1 menit
-        if self.api_call_count >= self.max_calls_per_minute:
-            sleep_time = 60 - (current_time - self.api_call_window_start)
-            if sleep_time > 0:
-                print(f"Rate limit protection: sleeping for {sleep_time:.1f} seconds")
-                time.sleep(sleep_time)
-                self.api_call_count = 0
-                self.api_call_window_start = time.time()
-        
-        # Tunggu interval minimum antar API calls
-        time_since_last_call = current_time - self.last_api_call
-        if time_since_last_call < self.min_api_interval:
-            sleep_time = self.min_api_interval - time_since_last_call
-            time.sleep(sleep_time)
-        
-        self.last_api_call = time.time()
-        self.api_call_count += 1
-    
-    def make_api_request(self, url, timeout=20):
-        """Make API request with enhanced rate limiting and retry mechanism"""
-        self.check_rate_limit()
-        
-        for attempt in range(self.max_retries):
-            try:
-                response = requests.get(url, timeout=timeout)
-                if response.status_code == 200:
-                    # Reset consecutive rate limits on success
-                    self.consecutive_rate_limits = 0
-                    return response
-                elif response.status_code == 429:  # Rate limit
-                    self.consecutive_rate_limits += 1
-                    backoff_time = self.retry_delay * (2 ** self.consecutive_rate_limits)
-                    print(f"Rate limited (attempt {attempt + 1}), waiting {backoff_time}s...")
-                    time.sleep(backoff_time)
-                    
-                    # Adaptive rate limiting - increase refresh interval
-                    if self.consecutive_rate_limits >= 2:
-                        self.adaptive_rate_limit_adjustment()
-                        
-                else:
-                    print(f"API returned status {response.status_code}")
-                    
-            except requests.exceptions.Timeout:
-                print(f"Request timeout on attempt {attempt + 1}")
-            except requests.exceptions.ConnectionError:
-                print(f"Connection error on attempt {attempt + 1}")
-            except requests.exceptions.RequestException as e:
-                print(f"Request error on attempt {attempt + 1}: {e}")
-            
-            if attempt < self.max_retries - 1:
-                time.sleep(self.retry_delay * (attempt + 1))
-        
-        return None
-    
-    def adaptive_rate_limit_adjustment(self):
-        """Adjust refresh interval berdasarkan rate limiting"""
-        old_interval = self.refresh_interval
-        # Increase interval by 50% with minimum 2 minutes
-        self.refresh_interval = max(120, int(self.refresh_interval * 1.5))
-        
-        if self.refresh_interval != old_interval:
-            print(f"Adaptive rate limiting: refresh interval increased to {self.refresh_interval}s")
-            rumps.notification(
-                title="CryptoTicker",
-                subtitle="Rate Limit Protection",
-                message=f"Refresh interval increased to {self.refresh_interval}s to prevent rate limiting"
-            )
+    def show_status(self, title):
+        """Tampilkan status text (No Coins, Loading..., Error) dengan default icon"""
+        self.renderer.present(Frame(title, self.default_icon_path))
     
-    def get_cached_price(self, coin_id):
-        """Get price dari cache jika masih valid"""
-        if coin_id in self.price_cache:
-            cache_entry = self.price_cache[coin_id]
-            if time.time() - cache_entry['timestamp'] < self.cache_ttl:
-                return cache_entry['data']
-        return None
+    def update_frames(self):
+        """Precompute frame status bar per coin dari quote terbaru"""
+        with self.engine.profiler.stage("update_frames"):
+            self.build_frames()
     
-    def set_cached_price(self, coin_id, data):
-        """Set price ke cache"""
-        self.price_cache[coin_id] = {
-            'data': data,
-            'timestamp': time.time()
-        }
+    def build_frames(self):
+        snapshot = self.engine.snapshot()
+        coins_snapshot = snapshot.coins
+        price_data_snapshot = snapshot.quotes
+        single = len(coins_snapshot) == 1
+        
+        # Harga dalam display currency, satu konversi vektor untuk semua coin
+        currency, prices = self.engine.display_prices()
+        self.display_prices = (currency, prices)
+        
+        frames = {}
+        for coin_id in coins_snapshot:
+            data = price_data_snapshot.get(coin_id)
+            if data is None:
+                continue
+            labels = self.labels.get(coin_id, data, prices.get(coin_id) if prices else None, currency)
+            # Title tanpa trend symbol karena sudah menggunakan icon;
+            # 1 coin ditampilkan langsung dengan persentase change
+            title = labels.title_with_change if single else labels.title
+            frames[coin_id] = Frame(title, self.icon_for_trend(data.trend))
+        
+        self.frame_state = (coins_snapshot, frames)
     
-    def get_multiple_coin_prices(self, coin_ids):
-        """Batch API call untuk multiple coins - OPTIMASI UTAMA"""
-        if not coin_ids:
-            return {}
-        
-        # Check cache first
-        cached_data = {}
-        uncached_coins = []
-        
-        for coin_id in coin_ids:
-            cached = self.get_cached_price(coin_id)
-            if cached:
-                cached_data[coin_id] = cached
-            else:
-                uncached_coins.append(coin_id)
-        
-        if not uncached_coins:
-            return cached_data
-        
-        try:
-            # OPTIMASI: Single API call untuk multiple coins
-            coins_param = ','.join(uncached_coins)
-            url = f"https://api.coingecko.com/api/v3/simple/price?ids={coins_param}&vs_currencies=usd&include_24hr_change=true"
-            
-            response = self.make_api_request(url)
-            if not response:
-                return cached_data
-            
-            price_data = response.json()
-            
-            # Validate response structure
-            if not isinstance(price_data, dict):
-                print("Invalid batch price response structure")
-                return cached_data
-            
-            # Process setiap coin
-            for coin_id in uncached_coins:
-                if coin_id in price_data:
-                    coin_data = price_data[coin_id]
-                    if isinstance(coin_data, dict) and 'usd' in coin_data:
-                        current_price = coin_data['usd']
-                        change_24h = coin_data.get('usd_24h_change', 0)
-                        
-                        # Validate price
-                        if isinstance(current_price, (int, float)) and current_price > 0:
-                            # Gunakan 24h change sebagai trend indicator
-                            trend = "up" if change_24h > 0 else "down" if change_24h < 0 else "neutral"
-                            
-                            coin_info = {
-                                'current_price': current_price,
-                                'open_price': current_price - (current_price * change_24h / 100),
-                                'trend': trend,
-                                'change_percent': change_24h
-                            }
-                            
-                            # Cache the result
-                            self.set_cached_price(coin_id, coin_info)
-                            cached_data[coin_id] = coin_info
-                        else:
-                            print(f"Invalid price for {coin_id}: {current_price}")
-                else:
-                    print(f"No data for {coin_id} in batch response")
-                    
-        except Exception as e:
-            print(f"Error in batch price fetch: {e}")
-        
-        return cached_data
-    
-    def get_coin_price(self, coin_id):
-        """Fallback method untuk single coin - tetap ada untuk compatibility"""
-        batch_data = self.get_multiple_coin_prices([coin_id])
-        return batch_data.get(coin_id)
+    def update_status_bar(self):
+        """Tampilkan frame coin saat ini - thread safe, tanpa format ulang"""
+        with self.engine.profiler.stage("update_status_bar"):
+            self.present_current_frame()
     
-    def update_prices(self):
-        """Update harga semua coins dengan batch API calls - OPTIMASI UTAMA"""
-        with self.coins_lock:
-            coins_snapshot = self.coins.copy()
+    def present_current_frame(self):
+        coins_snapshot, frames = self.frame_state
         
         if not coins_snapshot:
-            self.title = "No Coins"
-            # Set default icon saat tidak ada coins
-            self.update_trend_icon("neutral")
-            return
-            
-        try:
-            # OPTIMASI: Single batch call untuk semua coins
-            print(f"Fetching prices for {len(coins_snapshot)} coins in batch...")
-            new_price_data = self.get_multiple_coin_prices(coins_snapshot)
-            
-            failed_coins = []
-            for coin in coins_snapshot:
-                if coin not in new_price_data:
-                    failed_coins.append(coin)
-            
-            # Update price data dengan lock
-            with self.data_lock:
-                self.price_data = new_price_data
-            
-            # Log statistics
-            success_count = len(new_price_data)
-            total_count = len(coins_snapshot)
-            print(f"Price update: {success_count}/{total_count} coins successful")
-            
-            if failed_coins:
-                print(f"Failed to get prices for: {failed_coins}")
-            
-            self.update_status_bar()
-            # Update menu coins untuk menampilkan harga terbaru
-            self.update_coins_menu()
-            
-        except Exception as e:
-            print(f"Error updating prices: {e}")
-            self.title = "Error"
-            # Set default icon saat error
-            self.update_trend_icon("neutral")
-    
-    def update_status_bar(self):
-        """Update status bar dengan harga - thread safe"""
-        # Get snapshots of data dengan locks
-        with self.data_lock:
-            price_data_snapshot = self.price_data.copy()
-        
-        with self.coins_lock:
-            coins_snapshot = self.coins.copy()
-            current_index = self.current_coin_index
-        
-        if not price_data_snapshot:
-            self.title = "Loading..."
-            # Set default icon saat loading
-            self.update_trend_icon("neutral")
+            self.show_status("No Coins")
             return
         
-        # Jika hanya ada 1 coin, tampilkan langsung
-        if len(coins_snapshot) == 1:
-            coin_id = coins_snapshot[0]
-            if coin_id in price_data_snapshot:
-                data = price_data_snapshot[coin_id]
-                coin_symbol = self.get_symbol_from_coin_id(coin_id)
-                
-                # Update icon berdasarkan trend
-                self.update_trend_icon(data['trend'])
-                
-                # Format price dengan koma ribuan
-                if data['current_price'] < 0.01:
-                    price_str = f"${data['current_price']:.6f}"
-                elif data['current_price'] < 1:
-                    price_str = f"${data['current_price']:.4f}"
-                elif data['current_price'] < 100:
-                    price_str = f"${data['current_price']:,.2f}"
-                else:
-                    price_str = f"${data['current_price']:,.0f}"
-                
-                # Tampilkan persentase change jika significant
-                if abs(data['change_percent']) >= 0.1:
-                    change_str = f" ({data['change_percent']:+.1f}%)"
-                else:
-                    change_str = ""
-                
-                # Title tanpa trend symbol karena sudah menggunakan icon
-                self.title = f"{coin_symbol}: {price_str}{change_str}"
-            else:
-                coin_symbol = self.get_symbol_from_coin_id(coins_snapshot[0])
-                self.title = f"{coin_symbol}: Loading..."
-                # Set default icon saat loading
-                self.update_trend_icon("neutral")
+        if not frames:
+            self.show_status("Loading...")
             return
         
         # Untuk multiple coins, gunakan cycling dengan current index
-        if len(coins_snapshot) > 1:
-            # Pastikan index tidak melebihi jumlah coins (double check)
-            if current_index >= len(coins_snapshot):
-                # Update index dengan lock
-                with self.coins_lock:
-                    self.current_coin_index = 0
-                    current_index = 0
-            
-            current_coin = coins_snapshot[current_index]
-            
-            # Cek apakah data coin tersedia
-            if current_coin not in price_data_snapshot:
-                coin_symbol = self.get_symbol_from_coin_id(current_coin)
-                self.title = f"{coin_symbol}: Loading..."
-                # Set default icon saat loading
-                self.update_trend_icon("neutral")
-                return
-            
-            data = price_data_snapshot[current_coin]
-            coin_symbol = self.get_symbol_from_coin_id(current_coin)
-            
-            # Update icon berdasarkan trend
-            self.update_trend_icon(data['trend'])
-            
-            # Format price dengan koma ribuan
-            if data['current_price'] < 0.01:
-                price_str = f"${data['current_price']:.6f}"
-            elif data['current_price'] < 1:
-                price_str = f"${data['current_price']:.4f}"
-            elif data['current_price'] < 100:
-                price_str = f"${data['current_price']:,.2f}"
-            else:
-                price_str = f"${data['current_price']:,.0f}"
-            
-            # Title tanpa trend symbol karena sudah menggunakan icon
-            self.title = f"{coin_symbol}: {price_str}"
+        # (index di luar range setelah coin dihapus dianggap 0)
+        index = self.current_coin_index
+        current_coin = coins_snapshot[index if index < len(coins_snapshot) else 0]
+        
+        frame = frames.get(current_coin)
+        if frame is None:
+            symbol = self.labels.get(current_coin, None).symbol
+            frame = Frame(f"{symbol}: Loading...", self.default_icon_path)
+        elif self.first_frame_seconds is None:
+            self.first_frame_seconds = time.perf_counter() - STARTED_AT
+            print(f"First price frame after {self.first_frame_seconds * 1000:.0f} ms")
+        self.renderer.present(frame)
     
     def start_price_monitoring(self):
-        """Mulai monitoring harga di background dengan adaptive interval"""
-        def monitor():
-            while self.monitoring_active:
-                try:
-                    self.update_prices()
-                    
-                    # Adaptive refresh interval berdasarkan jumlah coins
-                    current_interval = self.refresh_interval
-                    with self.coins_lock:
-                        coin_count = len(self.coins)
-                    
-                    # Increase interval jika banyak coins
-                    if coin_count > 10:
-                        current_interval = int(current_interval * 1.5)
-                    elif coin_count > 5:
-                        current_interval = int(current_interval * 1.2)
-                    
-                    print(f"Next refresh in {current_interval}s (monitoring {coin_count} coins)")
-                    
-                    # Sleep with small intervals to allow for responsive changes
-                    elapsed = 0
-                    while elapsed < current_interval and self.monitoring_active:
-                        time.sleep(1)
-                        elapsed += 1
-                        
-                except Exception as e:
-                    print(f"Error in monitoring thread: {e}")
-                    time.sleep(30)  # Wait 30 seconds before retrying on error
-        
-        thread = threading.Thread(target=monitor, daemon=True)
-        thread.start()
-        
-        # Initial price update dengan delay
-        threading.Timer(3.0, self.update_prices).start()
+        """Mulai monitoring harga di engine dan coin cycling di UI"""
+        self.engine.start()
         
         # Start coin cycling untuk multiple coins
         self.start_coin_cycling()
@@ -640,17 +322,13 @@ class CryptoTicker(rumps.App):
     def set_refresh_interval(self, interval):
         """Set refresh interval dengan minimum 60 detik"""
         if interval < 60:
-            interval = 60
             rumps.notification(
                 title="CryptoTicker",
                 subtitle="Minimum Interval",
                 message="Minimum refresh interval is 60 seconds to prevent rate limiting"
             )
         
-        self.refresh_interval = interval
-        self.base_refresh_interval = interval
-        self.consecutive_rate_limits = 0  # Reset rate limit counter
-        self.save_config()
+        interval = self.engine.set_refresh_interval(interval)
         self.update_menu_checkmarks()  # Update checkmarks after setting interval
         
         rumps.notification(
@@ -662,8 +340,8 @@ class CryptoTicker(rumps.App):
     def manual_refresh(self, _):
         """Manual refresh dengan rate limiting protection"""
         current_time = time.time()
-        if current_time - self.last_api_call < 10:  # Minimum 10 detik untuk manual refresh
-            remaining = 10 - (current_time - self.last_api_call)
+        if current_time - self.engine.last_api_call < 10:  # Minimum 10 detik untuk manual refresh
+            remaining = 10 - (current_time - self.engine.last_api_call)
             rumps.notification(
                 title="CryptoTicker",
                 subtitle="Rate Limit Protection",
@@ -671,7 +349,7 @@ class CryptoTicker(rumps.App):
             )
             return
         
-        self.update_prices()
+        self.engine.refresh(priority=PRIORITY_INTERACTIVE)
         rumps.notification(
             title="CryptoTicker",
             subtitle="Manual Refresh",
@@ -706,256 +384,161 @@ class CryptoTicker(rumps.App):
     
     def add_coin_by_symbol(self, symbol):
         """Tambah coin berdasarkan symbol"""
-        coin_id = self.get_coin_id_from_symbol(symbol)
+        coin_id = self.engine.get_coin_id_from_symbol(symbol)
         
         if coin_id:
             self.add_coin(coin_id, symbol.upper())
         else:
+            # Saran dari offline index (tanpa API call)
+            suggestions = [s for _, s, _ in self.engine.search_coins(symbol, limit=5)]
+            hint = f" Mungkin: {', '.join(suggestions)}" if suggestions else " Coba symbol lain."
             rumps.notification(
                 title="CryptoTicker",
                 subtitle="Coin Not Found",
-                message=f"Symbol '{symbol.upper()}' tidak ditemukan. Coba symbol lain."
+                message=f"Symbol '{symbol.upper()}' tidak ditemukan.{hint}"
             )
     
     def add_coin(self, coin_id, symbol=None):
-        """Tambah coin baru dengan thread safety"""
-        with self.coins_lock:
-            if coin_id not in self.coins:
-                self.coins.append(coin_id)
-                # Reset index jika ini coin pertama
-                if len(self.coins) == 1:
-                    self.current_coin_index = 0
-                
-                should_save = True
-                display_name = symbol if symbol else coin_id.replace('-', ' ').title()
-                message = f"{display_name} has been added to your watchlist"
-                
-                # Warning jika sudah banyak coins
-                if len(self.coins) > 8:
-                    rumps.notification(
-                        title="CryptoTicker",
-                        subtitle="Performance Warning",
-                        message=f"Monitoring {len(self.coins)} coins. Consider longer refresh intervals."
-                    )
-            else:
-                should_save = False
-                display_name = symbol if symbol else coin_id.replace('-', ' ').title()
-                message = f"{display_name} is already in your watchlist"
+        """Tambah coin baru lewat engine"""
+        display_name = symbol if symbol else coin_id.replace('-', ' ').title()
         
-        if should_save:
-            self.save_config()
+        if self.engine.add_coin(coin_id):
+            coin_count = len(self.engine.snapshot().coins)
+            
+            # Warning jika sudah banyak coins
+            if coin_count > 8:
+                rumps.notification(
+                    title="CryptoTicker",
+                    subtitle="Performance Warning",
+                    message=f"Monitoring {coin_count} coins. Consider longer refresh intervals."
+                )
+            
+            self.update_frames()
             self.update_coins_menu()
             
-            # Fetch data dari API setelah add coin
-            threading.Timer(1.0, self.update_prices).start()
+            # Fetch data dari API setelah add coin (digabung dengan refresh lain)
+            self.engine.schedule_update(1.0, PRIORITY_INTERACTIVE, coins=[coin_id])
             
             rumps.notification(
                 title="CryptoTicker",
                 subtitle="Coin Added",
-                message=f"{message}, fetching latest prices..."
+                message=f"{display_name} has been added to your watchlist, fetching latest prices..."
             )
         else:
             rumps.notification(
                 title="CryptoTicker",
                 subtitle="Coin Already Added",
-                message=message
+                message=f"{display_name} is already in your watchlist"
             )
     
     def remove_coin(self, coin_id):
-        """Hapus coin dari watchlist dengan thread safety"""
-        with self.coins_lock:
-            if coin_id in self.coins:
-                coin_symbol = self.get_symbol_from_coin_id(coin_id)
-                self.coins.remove(coin_id)
-                
-                # Adjust current_coin_index jika diperlukan
-                if self.current_coin_index >= len(self.coins) and len(self.coins) > 0:
-                    self.current_coin_index = 0
-                elif len(self.coins) == 0:
-                    self.current_coin_index = 0
-                
-                should_save = True
-                message = f"{coin_symbol} has been removed from your watchlist"
-            else:
-                should_save = False
-                coin_symbol = self.get_symbol_from_coin_id(coin_id)
-                message = f"{coin_symbol} is not in your watchlist"
-        
-        if should_save:
-            # Remove from price data and cache
-            with self.data_lock:
-                if coin_id in self.price_data:
-                    del self.price_data[coin_id]
-            
-            if coin_id in self.price_cache:
-                del self.price_cache[coin_id]
-            
-            self.save_config()
-            self.update_coins_menu()
-            
-            # Fetch data dari API setelah remove coin (untuk update coin yang tersisa)
-            if len(self.coins) > 0:
-                threading.Timer(1.0, self.update_prices).start()
-                message += ", updating remaining coins..."
-            else:
-                self.title = "No Coins"
-            
-            rumps.notification(
-                title="CryptoTicker",
-                subtitle="Coin Removed",
-                message=message
-            )
-    
-    def update_coins_menu(self):
-        """Update menu coins saat ini dengan proper cleanup"""
-        # Remove all existing items dengan proper error handling
-        try:
-            if hasattr(self.coins_menu, '_menu') and self.coins_menu._menu is not None:
-                self.coins_menu._menu.removeAllItems()
-        except AttributeError as e:
-            print(f"Warning: Could not access menu items: {e}")
-        except Exception as e:
-            print(f"Error removing menu items: {e}")
+        """Hapus coin dari watchlist lewat engine"""
+        coin_symbol = self.engine.get_symbol_from_coin_id(coin_id)
         
-        with self.coins_lock:
-            coins_snapshot = self.coins.copy()
+        if not self.engine.remove_coin(coin_id):
+            return
         
-        with self.data_lock:
-            price_data_snapshot = self.price_data.copy()
+        remaining = len(self.engine.snapshot().coins)
+        self.labels.invalidate([coin_id])
         
-        if not coins_snapshot:
-            try:
-                self.coins_menu.add(rumps.MenuItem("No coins added"))
-            except Exception as e:
-                print(f"Error adding no coins menu item: {e}")
+        # Adjust current_coin_index jika diperlukan
+        if self.current_coin_index >= remaining:
+            self.current_coin_index = 0
+        
+        message = f"{coin_symbol} has been removed from your watchlist"
+        self.update_frames()
+        self.update_coins_menu()
+        
+        # Fetch data dari API setelah remove coin (untuk update coin yang tersisa)
+        if remaining > 0:
+            self.engine.schedule_update(1.0, PRIORITY_INTERACTIVE)
+            message += ", updating remaining coins..."
         else:
-            for coin in coins_snapshot:
-                try:
-                    # Gunakan symbol untuk display yang lebih user-friendly
-                    coin_symbol = self.get_symbol_from_coin_id(coin)
-                    
-                    # Tampilkan harga jika tersedia
-                    if coin in price_data_snapshot:
-                        price_info = price_data_snapshot[coin]
-                        current_price = price_info['current_price']
-                        
-                        # Format price dengan koma ribuan
-                        if current_price < 0.01:
-                            price_str = f"${current_price:.6f}"
-                        elif current_price < 1:
-                            price_str = f"${current_price:.4f}"
-                        elif current_price < 100:
-                            price_str = f"${current_price:,.2f}"
-                        else:
-                            price_str = f"${current_price:,.0f}"
-                        
-                        # Trend indicator
-                        trend = price_info.get('trend', 'neutral')
-                        trend_symbol = "▲" if trend == "up" else "▼" if trend == "down" else "="
-                        
-                        coin_display = f"{coin_symbol}: {price_str} {trend_symbol}"
-                    else:
-                        coin_display = f"{coin_symbol}: Loading..."
-                    
-                    coin_menu = rumps.MenuItem(coin_display)
-                    coin_menu.add(rumps.MenuItem(f"Remove {coin_symbol}", 
-                                               callback=lambda sender, c=coin: self.remove_coin(c)))
-                    self.coins_menu.add(coin_menu)
-                except Exception as e:
-                    print(f"Error adding coin menu item for {coin}: {e}")
+            self.show_status("No Coins")
+        
+        rumps.notification(
+            title="CryptoTicker",
+            subtitle="Coin Removed",
+            message=message
+        )
+    
+    def update_coins_menu(self):
+        """Update menu coins saat ini secara incremental (hanya item yang berubah)"""
+        with self.engine.profiler.stage("update_coins_menu"):
+            self.sync_coins_menu()
     
-    def get_coin_id_from_symbol(self, symbol):
-        """Convert symbol ke CoinGecko ID dengan improved error handling"""
-        symbol = symbol.lower().strip()
+    def sync_coins_menu(self):
+        snapshot = self.engine.snapshot()
+        coins_snapshot = snapshot.coins
+        price_data_snapshot = snapshot.quotes
         
-        # Check mapping lokal first
-        if symbol in self.symbol_to_id:
-            return self.symbol_to_id[symbol]
+        if not coins_snapshot:
+            entries = [(EMPTY_COINS_KEY, "No coins added")]
+        else:
+            # Label (symbol, harga, trend) di-memoize per quote dan currency
+            currency, prices = self.display_prices
+            entries = []
+            for coin in coins_snapshot:
+                price = prices.get(coin) if prices else None
+                labels = self.labels.get(coin, price_data_snapshot.get(coin), price, currency)
+                entries.append((coin, labels.menu))
         
-        # Jika tidak ada di mapping, coba search di CoinGecko
         try:
-            search_url = f"https://api.coingecko.com/api/v3/search?query={symbol}"
-            response = self.make_api_request(search_url)
-            
-            if response:
-                search_data = response.json()
-                coins = search_data.get('coins', [])
-                
-                # Validate response structure
-                if not isinstance(coins, list):
-                    print("Invalid API response structure")
-                    return None
-                
-                # Cari exact match dengan symbol
-                for coin in coins:
-                    if isinstance(coin, dict) and coin.get('symbol', '').lower() == symbol:
-                        return coin.get('id')
-                
-                # Jika tidak ada exact match, ambil yang pertama jika ada
-                if coins and isinstance(coins[0], dict):
-                    return coins[0].get('id')
-            
+            self.coins_menu_model.sync(entries)
         except Exception as e:
-            print(f"Error searching coin: {e}")
-        
-        return None
+            print(f"Error updating coins menu: {e}")
     
-    def get_symbol_from_coin_id(self, coin_id):
-        """Convert coin ID ke symbol untuk display"""
-        # Reverse lookup dari mapping
-        for symbol, id_value in self.symbol_to_id.items():
-            if id_value == coin_id:
-                return symbol.upper()
-        
-        # Jika tidak ada di mapping, gunakan coin ID yang diformat
-        if coin_id == "bitcoin":
-            return "BTC"
-        elif coin_id == "ethereum":
-            return "ETH"
-        elif coin_id == "binancecoin":
-            return "BNB"
-        else:
-            # Fallback: ambil bagian pertama dari coin ID
-            return coin_id.split('-')[0].upper()[:4]
+    def create_coin_menu_item(self, coin, title):
+        """Buat MenuItem (beserta submenu Remove) untuk coin yang baru masuk watchlist"""
+        coin_menu = rumps.MenuItem(title)
+        if coin != EMPTY_COINS_KEY:
+            coin_symbol = self.engine.get_symbol_from_coin_id(coin)
+            coin_menu.add(rumps.MenuItem(f"Remove {coin_symbol}",
+                                         callback=lambda sender, c=coin: self.remove_coin(c)))
+        # Key menu = coin id, jadi title boleh berubah tanpa rebuild
+        self.coins_menu[coin] = coin_menu
+        return coin_menu
+    
+    def remove_coin_menu_item(self, coin, coin_menu):
+        del self.coins_menu[coin]
+    
+    def set_coin_menu_title(self, coin_menu, title):
+        coin_menu.title = title
     
     def start_coin_cycling(self):
-        """Mulai cycling antar coins jika ada multiple coins"""
-        def cycle_loop():
-            while self.monitoring_active:
-                try:
-                    with self.coins_lock:
-                        coin_count = len(self.coins)
-                    
-                    if coin_count > 1:
-                        for _ in range(self.coin_cycle_interval * 10):
-                            if not self.monitoring_active:
-                                return
-                            time.sleep(0.1)
-                        self.cycle_to_next_coin()
-                    else:
-                        time.sleep(2)
-                except Exception as e:
-                    print(f"Error in coin cycling: {e}")
-                    time.sleep(2)
-        
-        thread = threading.Thread(target=cycle_loop, daemon=True)
-        thread.start()
+        """Jadwalkan cycling antar coins jika ada multiple coins (tanpa polling loop)"""
+        coin_count = len(self.engine.snapshot().coins)
+        scheduler = self.engine.scheduler
+        
+        if coin_count > 1 and self.engine.monitoring_active:
+            if scheduler.is_scheduled("cycle"):
+                # Interval baru langsung berlaku, dihitung dari switch terakhir
+                scheduler.reschedule("cycle")
+            else:
+                scheduler.schedule("cycle", self.cycle_to_next_coin,
+                                   delay=self.engine.coin_cycle_interval,
+                                   interval=lambda: self.engine.coin_cycle_interval)
+        else:
+            scheduler.cancel("cycle")
     
     def cycle_to_next_coin(self):
         """Pindah ke coin berikutnya tanpa animation dengan thread safety"""
-        with self.coins_lock:
-            if len(self.coins) <= 1:
-                return
-            
-            # Pindah sederhana ke coin berikutnya (looping)
-            self.current_coin_index = (self.current_coin_index + 1) % len(self.coins)
+        with self.engine.profiler.cycle("cycle_tick"):
+            self.advance_coin()
+    
+    def advance_coin(self):
+        coin_count = len(self.engine.snapshot().coins)
+        if coin_count <= 1:
+            return
+        
+        # Pindah sederhana ke coin berikutnya (looping); hanya cycle job yang menulis
+        self.current_coin_index = (self.current_coin_index + 1) % coin_count
         
         self.update_status_bar()
     
     def set_cycle_interval(self, interval):
         """Set coin cycling interval"""
-        self.coin_cycle_interval = interval
-        self.save_config()
+        self.engine.set_cycle_interval(interval)
         self.update_menu_checkmarks()  # Update checkmarks after setting interval
         rumps.notification(
             title="CryptoTicker",
@@ -963,15 +546,36 @@ class CryptoTicker(rumps.App):
             message=f"Coin switching interval set to {interval} seconds"
         )
 
+    def set_currency(self, currency):
+        """Set display currency; konversi dihitung lokal tanpa API call tambahan"""
+        self.engine.set_currency(currency)
+        rumps.notification(
+            title="CryptoTicker",
+            subtitle="Currency Updated",
+            message=f"Prices are now shown in {currency.upper()}"
+        )
+
+    def toggle_profiling(self, sender):
+        """Toggle profiling mode dari menu"""
+        enabled = self.engine.toggle_profiling()
+        sender.state = 1 if enabled else 0
+        rumps.notification(
+            title="CryptoTicker",
+            subtitle="Profiling " + ("Enabled" if enabled else "Disabled"),
+            message=f"Profiles are written to {self.engine.profiler.directory}" if enabled
+                    else "Profiling stopped"
+        )
+
     def reset_to_default(self, _):
         """Reset ke konfigurasi default dan update menu"""
-        self.reset_to_defaults()
-        self.save_config()
+        self.engine.reset_to_defaults()
+        self.engine.save_config()
         self.update_menu_checkmarks()
+        self.update_frames()
         self.update_coins_menu()
         
         # Fetch data dari API setelah reset
-        threading.Timer(1.0, self.update_prices).start()
+        self.engine.schedule_update(1.0, PRIORITY_INTERACTIVE)
         
         rumps.notification(
             title="CryptoTicker",
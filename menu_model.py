@@ -0,0 +1,80 @@
+"""
+Keyed menu model untuk update "Current Coins" secara incremental.
+
+Model menyimpan item per key (coin id) dan hanya memanggil callback UI
+untuk item yang benar-benar berubah: create untuk key baru, remove untuk
+key yang hilang, set_title untuk title yang berubah. Tidak ada dependency
+ke rumps, jadi bisa dipakai (dan diukur) tanpa status bar.
+"""
+
+import threading
+
+
+class KeyedMenu:
+    def __init__(self, create_item, remove_item, set_title):
+        # create_item(key, title) -> handle; remove_item(key, handle); set_title(handle, title)
+        self.create_item = create_item
+        self.remove_item = remove_item
+        self.set_title = set_title
+
+        self.items = {}  # key -> [handle, title]
+        self.order = []
+        self.lock = threading.Lock()
+
+        # Counters
+        self.syncs = 0
+        self.created = 0
+        self.removed = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.rebuilds = 0
+
+    def sync(self, entries):
+        """Samakan menu dengan entries (list of (key, title) berurutan)"""
+        with self.lock:
+            self.syncs += 1
+            keys = [key for key, _ in entries]
+            wanted = set(keys)
+
+            # Hapus item yang tidak ada lagi
+            for key in [key for key in self.order if key not in wanted]:
+                handle, _ = self.items.pop(key)
+                self.remove_item(key, handle)
+                self.removed += 1
+            self.order = [key for key in self.order if key in wanted]
+
+            # Item baru hanya bisa di-append; jika urutan item lama berubah, rebuild
+            kept = [key for key in keys if key in self.items]
+            if kept != self.order:
+                self.rebuilds += 1
+                for key in self.order:
+                    handle, _ = self.items.pop(key)
+                    self.remove_item(key, handle)
+                    self.removed += 1
+                self.order = []
+
+            for key, title in entries:
+                item = self.items.get(key)
+                if item is None:
+                    self.items[key] = [self.create_item(key, title), title]
+                    self.order.append(key)
+                    self.created += 1
+                elif item[1] != title:
+                    self.set_title(item[0], title)
+                    item[1] = title
+                    self.updated += 1
+                else:
+                    self.unchanged += 1
+
+    def stats(self):
+        """Counters untuk memastikan steady state tidak membuat item baru"""
+        with self.lock:
+            return {
+                'items': len(self.items),
+                'syncs': self.syncs,
+                'created': self.created,
+                'removed': self.removed,
+                'updated': self.updated,
+                'unchanged': self.unchanged,
+                'rebuilds': self.rebuilds,
+            }
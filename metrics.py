@@ -0,0 +1,287 @@
+"""
+Metrics registry (counter, gauge, histogram) dengan export Prometheus text
+format dan JSON snapshot, plus HTTP server kecil untuk scrape lokal:
+
+    GET /metrics       Prometheus text exposition format
+    GET /metrics.json  JSON snapshot
+
+Server bisa listen di TCP port lokal atau Unix socket.
+"""
+
+import bisect
+import json
+import math
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def endpoint_for(url):
+    """Label endpoint dari url API, mis. .../api/v3/simple/price?ids=.. -> simple/price"""
+    path = urlparse(url).path
+    marker = '/api/v3/'
+    if marker in path:
+        path = path.split(marker, 1)[1]
+    return path.strip('/') or '/'
+
+
+def format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and math.isnan(value):
+        return "NaN"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def json_safe(value):
+    """NaN/Inf -> None (JSON tidak punya NaN); dict diproses rekursif"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    return value
+
+
+def format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), fn=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values = {}  # label values tuple -> value
+        self.fn = fn  # Dievaluasi saat scrape (tanpa labels); None dari fn = belum ada sample
+
+    def current(self):
+        try:
+            return self.fn()
+        except Exception:
+            return math.nan
+
+    def key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """List of (suffix, label values, extra label, value)"""
+        if self.fn is not None:
+            value = self.current()
+            return [] if value is None else [('', (), None, value)]
+        with self.lock:
+            return [('', key, None, value) for key, value in sorted(self.values.items())]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{format_labels(self.labelnames, key, extra)} {format_value(value)}")
+        return lines
+
+    def snapshot(self):
+        if self.fn is not None:
+            return self.current()
+        with self.lock:
+            if not self.labelnames:
+                return self.values.get((), 0)
+            return {",".join(key): value for key, value in sorted(self.values.items())}
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self.values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                samples.append(('_bucket', key, ('le', format_value(float(bound))), cumulative))
+            samples.append(('_bucket', key, ('le', '+Inf'), count))
+            samples.append(('_sum', key, None, total))
+            samples.append(('_count', key, None, count))
+        return samples
+
+    def snapshot(self):
+        result = {}
+        with self.lock:
+            for key, (counts, total, count) in sorted(self.values.items()):
+                cumulative, buckets = 0, {}
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    buckets[format_value(float(bound))] = cumulative
+                buckets['+Inf'] = count
+                result[",".join(key)] = {'count': count, 'sum': total, 'buckets': buckets}
+        if not self.labelnames:
+            return result.get('', {'count': 0, 'sum': 0.0, 'buckets': {}})
+        return result
+
+
+class MetricsRegistry:
+    def __init__(self, prefix="cryptoticker"):
+        self.prefix = prefix
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def full_name(self, name):
+        return f"{self.prefix}_{name}" if self.prefix else name
+
+    def counter(self, name, documentation, labelnames=(), fn=None):
+        # fn: total yang sudah dihitung di tempat lain (harus monotonic)
+        return self.register(Counter(self.full_name(name), documentation, labelnames, fn))
+
+    def gauge(self, name, documentation, labelnames=(), fn=None):
+        return self.register(Gauge(self.full_name(name), documentation, labelnames, fn))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(self.full_name(name), documentation, labelnames, buckets))
+
+    def render_prometheus(self):
+        """Semua metric dalam Prometheus text exposition format"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Semua metric sebagai dict (untuk JSON); NaN/Inf menjadi None"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return {metric.name: json_safe(metric.snapshot()) for metric in metrics}
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def address_string(self):
+        # Unix socket tidak punya (host, port)
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def do_GET(self):
+        registry = self.server.registry
+        path = urlparse(self.path).path
+        if path in ('/', '/metrics'):
+            body = registry.render_prometheus().encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == '/metrics.json':
+            body = json.dumps(registry.snapshot(), default=str, allow_nan=False).encode()
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class MetricsServer:
+    def __init__(self, registry, host="127.0.0.1", port=9464, unix_socket=None):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.httpd = None
+
+    @property
+    def address(self):
+        if self.unix_socket:
+            return f"unix:{self.unix_socket}"
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self):
+        """Start server di background thread, return self"""
+        if self.unix_socket:
+            if os.path.exists(self.unix_socket):
+                os.unlink(self.unix_socket)
+            self.httpd = UnixHTTPServer(self.unix_socket, MetricsHandler)
+        else:
+            self.httpd = ThreadingHTTPServer((self.host, self.port), MetricsHandler)
+            self.httpd.daemon_threads = True
+            self.port = self.httpd.server_address[1]
+        self.httpd.registry = self.registry
+        threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.httpd is None:
+            return
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.httpd = None
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            os.unlink(self.unix_socket)
@@ -0,0 +1,296 @@
+"""
+Opt-in profiling untuk refresh dan render pipeline.
+
+Saat aktif (env CRYPTOTICKER_PROFILE=1, menu "Profiling", atau SIGUSR1):
+
+- setiap cycle (refresh, cycle tick) mencatat durasi per stage ke
+  cycles.jsonl
+- cProfile dump (.prof) disimpan untuk N cycle paling lambat
+- tracemalloc snapshot diambil berkala, beserta diff top allocation
+  terhadap snapshot sebelumnya (untuk mencari leak di long run)
+
+Semua output ada di satu directory dengan rotasi jumlah file. Saat tidak
+aktif, stage() dan cycle() hanya mengembalikan null context.
+"""
+
+import contextlib
+import cProfile
+import glob
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+ENV_VAR = "CRYPTOTICKER_PROFILE"
+NULL_CONTEXT = contextlib.nullcontext()
+
+
+def env_enabled():
+    return os.environ.get(ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class Stage:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.record_stage(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Cycle:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.stages = {}
+        self.profile = None
+        self.start = None
+
+    def __enter__(self):
+        self.profiler.local.cycle = self
+        # cProfile hanya untuk satu cycle sekaligus
+        if self.profiler.profile_lock.acquire(blocking=False):
+            self.profile = cProfile.Profile()
+            try:
+                self.profile.enable()
+            except ValueError:
+                # Profiler lain sedang aktif (mis. debugger)
+                self.profile = None
+                self.profiler.profile_lock.release()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        if self.profile is not None:
+            self.profile.disable()
+            self.profiler.profile_lock.release()
+        self.profiler.local.cycle = None
+        self.profiler.finish_cycle(self, duration, failed=exc_type is not None)
+        return False
+
+
+class Profiler:
+    def __init__(self, directory="profiles", keep_slowest=5, snapshot_interval=600,
+                 max_snapshots=10, max_cycle_log_bytes=5 * 1024 * 1024):
+        self.directory = directory
+        self.keep_slowest = keep_slowest
+        self.snapshot_interval = snapshot_interval
+        self.max_snapshots = max_snapshots
+        self.max_cycle_log_bytes = max_cycle_log_bytes
+
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.profile_lock = threading.Lock()
+        self.local = threading.local()
+
+        self.stage_stats = {}  # stage -> [count, total, max]
+        self.slowest = []  # [(duration, path)] untuk cProfile dumps yang disimpan
+        self.cycles = 0
+        self.previous_snapshot = None
+        self.started_tracemalloc = False
+
+    # ------------------------------------------------------------------
+    # Toggle
+    # ------------------------------------------------------------------
+
+    def enable(self):
+        with self.lock:
+            if self.enabled:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            self.enabled = True
+            self.slowest = self.existing_dumps()
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self.started_tracemalloc = True
+        print(f"Profiling enabled, output in {os.path.abspath(self.directory)}")
+
+    def disable(self):
+        with self.lock:
+            if not self.enabled:
+                return
+            self.enabled = False
+            self.previous_snapshot = None
+            if self.started_tracemalloc:
+                tracemalloc.stop()
+                self.started_tracemalloc = False
+        print("Profiling disabled")
+
+    def toggle(self):
+        """Toggle profiling, return state baru"""
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+        return self.enabled
+
+    # ------------------------------------------------------------------
+    # Instrumentation
+    # ------------------------------------------------------------------
+
+    def cycle(self, name):
+        """Context manager untuk satu pipeline cycle (cycle di dalam cycle dihitung sebagai stage)"""
+        if not self.enabled:
+            return NULL_CONTEXT
+        if getattr(self.local, 'cycle', None) is not None:
+            return Stage(self, name)
+        return Cycle(self, name)
+
+    def stage(self, name):
+        """Context manager untuk satu stage di dalam cycle"""
+        if not self.enabled:
+            return NULL_CONTEXT
+        return Stage(self, name)
+
+    def record_stage(self, name, duration):
+        cycle = getattr(self.local, 'cycle', None)
+        if cycle is not None:
+            cycle.stages[name] = cycle.stages.get(name, 0.0) + duration
+        with self.lock:
+            stats = self.stage_stats.get(name)
+            if stats is None:
+                stats = self.stage_stats[name] = [0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+
+    def finish_cycle(self, cycle, duration, failed=False):
+        self.record_stage(cycle.name, duration)
+        timestamp = time.time()
+        entry = {
+            'timestamp': timestamp,
+            'cycle': cycle.name,
+            'duration_ms': duration * 1000,
+            'stages_ms': {name: value * 1000 for name, value in cycle.stages.items()},
+            'failed': failed,
+        }
+
+        with self.lock:
+            self.cycles += 1
+            if not self.enabled:
+                return
+            self.append_cycle_log(entry)
+            if cycle.profile is not None:
+                self.keep_if_slow(cycle, duration, timestamp)
+
+    def append_cycle_log(self, entry):
+        # Dipanggil dengan self.lock dipegang; rotasi ke cycles.jsonl.1 jika penuh
+        path = os.path.join(self.directory, "cycles.jsonl")
+        try:
+            if os.path.exists(path) and os.path.getsize(path) > self.max_cycle_log_bytes:
+                os.replace(path, path + ".1")
+            with open(path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"Error writing profile cycle log: {e}")
+
+    def keep_if_slow(self, cycle, duration, timestamp):
+        # Dipanggil dengan self.lock dipegang
+        if self.keep_slowest <= 0:
+            return
+        if len(self.slowest) >= self.keep_slowest and duration <= self.slowest[0][0]:
+            return
+
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(timestamp))
+        path = os.path.join(self.directory, f"{cycle.name}-{stamp}-{self.cycles}-{duration * 1000:.0f}ms.prof")
+        try:
+            cycle.profile.dump_stats(path)
+        except OSError as e:
+            print(f"Error writing profile dump: {e}")
+            return
+
+        self.slowest.append((duration, path))
+        self.slowest.sort()
+        while len(self.slowest) > self.keep_slowest:
+            _, evicted = self.slowest.pop(0)
+            try:
+                os.remove(evicted)
+            except OSError:
+                pass
+
+    def existing_dumps(self):
+        """Dump dari sesi sebelumnya (durasi dibaca dari nama file)"""
+        dumps = []
+        for path in glob.glob(os.path.join(self.directory, "*.prof")):
+            try:
+                duration = float(path.rsplit('-', 1)[1][:-len("ms.prof")]) / 1000
+            except (IndexError, ValueError):
+                continue
+            dumps.append((duration, path))
+        dumps.sort()
+        return dumps[-self.keep_slowest:] if self.keep_slowest else []
+
+    # ------------------------------------------------------------------
+    # Memory snapshots
+    # ------------------------------------------------------------------
+
+    def take_snapshot(self, top=25):
+        """Simpan tracemalloc snapshot dan diff top allocation terhadap snapshot sebelumnya"""
+        if not self.enabled or not tracemalloc.is_tracing():
+            return None
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        current, peak = tracemalloc.get_traced_memory()
+
+        lines = [f"traced current={current / 1024:.1f} KiB peak={peak / 1024:.1f} KiB"]
+        if self.previous_snapshot is not None:
+            lines.append(f"top {top} growth since previous snapshot:")
+            stats = snapshot.compare_to(self.previous_snapshot, 'lineno')
+        else:
+            lines.append(f"top {top} allocations:")
+            stats = snapshot.statistics('lineno')
+        lines.extend(str(stat) for stat in stats[:top])
+        self.previous_snapshot = snapshot
+
+        path = os.path.join(self.directory, f"memory-{stamp}.txt")
+        try:
+            snapshot.dump(os.path.join(self.directory, f"memory-{stamp}.snapshot"))
+            with open(path, 'w') as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            print(f"Error writing memory snapshot: {e}")
+            return None
+
+        self.rotate("memory-*.snapshot", self.max_snapshots)
+        self.rotate("memory-*.txt", self.max_snapshots)
+        return path
+
+    def rotate(self, pattern, keep):
+        """Hapus file lama yang cocok dengan pattern, sisakan keep terbaru"""
+        paths = sorted(glob.glob(os.path.join(self.directory, pattern)), key=os.path.getmtime)
+        for path in paths[:-keep] if keep else paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        """Ringkasan per stage: count, mean dan max (ms)"""
+        with self.lock:
+            return {
+                'enabled': self.enabled,
+                'cycles': self.cycles,
+                'stages': {
+                    name: {
+                        'count': count,
+                        'mean_ms': total / count * 1000 if count else 0.0,
+                        'max_ms': worst * 1000,
+                    }
+                    for name, (count, total, worst) in self.stage_stats.items()
+                },
+                'slowest_dumps': [path for _, path in reversed(self.slowest)],
+            }
@@ -0,0 +1,418 @@
+"""
+Price providers dan hedged fetching.
+
+CoinGecko tetap primary provider. Provider tambahan (exchange-style REST
+ticker API) bisa dipasang sebagai secondary. HedgedFetcher mengirim request
+ke primary; jika belum ada jawaban setelah hedge delay (p95 latency primary
+terakhir), coin yang sama diminta juga ke secondary dan response valid
+pertama yang menang. Symbol exchange (BTCUSDT) dinormalisasi ke coin id.
+
+Hedge delay dan latency sample dihitung dari saat request benar-benar
+dikirim ke upstream (setelah rate limit token didapat), bukan dari submit;
+waktu antri di rate limiter lokal bukan latency provider. Request yang
+kalah dan masih antri di limiter dibatalkan supaya tidak memakai token.
+
+Benchmark tail latency secara offline dengan stand-in server lokal:
+
+    python3 providers.py --requests 200 --tail-probability 0.05 --tail-latency 2
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from quotes import Quote
+from transport import percentile, summarize_latencies
+
+
+def make_quote(price, change_percent, timestamp=None, source=None):
+    """Quote dalam format yang sama dengan parse_price_response"""
+    return Quote(price, change_percent, timestamp, source=source)
+
+
+class FetchAttempt:
+    """Satu request ke provider: kapan benar-benar dikirim, dan sinyal batal
+
+    Provider memanggil mark_started() tepat sebelum request dikirim ke
+    upstream (setelah rate limit token didapat). cancel() hanya berlaku
+    selama request belum dikirim, mis. masih antri di rate limiter.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = Future()  # Selesai saat request dikirim (bisa dipakai di wait())
+        self.started_at = None  # time.monotonic() saat dikirim
+        self.cancelled = False
+        self.cancel_callbacks = []
+
+    def mark_started(self):
+        """Tandai request dikirim; False jika sudah dibatalkan (request jangan dikirim)"""
+        with self.lock:
+            if self.cancelled:
+                return False
+            if self.started_at is not None:
+                return True
+            self.started_at = time.monotonic()
+        self.started.set_result(self.started_at)
+        return True
+
+    def cancel(self):
+        """Batalkan request yang belum dikirim, return True jika berhasil dibatalkan"""
+        with self.lock:
+            if self.cancelled or self.started_at is not None:
+                return False
+            self.cancelled = True
+            callbacks = self.cancel_callbacks
+            self.cancel_callbacks = []
+        for callback in callbacks:
+            callback()
+        return True
+
+    def on_cancel(self, callback):
+        """Panggil callback saat dibatalkan (langsung jika sudah dibatalkan)"""
+        with self.lock:
+            if not self.cancelled:
+                self.cancel_callbacks.append(callback)
+                return
+        callback()
+
+
+class PriceProvider:
+    """Base class: fetch(coin_ids, priority, deadline, attempt) -> dict coin_id -> Quote (boleh partial)
+
+    deadline (time.monotonic(), None = tanpa batas) adalah batas waktu
+    refresh; provider tidak boleh menunggu melewatinya. attempt (FetchAttempt
+    atau None): panggil attempt.mark_started() tepat sebelum request dikirim
+    dan batalkan request jika return False.
+    """
+
+    name = "provider"
+
+    def fetch(self, coin_ids, priority=None, deadline=None, attempt=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class CoinGeckoProvider(PriceProvider):
+    name = "coingecko"
+
+    def __init__(self, fetch_chunk):
+        # fetch_chunk = PriceEngine.fetch_price_chunk (rate limit, retry dan cache di engine)
+        self.fetch_chunk = fetch_chunk
+
+    def fetch(self, coin_ids, priority=None, deadline=None, attempt=None):
+        return self.fetch_chunk(coin_ids, priority, deadline, attempt)
+
+
+class ExchangeTickerProvider(PriceProvider):
+    """Exchange-style REST API: GET /api/v3/ticker/24hr?symbols=["BTCUSDT",...]"""
+
+    def __init__(self, name, base_url, transport, symbol_for, quote_asset="USDT", timeout=5.0):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.transport = transport
+        self.symbol_for = symbol_for  # coin_id -> symbol pasti (BTC), None jika tidak diketahui
+        self.quote_asset = quote_asset.upper()
+        self.timeout = timeout
+
+    def pair_for(self, coin_id):
+        """Pair exchange (BTCUSDT), None jika symbol coin tidak diketahui pasti"""
+        symbol = self.symbol_for(coin_id)
+        if not symbol:
+            return None
+        return f"{symbol.upper()}{self.quote_asset}"
+
+    def fetch(self, coin_ids, priority=None, deadline=None, attempt=None):
+        # Normalisasi: pair exchange -> coin id yang diminta; coin tanpa symbol
+        # pasti (pair tebakan bisa milik coin lain) dan symbol yang dipakai
+        # lebih dari satu coin id di-skip
+        pair_to_coin = {}
+        ambiguous = set()
+        for coin_id in coin_ids:
+            pair = self.pair_for(coin_id)
+            if pair is None:
+                continue
+            if pair in pair_to_coin:
+                ambiguous.add(pair)
+            pair_to_coin[pair] = coin_id
+        for pair in ambiguous:
+            del pair_to_coin[pair]
+        if not pair_to_coin:
+            return {}
+
+        timeout = self.timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                return {}
+        if attempt is not None and not attempt.mark_started():
+            return {}
+
+        symbols = json.dumps(sorted(pair_to_coin), separators=(',', ':'))
+        response = self.transport.get(f"{self.base_url}/api/v3/ticker/24hr?symbols={symbols}",
+                                      timeout=timeout, deadline=deadline)
+        if response.status_code != 200:
+            return {}
+
+        results = {}
+        tickers = response.json()
+        if not isinstance(tickers, list):
+            return results
+        for ticker in tickers:
+            if not isinstance(ticker, dict):
+                continue
+            coin_id = pair_to_coin.get(str(ticker.get('symbol', '')).upper())
+            if coin_id is None:
+                continue
+            try:
+                price = float(ticker['lastPrice'])
+                change = float(ticker.get('priceChangePercent', 0))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if price <= 0:
+                continue
+            close_time = ticker.get('closeTime')
+            timestamp = close_time / 1000.0 if isinstance(close_time, (int, float)) else None
+            results[coin_id] = make_quote(price, change, timestamp, source=self.name)
+        return results
+
+
+class HedgedFetcher:
+    def __init__(self, providers, hedge_percentile=95, min_delay=0.05, max_delay=2.0,
+                 default_delay=0.5, timeout=60.0, max_workers=8, max_samples=256):
+        self.providers = list(providers)  # providers[0] = primary
+        self.hedge_percentile = hedge_percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay  # Dipakai sebelum cukup latency sample
+        self.timeout = timeout
+        self.max_workers = max_workers
+
+        self.latencies = {}  # provider name -> deque latency (detik)
+        self.max_samples = max_samples
+        self.lock = threading.Lock()
+        self.executor = None
+
+        # Statistik
+        self.requests = 0
+        self.hedges = 0
+        self.cancelled = 0  # Request kalah yang dibatalkan sebelum dikirim
+        self.wins = {}  # provider name -> jumlah response yang menang
+
+    def add_provider(self, provider):
+        with self.lock:
+            self.providers.append(provider)
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                   thread_name_prefix="price-hedge")
+            return self.executor
+
+    def record_latency(self, provider, seconds):
+        with self.lock:
+            samples = self.latencies.get(provider.name)
+            if samples is None:
+                samples = self.latencies[provider.name] = deque(maxlen=self.max_samples)
+            samples.append(seconds)
+
+    def hedge_delay(self):
+        """Delay sebelum hedge = p95 latency primary (dibatasi min/max)"""
+        with self.lock:
+            samples = list(self.latencies.get(self.providers[0].name, ()))
+        if len(samples) < 10:
+            return self.default_delay
+        return min(self.max_delay, max(self.min_delay, percentile(samples, self.hedge_percentile)))
+
+    def call(self, provider, coin_ids, priority, deadline=None, attempt=None):
+        if attempt is None:
+            attempt = FetchAttempt()
+        try:
+            return provider.fetch(coin_ids, priority, deadline, attempt) or {}
+        except Exception as e:
+            print(f"Provider {provider.name} failed: {e}")
+            return {}
+        finally:
+            # Latency upstream saja; request yang tidak pernah dikirim tidak dihitung
+            if attempt.started_at is not None:
+                self.record_latency(provider, time.monotonic() - attempt.started_at)
+
+    def fetch(self, coin_ids, priority=None, deadline=None):
+        """Fetch coin_ids dari primary, hedge ke secondary jika primary lambat"""
+        with self.lock:
+            self.requests += 1
+            providers = list(self.providers)
+
+        primary = providers[0]
+        if len(providers) == 1:
+            results = self.call(primary, coin_ids, priority, deadline)
+            if results:
+                self.count_win(primary.name)
+            return results
+
+        executor = self.get_executor()
+        wait_until = time.monotonic() + self.timeout
+        if deadline is not None:
+            wait_until = min(wait_until, deadline)
+        attempt = FetchAttempt()
+        pending = {executor.submit(self.call, primary, coin_ids, priority, deadline, attempt): (primary, attempt)}
+        secondaries = iter(providers[1:])
+        results = {}
+        wanted = set(coin_ids)
+
+        # Hedge timer mulai saat request terakhir benar-benar dikirim (timed),
+        # lalu request yang sama dikirim ke secondary setelah hedge delay
+        timed = attempt
+        next_hedge = None
+        hedging = True
+        while pending:
+            now = time.monotonic()
+            if now >= wait_until:
+                break
+            if timed is not None and timed.started_at is not None:
+                next_hedge = timed.started_at + self.hedge_delay()
+                timed = None
+
+            timeout = min(wait_until, next_hedge) - now if next_hedge is not None else wait_until - now
+            watched = set(pending)
+            if timed is not None:
+                watched.add(timed.started)
+            done, _ = wait(watched, timeout=max(0.0, timeout), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                if future not in pending:
+                    continue  # Sinyal request dikirim
+                provider, finished = pending.pop(future)
+                response = future.result()
+                new = {c: q for c, q in response.items() if c in wanted and c not in results}
+                if new:
+                    results.update(new)
+                    self.count_win(provider.name)
+                if finished is timed:
+                    # Selesai tanpa hasil lengkap; jika tidak pernah dikirim (mis.
+                    # circuit open) langsung hedge, jika sudah dikirim setelah delay
+                    timed = None
+                    started_at = finished.started_at
+                    next_hedge = started_at + self.hedge_delay() if started_at is not None else time.monotonic()
+
+            if wanted.issubset(results):
+                break
+
+            # Hedge berikutnya: saat delay habis, atau langsung jika semua request gagal/partial
+            if hedging and (not pending or (next_hedge is not None and time.monotonic() >= next_hedge)):
+                provider = next(secondaries, None)
+                if provider is None:
+                    hedging = False
+                else:
+                    missing = [c for c in coin_ids if c not in results]
+                    attempt = FetchAttempt()
+                    pending[executor.submit(self.call, provider, missing, priority, deadline, attempt)] = (
+                        provider, attempt)
+                    with self.lock:
+                        self.hedges += 1
+                    timed = attempt
+                    next_hedge = None
+
+        # Request yang kalah dan masih antri di rate limiter dibatalkan (tanpa
+        # token dan API call); yang sudah dikirim dibiarkan selesai di
+        # background (hasilnya tetap masuk cache)
+        cancelled = sum(1 for _, attempt in pending.values() if attempt.cancel())
+        if cancelled:
+            with self.lock:
+                self.cancelled += cancelled
+        return results
+
+    def count_win(self, name):
+        with self.lock:
+            self.wins[name] = self.wins.get(name, 0) + 1
+
+    def stats(self):
+        with self.lock:
+            latencies = {name: summarize_latencies(list(samples)) for name, samples in self.latencies.items()}
+            return {
+                'providers': [provider.name for provider in self.providers],
+                'requests': self.requests,
+                'hedges': self.hedges,
+                'cancelled': self.cancelled,
+                'wins': dict(self.wins),
+                'latency': latencies,
+            }
+
+    def shutdown(self):
+        with self.lock:
+            executor = self.executor
+            self.executor = None
+            providers = list(self.providers)
+        if executor is not None:
+            executor.shutdown(wait=False)
+        for provider in providers:
+            provider.close()
+
+
+def main():
+    """Benchmark tail latency: primary saja vs hedged ke secondary (stand-in lokal)"""
+    import argparse
+
+    from engine import PriceEngine
+    from fake_coingecko import FakeCoinGeckoServer
+    from fake_exchange import FakeTickerApiServer
+    from rate_limiter import TokenBucketLimiter
+
+    parser = argparse.ArgumentParser(description="Benchmark hedged multi-provider fetching")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--coins", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latency normal primary (detik)")
+    parser.add_argument("--tail-probability", type=float, default=0.05, help="Peluang request primary lambat")
+    parser.add_argument("--tail-latency", type=float, default=2.0, help="Latency request lambat (detik)")
+    parser.add_argument("--secondary-latency", type=float, default=0.08)
+    args = parser.parse_args()
+
+    primary = FakeCoinGeckoServer(latency=args.latency, tail_probability=args.tail_probability,
+                                  tail_latency=args.tail_latency).start()
+    secondary = FakeTickerApiServer(latency=args.secondary_latency).start()
+
+    import contextlib
+    import io
+    import tempfile
+
+    report = {}
+    for mode in ("primary only", "hedged"):
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine = PriceEngine(config_file=f"{tempfile.mkdtemp()}/config.json")
+            engine.base_url = primary.base_url
+            engine.rate_limiter = TokenBucketLimiter(calls_per_minute=1e9, burst=1e6,
+                                                     min_interval=0, interactive_reserve=0)
+            if mode == "hedged":
+                engine.add_provider("stand-in", secondary.base_url)
+        # Coin id dengan symbol yang dikenal supaya bisa dinormalisasi ke pair exchange
+        coin_ids = sorted(set(engine.symbol_to_id.values()))[:args.coins]
+
+        samples = []
+        for _ in range(args.requests):
+            engine.price_cache.clear()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                engine.get_multiple_coin_prices(coin_ids)
+            samples.append(time.perf_counter() - start)
+
+        report[mode] = (samples, engine.hedged_fetcher.stats())
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine.stop()
+
+    primary.stop()
+    secondary.stop()
+
+    for mode, (samples, stats) in report.items():
+        print(f"{mode:<13} p50={percentile(samples, 50) * 1000:7.1f}ms "
+              f"p95={percentile(samples, 95) * 1000:7.1f}ms "
+              f"p99={percentile(samples, 99) * 1000:7.1f}ms "
+              f"hedges={stats['hedges']} wins={stats['wins']}")
+
+
+if __name__ == "__main__":
+    main()
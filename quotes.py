@@ -0,0 +1,231 @@
+"""
+Quote record dan decoder /simple/price langsung dari bytes.
+
+Quote adalah record ringkas (__slots__) yang dipakai bersama oleh cache,
+price_data, history, label dan UI; jangan di-mutate, buat copy (mis.
+as_stale()) jika perlu flag lain. Pengecualian: validated_at di-update in
+place (lewat revalidate()) saat upstream mengonfirmasi quote masih berlaku,
+supaya identitas object (dipakai label dan history) tetap sama.
+open_price dan trend dihitung dari change_percent saat dibaca.
+
+Decoder memakai msgspec (decode + validasi tipe sekaligus, tanpa dict
+perantara) jika ter-install, lalu orjson, lalu json stdlib. Validasi
+(price > 0, tipe angka) dilakukan saat decoding; coin yang tidak valid
+tidak masuk hasil.
+
+Benchmark decode time dan alokasi per 1000 coin terhadap path lama
+(response.json() + dict per coin):
+
+    python3 quotes.py --coins 1000 --repeat 200
+"""
+
+import json
+import time
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Quote:
+    __slots__ = ('current_price', 'change_percent', 'timestamp', 'last_updated_at', 'source', 'stale',
+                 'validated_at')
+
+    def __init__(self, current_price, change_percent=0.0, timestamp=None, last_updated_at=None,
+                 source=None, stale=False, validated_at=None):
+        self.current_price = current_price
+        self.change_percent = change_percent  # 24h change (%)
+        self.timestamp = timestamp if timestamp is not None else time.time()  # Waktu fetch
+        self.last_updated_at = last_updated_at  # Timestamp upstream (None jika tidak ada)
+        self.source = source  # None = CoinGecko
+        self.stale = stale  # Quote terakhir yang diketahui, bukan hasil fetch terbaru
+        # Waktu terakhir upstream mengonfirmasi quote (fetch, 304 atau last_updated_at sama)
+        self.validated_at = validated_at if validated_at is not None else self.timestamp
+
+    @property
+    def open_price(self):
+        return self.current_price - (self.current_price * self.change_percent / 100)
+
+    @property
+    def trend(self):
+        change = self.change_percent
+        return "up" if change > 0 else "down" if change < 0 else "neutral"
+
+    def as_stale(self):
+        """Copy dengan stale=True (self jika sudah stale)"""
+        if self.stale:
+            return self
+        return Quote(self.current_price, self.change_percent, self.timestamp, self.last_updated_at,
+                     self.source, True, self.validated_at)
+
+    def revalidate(self, at=None):
+        """Tandai quote masih berlaku per waktu at (default sekarang)"""
+        self.validated_at = time.time() if at is None else at
+
+    def to_dict(self):
+        """Format dict lama (untuk JSON output / export)"""
+        data = {
+            'current_price': self.current_price,
+            'open_price': self.open_price,
+            'trend': self.trend,
+            'change_percent': self.change_percent,
+            'timestamp': self.timestamp,
+        }
+        if self.last_updated_at is not None:
+            data['last_updated_at'] = self.last_updated_at
+        if self.source:
+            data['source'] = self.source
+        if self.stale:
+            data['stale'] = True
+        return data
+
+    def __repr__(self):
+        flags = " stale" if self.stale else ""
+        return f"Quote({self.current_price!r}, {self.change_percent:+.2f}%{flags})"
+
+
+def valid_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def quotes_from_entries(data, coin_ids, fetched_at):
+    """dict hasil json.loads -> dict coin_id -> Quote, coin tidak valid di-skip"""
+    if not isinstance(data, dict):
+        raise ValueError("Invalid /simple/price response structure")
+
+    results = {}
+    for coin_id in coin_ids:
+        entry = data.get(coin_id)
+        if not isinstance(entry, dict):
+            continue
+        price = entry.get('usd')
+        if not valid_number(price) or price <= 0:
+            continue
+        change = entry.get('usd_24h_change')
+        updated = entry.get('last_updated_at')
+        results[coin_id] = Quote(price, change if valid_number(change) else 0.0, fetched_at,
+                                 updated if valid_number(updated) else None)
+    return results
+
+
+def decode_json(payload, coin_ids, fetched_at=None):
+    fetched_at = time.time() if fetched_at is None else fetched_at
+    return quotes_from_entries(json.loads(payload), coin_ids, fetched_at)
+
+
+def decode_orjson(payload, coin_ids, fetched_at=None):
+    fetched_at = time.time() if fetched_at is None else fetched_at
+    try:
+        data = orjson.loads(payload)
+    except orjson.JSONDecodeError as e:
+        raise ValueError(str(e)) from e
+    return quotes_from_entries(data, coin_ids, fetched_at)
+
+
+DECODERS = {'json': decode_json}
+if orjson is not None:
+    DECODERS['orjson'] = decode_orjson
+
+if msgspec is not None:
+    from typing import Dict, Optional
+
+    class PriceEntry(msgspec.Struct):
+        # Field lain (mis. market cap) diabaikan oleh msgspec
+        usd: float
+        usd_24h_change: Optional[float] = None
+        last_updated_at: Optional[int] = None
+
+    PRICE_DECODER = msgspec.json.Decoder(Dict[str, PriceEntry])
+
+    def decode_msgspec(payload, coin_ids, fetched_at=None):
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        try:
+            entries = PRICE_DECODER.decode(payload)
+        except msgspec.ValidationError:
+            # Satu entry tidak valid: validasi per coin lewat path generic
+            return quotes_from_entries(json.loads(payload), coin_ids, fetched_at)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+        results = {}
+        for coin_id in coin_ids:
+            entry = entries.get(coin_id)
+            if entry is None or not entry.usd > 0:
+                continue
+            change = entry.usd_24h_change
+            results[coin_id] = Quote(entry.usd, change if change is not None else 0.0, fetched_at,
+                                     entry.last_updated_at)
+        return results
+
+    DECODERS['msgspec'] = decode_msgspec
+
+# Decoder tercepat yang tersedia
+DECODER_NAME = 'msgspec' if 'msgspec' in DECODERS else 'orjson' if 'orjson' in DECODERS else 'json'
+decode_simple_price = DECODERS[DECODER_NAME]
+
+
+def legacy_decode(payload, coin_ids, fetched_at):
+    """Path sebelum Quote: json.loads lalu satu dict per coin (hanya untuk benchmark)"""
+    price_data = json.loads(payload)
+    results = {}
+    for coin_id in coin_ids:
+        if coin_id in price_data:
+            coin_data = price_data[coin_id]
+            if isinstance(coin_data, dict) and 'usd' in coin_data:
+                current_price = coin_data['usd']
+                change_24h = coin_data.get('usd_24h_change', 0)
+                if isinstance(current_price, (int, float)) and current_price > 0:
+                    trend = "up" if change_24h > 0 else "down" if change_24h < 0 else "neutral"
+                    results[coin_id] = {
+                        'current_price': current_price,
+                        'open_price': current_price - (current_price * change_24h / 100),
+                        'trend': trend,
+                        'change_percent': change_24h,
+                        'timestamp': fetched_at,
+                    }
+    return results
+
+
+def main():
+    """Benchmark decode time dan alokasi: path lama vs setiap decoder yang tersedia"""
+    import argparse
+    import tracemalloc
+
+    from fake_coingecko import FakeCoinGeckoServer
+
+    parser = argparse.ArgumentParser(description="Benchmark /simple/price decoding")
+    parser.add_argument("--coins", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    coin_ids = [f"coin-{i}" for i in range(args.coins)]
+    payload = json.dumps(FakeCoinGeckoServer().simple_price(coin_ids)).encode()
+    print(f"{args.coins} coins, payload {len(payload) / 1024:.1f} KiB, default decoder: {DECODER_NAME}")
+
+    candidates = [('legacy dicts', legacy_decode)] + [(f"Quote/{name}", fn) for name, fn in DECODERS.items()]
+    for label, decode in candidates:
+        decode(payload, coin_ids, 0.0)  # Warm up
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            decode(payload, coin_ids, 0.0)
+        per_call = (time.perf_counter() - start) / args.repeat
+
+        tracemalloc.start()
+        result = decode(payload, coin_ids, 0.0)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+
+        print(f"{label:<14} {per_call * 1000:7.2f} ms/decode  "
+              f"retained {retained / 1024:7.1f} KiB  peak {peak / 1024:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
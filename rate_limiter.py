@@ -0,0 +1,170 @@
+"""
+Thread-safe token-bucket rate limiter dengan priority classes.
+
+Request interactive (manual refresh, symbol search) selalu dilayani
+sebelum request background (polling), dan background tidak boleh
+menghabiskan token cadangan untuk interactive. Request yang masih antri
+bisa dibatalkan (mis. hedge ke provider lain sudah menang) tanpa memakai
+token.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+
+class TokenBucketLimiter:
+    def __init__(self, calls_per_minute=25, burst=5, min_interval=2.0, interactive_reserve=1):
+        self.rate = calls_per_minute / 60.0  # token per detik
+        self.capacity = float(burst)
+        self.min_interval = min_interval
+        # Token yang hanya boleh dipakai interactive request
+        self.interactive_reserve = interactive_reserve
+
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.last_grant = 0.0
+
+        self.condition = threading.Condition()
+        self.waiters = []  # heap of (priority, seq)
+        self.sequence = itertools.count()
+
+        # Statistik
+        self.granted = {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKGROUND: 0}
+        self.total_wait_seconds = 0.0
+        self.timeouts = 0
+        self.cancelled = 0
+
+    def refill(self, now):
+        """Tambah token sesuai waktu yang lewat (panggil dengan condition terkunci)"""
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.last_refill = now
+
+    def wait_time(self, priority, now):
+        """Detik sampai priority ini boleh ambil token (0 = sekarang)"""
+        needed = 1.0
+        if priority != PRIORITY_INTERACTIVE:
+            needed += self.interactive_reserve
+
+        token_wait = 0.0
+        if self.tokens < needed:
+            token_wait = (needed - self.tokens) / self.rate
+
+        spacing_wait = max(0.0, self.last_grant + self.min_interval - now) if self.last_grant else 0.0
+        return max(token_wait, spacing_wait)
+
+    def acquire(self, priority=PRIORITY_BACKGROUND, timeout=None, cancel=None):
+        """Ambil satu token, block sesuai prioritas. Return False jika timeout atau dibatalkan
+
+        cancel: object dengan atribut cancelled dan on_cancel(fn) (mis.
+        providers.FetchAttempt); saat dibatalkan, waiter dibangunkan dan
+        keluar dari antrian tanpa mengambil token.
+        """
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        if cancel is not None:
+            cancel.on_cancel(self.wake)
+
+        with self.condition:
+            entry = (priority, next(self.sequence))
+            heapq.heappush(self.waiters, entry)
+            self.condition.notify_all()
+
+            try:
+                while True:
+                    if cancel is not None and cancel.cancelled:
+                        self.cancelled += 1
+                        return False
+
+                    now = time.monotonic()
+                    self.refill(now)
+
+                    wait = None
+                    if self.waiters[0] == entry:
+                        wait = self.wait_time(priority, now)
+                        if wait <= 0:
+                            self.tokens -= 1.0
+                            self.last_grant = now
+                            self.granted[priority] = self.granted.get(priority, 0) + 1
+                            self.total_wait_seconds += now - start
+                            return True
+
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            self.timeouts += 1
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+
+                    self.condition.wait(wait)
+            finally:
+                # Keluarkan entry dari antrian (granted atau timeout)
+                self.waiters.remove(entry)
+                heapq.heapify(self.waiters)
+                self.condition.notify_all()
+
+    def wake(self):
+        """Bangunkan semua waiter (mis. setelah request dibatalkan)"""
+        with self.condition:
+            self.condition.notify_all()
+
+    def remaining(self, priority=PRIORITY_BACKGROUND):
+        """Jumlah request yang bisa dikirim sekarang tanpa menunggu"""
+        with self.condition:
+            self.refill(time.monotonic())
+            usable = self.tokens
+            if priority != PRIORITY_INTERACTIVE:
+                usable -= self.interactive_reserve
+            return max(0, int(usable))
+
+    def time_until_available(self, priority=PRIORITY_BACKGROUND):
+        """Detik sampai satu token tersedia untuk priority ini"""
+        with self.condition:
+            now = time.monotonic()
+            self.refill(now)
+            return self.wait_time(priority, now)
+
+    def time_for(self, count, priority=PRIORITY_BACKGROUND):
+        """Estimasi detik sampai count request bisa dikirim (untuk perencanaan scheduler)"""
+        with self.condition:
+            now = time.monotonic()
+            self.refill(now)
+            available = self.tokens
+            if priority != PRIORITY_INTERACTIVE:
+                available -= self.interactive_reserve
+            deficit = count - available
+            token_time = deficit / self.rate if deficit > 0 else 0.0
+            spacing_time = max(0, count - 1) * self.min_interval
+            return max(token_time, spacing_time)
+
+    def stats(self):
+        """Snapshot budget dan statistik limiter"""
+        with self.condition:
+            self.refill(time.monotonic())
+            waiting = {}
+            for priority, _ in self.waiters:
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                waiting[name] = waiting.get(name, 0) + 1
+
+            return {
+                'tokens': self.tokens,
+                'capacity': self.capacity,
+                'calls_per_minute': self.rate * 60,
+                'waiting': waiting,
+                'granted': {PRIORITY_NAMES.get(p, str(p)): n for p, n in self.granted.items()},
+                'total_wait_seconds': self.total_wait_seconds,
+                'timeouts': self.timeouts,
+                'cancelled': self.cancelled,
+            }
@@ -0,0 +1,137 @@
+"""
+Single-flight refresh coordinator.
+
+Semua permintaan refresh (monitor loop, add/remove coin, reset, manual
+refresh) lewat satu worker thread. Permintaan yang datang saat refresh
+sedang berjalan digabung ke refresh berikutnya, dan coin set dari setiap
+permintaan di-union ke dalam fetch tersebut.
+"""
+
+import threading
+import time
+
+from rate_limiter import PRIORITY_BACKGROUND
+
+
+class RefreshCoordinator:
+    def __init__(self, refresh_fn):
+        # refresh_fn(coins, priority); coins None berarti seluruh watchlist
+        self.refresh_fn = refresh_fn
+
+        self.condition = threading.Condition()
+        self.pending = False
+        self.pending_coins = set()
+        self.pending_all = False
+        self.pending_priority = PRIORITY_BACKGROUND
+        self.not_before = 0.0
+
+        self.in_flight = False
+        self.runs_started = 0
+        self.runs_completed = 0
+        self.stopped = False
+        self.worker = None
+
+        # Statistik
+        self.requests = 0
+        self.coalesced = 0
+
+    def start(self):
+        """Start worker thread jika belum jalan"""
+        with self.condition:
+            if self.worker is not None and self.worker.is_alive():
+                return
+            self.stopped = False
+            self.worker = threading.Thread(target=self.run, name="price-refresh", daemon=True)
+            self.worker.start()
+
+    def stop(self):
+        """Stop worker thread; refresh yang sedang berjalan dibiarkan selesai"""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def request(self, coins=None, priority=PRIORITY_BACKGROUND, delay=0.0):
+        """Minta refresh, return ticket untuk wait(). coins None = seluruh watchlist"""
+        self.start()
+
+        with self.condition:
+            self.requests += 1
+            if self.pending:
+                self.coalesced += 1
+
+            self.pending = True
+            if coins is None:
+                self.pending_all = True
+            else:
+                self.pending_coins.update(coins)
+
+            # Prioritas tertinggi (angka terkecil) dan deadline paling awal yang menang
+            self.pending_priority = min(self.pending_priority, priority)
+            due = time.monotonic() + delay
+            self.not_before = due if self.not_before == 0.0 else min(self.not_before, due)
+
+            self.condition.notify_all()
+            # Permintaan ini ikut run berikutnya yang belum dimulai
+            return self.runs_started + 1
+
+    def wait(self, ticket, timeout=None):
+        """Block sampai refresh untuk ticket selesai, return False jika timeout"""
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: self.runs_completed >= ticket or self.stopped,
+                timeout
+            )
+
+    def refresh(self, coins=None, priority=PRIORITY_BACKGROUND, timeout=None):
+        """Request lalu tunggu sampai refresh yang mencakup permintaan ini selesai"""
+        return self.wait(self.request(coins, priority), timeout)
+
+    def run(self):
+        """Worker loop: ambil pending request, jalankan satu refresh dalam satu waktu"""
+        while True:
+            with self.condition:
+                while not self.stopped:
+                    if self.pending:
+                        remaining = self.not_before - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self.condition.wait(remaining)
+                    else:
+                        self.condition.wait()
+
+                if self.stopped:
+                    return
+
+                coins = None if self.pending_all else sorted(self.pending_coins)
+                priority = self.pending_priority
+
+                self.pending = False
+                self.pending_all = False
+                self.pending_coins = set()
+                self.pending_priority = PRIORITY_BACKGROUND
+                self.not_before = 0.0
+
+                self.runs_started += 1
+                run_id = self.runs_started
+                self.in_flight = True
+
+            try:
+                self.refresh_fn(coins, priority)
+            except Exception as e:
+                print(f"Error in refresh worker: {e}")
+            finally:
+                with self.condition:
+                    self.in_flight = False
+                    self.runs_completed = run_id
+                    self.condition.notify_all()
+
+    def stats(self):
+        """Statistik coalescing"""
+        with self.condition:
+            return {
+                'requests': self.requests,
+                'coalesced': self.coalesced,
+                'runs': self.runs_completed,
+                'in_flight': self.in_flight,
+                'pending': self.pending,
+            }
@@ -0,0 +1,111 @@
+"""
+Render layer untuk status bar: title + icon ditulis ke native status item
+hanya jika frame berbeda dari yang sedang tampil.
+
+Frame per coin di-precompute saat quote baru masuk; cycling tick cukup
+memilih frame yang sudah jadi. Burst update (mis. stream flush + poll)
+di-rate-cap: frame terakhir ditahan dan ditulis setelah min_interval
+lewat job "render-flush" di engine scheduler (bukan thread timer per frame).
+"""
+
+import threading
+import time
+
+
+class Frame:
+    __slots__ = ('title', 'icon')
+
+    def __init__(self, title, icon):
+        self.title = title
+        self.icon = icon
+
+    def __eq__(self, other):
+        return isinstance(other, Frame) and self.title == other.title and self.icon == other.icon
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return f"Frame({self.title!r}, {self.icon!r})"
+
+
+class StatusRenderer:
+    def __init__(self, write_title, write_icon, scheduler, min_interval=0.25):
+        # write_title(title) / write_icon(icon) menulis ke native status item
+        self.write_title = write_title
+        self.write_icon = write_icon
+        self.scheduler = scheduler  # Menjalankan flush untuk frame yang ditahan
+        self.min_interval = min_interval
+
+        self.lock = threading.Lock()
+        self.on_screen = Frame(None, None)
+        self.pending = None  # Frame yang ditahan karena rate cap
+        self.flush_scheduled = False
+        self.last_render = 0.0
+
+        # Counters
+        self.rendered = 0
+        self.skipped = 0
+        self.deferred = 0
+
+    def present(self, frame):
+        """Tampilkan frame; skip jika sama dengan layar, tahan jika masih dalam rate cap"""
+        with self.lock:
+            target = self.pending if self.pending is not None else self.on_screen
+            if frame == target:
+                self.skipped += 1
+                return False
+
+            wait = self.last_render + self.min_interval - time.monotonic()
+            if wait > 0:
+                # Frame yang ditahan sebelumnya tidak pernah tampil: hitung sebagai skip
+                if self.pending is not None:
+                    self.skipped += 1
+                self.pending = frame
+                self.deferred += 1
+                if not self.flush_scheduled:
+                    self.flush_scheduled = True
+                    self.scheduler.schedule("render-flush", self.flush, delay=wait)
+                return False
+
+            self.pending = None
+            self.render(frame)
+            return True
+
+    def flush(self):
+        """Tulis frame yang ditahan (dipanggil oleh scheduler)"""
+        with self.lock:
+            self.flush_scheduled = False
+            frame = self.pending
+            self.pending = None
+            if frame is None:
+                return
+            if frame == self.on_screen:
+                self.skipped += 1
+                return
+            self.render(frame)
+
+    def render(self, frame):
+        # Dipanggil dengan self.lock dipegang; hanya attribute yang berubah yang ditulis
+        if frame.title != self.on_screen.title:
+            self.write_title(frame.title)
+        if frame.icon != self.on_screen.icon:
+            self.write_icon(frame.icon)
+        self.on_screen = frame
+        self.last_render = time.monotonic()
+        self.rendered += 1
+
+    def stop(self):
+        with self.lock:
+            if self.flush_scheduled:
+                self.scheduler.cancel("render-flush")
+                self.flush_scheduled = False
+
+    def stats(self):
+        with self.lock:
+            return {
+                'rendered': self.rendered,
+                'skipped': self.skipped,
+                'deferred': self.deferred,
+                'on_screen': self.on_screen.title,
+            }
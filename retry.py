@@ -0,0 +1,91 @@
+"""
+Retry helpers: jittered exponential backoff, Retry-After dan retry budget.
+
+Setiap API call punya deadline; retry (termasuk sleep backoff atau
+Retry-After) hanya dilakukan jika masih muat sebelum deadline dan retry
+budget belum habis. Retry budget membatasi retry ke fraksi dari jumlah
+request dalam window terakhir, supaya saat API bermasalah retry tidak
+melipatgandakan traffic.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value, now=None):
+    """Header Retry-After (detik atau HTTP-date) -> detik tunggu, None jika tidak valid"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, when.timestamp() - now)
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0, rng=random):
+    """Full jitter: acak antara 0 dan min(cap, base * 2^attempt)"""
+    return rng.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RetryBudget:
+    def __init__(self, ratio=0.2, min_retries=3, window=60.0):
+        self.ratio = ratio  # Maksimum retry per request dalam window
+        self.min_retries = min_retries  # Retry yang selalu boleh (traffic rendah)
+        self.window = window  # Detik
+
+        self.lock = threading.Lock()
+        self.requests = deque()  # Timestamp request pertama (bukan retry)
+        self.retries = deque()
+
+        # Statistik
+        self.denied = 0
+
+    def expire(self, now):
+        # Dipanggil dengan self.lock dipegang
+        cutoff = now - self.window
+        while self.requests and self.requests[0] < cutoff:
+            self.requests.popleft()
+        while self.retries and self.retries[0] < cutoff:
+            self.retries.popleft()
+
+    def record_request(self):
+        now = time.monotonic()
+        with self.lock:
+            self.expire(now)
+            self.requests.append(now)
+
+    def try_retry(self):
+        """Ambil satu retry dari budget, False jika budget habis"""
+        now = time.monotonic()
+        with self.lock:
+            self.expire(now)
+            allowed = self.min_retries + self.ratio * len(self.requests)
+            if len(self.retries) + 1 > allowed:
+                self.denied += 1
+                return False
+            self.retries.append(now)
+            return True
+
+    def stats(self):
+        with self.lock:
+            self.expire(time.monotonic())
+            requests = len(self.requests)
+            retries = len(self.retries)
+            return {
+                'requests': requests,
+                'retries': retries,
+                'retry_ratio': retries / requests if requests else 0.0,
+                'denied': self.denied,
+            }
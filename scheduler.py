@@ -0,0 +1,205 @@
+"""
+Event-driven scheduler: satu thread, timer heap dan Condition.
+
+Thread hanya bangun saat deadline job berikutnya tiba atau saat jadwal
+berubah (schedule/reschedule/cancel/stop), jadi tidak ada polling sleep
+saat idle. Job dengan interval dijadwalkan ulang setelah selesai; interval
+boleh berupa callable supaya perubahan setting langsung dipakai.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+
+
+class Job:
+    __slots__ = ('name', 'fn', 'interval', 'retry_delay', 'deadline', 'generation', 'last_run', 'runs')
+
+    def __init__(self, name, fn, interval, retry_delay):
+        self.name = name
+        self.fn = fn
+        self.interval = interval  # detik, callable -> detik, atau None (sekali jalan)
+        self.retry_delay = retry_delay  # Delay setelah exception (default: interval)
+        self.deadline = None
+        self.generation = 0
+        self.last_run = None
+        self.runs = 0
+
+    def next_interval(self):
+        return self.interval() if callable(self.interval) else self.interval
+
+
+class Scheduler:
+    def __init__(self, name="scheduler"):
+        self.name = name
+        self.condition = threading.Condition()
+        self.heap = []  # (deadline, seq, generation, job); entry lama di-skip (lazy delete)
+        self.jobs = {}
+        self.seq = itertools.count()
+        self.running = False
+        self.thread = None
+
+        # Statistik wakeup
+        self.started_at = None
+        self.wakeups = 0
+        self.idle_wakeups = 0  # Bangun tanpa ada job yang jatuh tempo
+        self.jobs_run = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+            self.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        """Stop scheduler; job yang sedang berjalan dibiarkan selesai"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def schedule(self, name, fn, delay=0.0, interval=None, retry_delay=None):
+        """Jadwalkan fn() setelah delay; job dengan nama sama diganti"""
+        with self.condition:
+            job = Job(name, fn, interval, retry_delay)
+            old = self.jobs.get(name)
+            if old is not None:
+                job.generation = old.generation + 1
+                job.last_run = old.last_run
+            self.jobs[name] = job
+            self.push(job, time.monotonic() + delay)
+            return job
+
+    def reschedule(self, name, delay=None):
+        """Geser deadline job; delay None = hitung ulang dari run terakhir + interval sekarang"""
+        with self.condition:
+            job = self.jobs.get(name)
+            if job is None:
+                return False
+            now = time.monotonic()
+            if delay is None:
+                interval = job.next_interval()
+                if interval is None:
+                    return False
+                base = job.last_run if job.last_run is not None else now
+                deadline = max(now, base + interval)
+            else:
+                deadline = now + delay
+            job.generation += 1
+            self.push(job, deadline)
+            return True
+
+    def cancel(self, name):
+        with self.condition:
+            job = self.jobs.pop(name, None)
+            if job is None:
+                return False
+            job.generation += 1
+            self.condition.notify_all()
+            return True
+
+    def is_scheduled(self, name):
+        with self.condition:
+            return name in self.jobs
+
+    def push(self, job, deadline):
+        # Dipanggil dengan condition dipegang
+        job.deadline = deadline
+        heapq.heappush(self.heap, (deadline, next(self.seq), job.generation, job))
+        self.condition.notify_all()
+
+    # ------------------------------------------------------------------
+    # Loop
+    # ------------------------------------------------------------------
+
+    def next_due(self):
+        """Pop job yang sudah jatuh tempo, atau return (None, detik sampai deadline berikutnya)"""
+        while self.heap:
+            deadline, _, generation, job = self.heap[0]
+            if self.jobs.get(job.name) is not job or generation != job.generation:
+                heapq.heappop(self.heap)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                return None, remaining
+            heapq.heappop(self.heap)
+            return job, 0.0
+        return None, None
+
+    def run(self):
+        while True:
+            with self.condition:
+                due = []
+                while self.running:
+                    job, remaining = self.next_due()
+                    if job is not None:
+                        due.append(job)
+                        continue
+                    if due:
+                        break
+                    self.condition.wait(remaining)
+                    self.wakeups += 1
+                    job, _ = self.next_due()
+                    if job is None:
+                        self.idle_wakeups += 1
+                    else:
+                        due.append(job)
+                if not self.running:
+                    return
+
+            for job in due:
+                self.execute(job)
+
+    def execute(self, job):
+        started = time.monotonic()
+        delay = None
+        try:
+            job.fn()
+        except Exception as e:
+            print(f"Error in scheduled job {job.name}: {e}")
+            delay = job.retry_delay
+
+        with self.condition:
+            job.last_run = started
+            job.runs += 1
+            self.jobs_run += 1
+            if self.jobs.get(job.name) is not job:
+                return  # Dibatalkan atau diganti saat berjalan
+
+            if delay is None:
+                delay = job.next_interval()
+            if delay is None:
+                del self.jobs[job.name]
+                return
+            # Reschedule selama run tidak dihitung ulang; deadline baru dari interval
+            if job.deadline is not None and job.deadline > started:
+                return
+            job.generation += 1
+            self.push(job, time.monotonic() + delay)
+
+    def stats(self):
+        with self.condition:
+            uptime = time.monotonic() - self.started_at if self.started_at is not None else 0.0
+            minutes = uptime / 60 if uptime > 0 else 0.0
+            return {
+                'jobs': sorted(self.jobs),
+                'uptime': uptime,
+                'wakeups': self.wakeups,
+                'idle_wakeups': self.idle_wakeups,
+                'jobs_run': self.jobs_run,
+                'wakeups_per_minute': self.wakeups / minutes if minutes else 0.0,
+            }
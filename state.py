@@ -0,0 +1,123 @@
+"""
+Immutable copy-on-write snapshot untuk watchlist dan quotes.
+
+Reader (status bar, menu, cycle tick) cukup membaca store.current tanpa
+lock dan tanpa copy; snapshot tidak pernah berubah setelah dipublish.
+Writer membuat snapshot baru lalu mempublish dengan satu assignment
+(atomic di CPython); write_lock hanya men-serialize read-modify-write
+antar writer dan tidak pernah diambil oleh reader.
+
+Benchmark latency reader (vs copy di bawah dua lock) saat writer aktif:
+
+    python3 state.py --sizes 10,1000,10000
+"""
+
+import threading
+import time
+from types import MappingProxyType
+
+
+class Snapshot:
+    __slots__ = ('coins', 'quotes', 'index', 'version')
+
+    def __init__(self, coins=(), quotes=None, version=0):
+        self.coins = tuple(coins)  # Watchlist (urutan tampil)
+        self.quotes = MappingProxyType(dict(quotes or {}))  # coin_id -> Quote
+        self.index = MappingProxyType({coin_id: i for i, coin_id in enumerate(self.coins)})
+        self.version = version
+
+    def replace(self, coins=None, quotes=None):
+        """Snapshot baru dengan coins dan/atau quotes diganti (yang tidak diberikan di-share)"""
+        snapshot = Snapshot.__new__(Snapshot)
+        if coins is None:
+            snapshot.coins = self.coins
+            snapshot.index = self.index
+        else:
+            snapshot.coins = tuple(coins)
+            snapshot.index = MappingProxyType({coin_id: i for i, coin_id in enumerate(snapshot.coins)})
+        snapshot.quotes = self.quotes if quotes is None else MappingProxyType(dict(quotes))
+        snapshot.version = self.version + 1
+        return snapshot
+
+    def __contains__(self, coin_id):
+        return coin_id in self.index
+
+    def __len__(self):
+        return len(self.coins)
+
+    def __repr__(self):
+        return f"Snapshot(version={self.version}, coins={list(self.coins)}, quotes={len(self.quotes)})"
+
+
+class SnapshotStore:
+    def __init__(self, coins=(), quotes=None):
+        self.current = Snapshot(coins, quotes)
+        self.write_lock = threading.Lock()
+
+    def update(self, change):
+        """Publish change(current) -> Snapshot baru; None dari change = tidak ada perubahan
+
+        Return snapshot yang dipublish, atau None jika tidak ada perubahan.
+        """
+        with self.write_lock:
+            snapshot = change(self.current)
+            if snapshot is None or snapshot is self.current:
+                return None
+            self.current = snapshot
+            return snapshot
+
+
+def main():
+    """Latency reader: snapshot lock-free vs copy coins & quotes di bawah dua lock"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark snapshot readers")
+    parser.add_argument("--sizes", default="10,1000,10000")
+    parser.add_argument("--reads", type=int, default=20000)
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(',') if s):
+        coins = [f"coin-{i}" for i in range(size)]
+        quotes = {coin_id: float(i) for i, coin_id in enumerate(coins)}
+
+        # Cara lama: list + dict mutable, reader copy di bawah coins_lock dan data_lock
+        legacy = {'coins': list(coins), 'quotes': dict(quotes)}
+        coins_lock = threading.Lock()
+        data_lock = threading.Lock()
+        store = SnapshotStore(coins, quotes)
+        stop = threading.Event()
+
+        def writer():
+            # Satu refresh per ~10 ms, sama untuk kedua cara
+            while not stop.wait(0.01):
+                with data_lock:
+                    legacy['quotes'] = dict(quotes)
+                store.update(lambda snapshot: snapshot.replace(quotes=quotes))
+
+        def legacy_read():
+            with coins_lock:
+                legacy_coins = legacy['coins'].copy()
+            with data_lock:
+                legacy_quotes = dict(legacy['quotes'])
+            return legacy_coins, legacy_quotes
+
+        def snapshot_read():
+            snapshot = store.current
+            return snapshot.coins, snapshot.quotes
+
+        thread = threading.Thread(target=writer, daemon=True)
+        thread.start()
+        results = []
+        for name, read in (("copy under locks", legacy_read), ("snapshot", snapshot_read)):
+            start = time.perf_counter()
+            for _ in range(args.reads):
+                read()
+            results.append((name, (time.perf_counter() - start) / args.reads * 1e6))
+        stop.set()
+        thread.join()
+
+        print(f"{size:>6} coins  " + "  ".join(f"{name}: {us:8.2f} us/read" for name, us in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Push-based ingestion dari exchange-style WebSocket ticker stream.
+
+StreamIngestor subscribe ke <symbol>usdt@ticker untuk setiap coin di
+watchlist, reconnect dengan exponential backoff, resubscribe saat
+watchlist berubah, dan menggabungkan (coalesce) update per coin sebelum
+diteruskan ke PriceEngine setiap flush_interval. Harga USDT dipakai
+sebagai harga USD. Polling tetap jalan sebagai fallback untuk coin yang
+tidak ter-cover stream atau saat stream putus.
+
+Benchmark offline dengan stand-in server lokal:
+
+    python3 streaming.py --local --coins 50 --seconds 10
+"""
+
+import itertools
+import json
+import random
+import threading
+import time
+
+import ws
+from quotes import Quote
+
+
+class StreamIngestor:
+    def __init__(self, url, symbol_for, on_quotes, flush_interval=0.5, stale_after=30.0,
+                 quote_asset="usdt", min_backoff=1.0, max_backoff=60.0):
+        self.url = url
+        self.symbol_for = symbol_for  # coin_id -> display symbol (BTC)
+        self.on_quotes = on_quotes  # callback(dict coin_id -> Quote)
+        self.flush_interval = flush_interval
+        self.stale_after = stale_after
+        self.quote_asset = quote_asset
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+        self.lock = threading.Lock()
+        self.stream_to_coin = {}  # "btcusdt" -> "bitcoin"
+        self.pending = {}  # Update yang belum di-flush, 1 per coin
+        self.last_update = {}  # coin_id -> waktu update terakhir (monotonic)
+
+        self.conn = None
+        self.connected = False
+        self.running = False
+        self.stop_event = threading.Event()
+        self.request_ids = itertools.count(1)
+
+        # Statistik
+        self.messages = 0
+        self.published = 0
+        self.coalesced = 0
+        self.reconnects = 0
+
+    # ------------------------------------------------------------------
+    # Watchlist
+    # ------------------------------------------------------------------
+
+    def stream_name(self, coin_id):
+        """Nama stream (btcusdt), None jika symbol coin tidak diketahui pasti"""
+        symbol = self.symbol_for(coin_id)
+        if not symbol:
+            return None
+        return f"{symbol.lower()}{self.quote_asset}"
+
+    def set_watchlist(self, coin_ids):
+        """Update subscription sesuai watchlist (diff dikirim jika sedang connect)"""
+        # Coin tanpa symbol pasti dan symbol yang dipakai lebih dari satu coin
+        # id di-skip (coin tersebut tetap di-poll)
+        desired = {}
+        ambiguous = set()
+        for coin_id in coin_ids:
+            stream = self.stream_name(coin_id)
+            if stream is None:
+                continue
+            if stream in desired:
+                ambiguous.add(stream)
+            desired[stream] = coin_id
+        for stream in ambiguous:
+            del desired[stream]
+        watched = set(desired.values())
+
+        with self.lock:
+            added = [s for s in desired if s not in self.stream_to_coin]
+            removed = [s for s in self.stream_to_coin if s not in desired]
+            self.stream_to_coin = desired
+            for stream in removed:
+                self.pending.pop(stream, None)
+            self.last_update = {c: t for c, t in self.last_update.items() if c in watched}
+            conn = self.conn if self.connected else None
+
+        if conn is not None:
+            try:
+                if removed:
+                    self.send_command(conn, "UNSUBSCRIBE", removed)
+                if added:
+                    self.send_command(conn, "SUBSCRIBE", added)
+            except (ws.WebSocketError, OSError) as e:
+                print(f"Stream resubscribe failed: {e}")
+
+    def send_command(self, conn, method, streams):
+        conn.send_text(json.dumps({
+            "method": method,
+            "params": [f"{stream}@ticker" for stream in streams],
+            "id": next(self.request_ids),
+        }))
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.stop_event.clear()
+        threading.Thread(target=self.run, name="price-stream", daemon=True).start()
+        threading.Thread(target=self.flush_loop, name="price-stream-flush", daemon=True).start()
+
+    def stop(self):
+        self.running = False
+        self.stop_event.set()
+        with self.lock:
+            conn = self.conn
+        if conn is not None:
+            conn.close()
+
+    def run(self):
+        """Connect loop dengan exponential backoff + jitter"""
+        attempt = 0
+        while self.running:
+            try:
+                conn = ws.connect(self.url, timeout=10.0)
+                conn.settimeout(self.stale_after)
+                attempt = 0
+                self.session(conn)
+            except (ws.WebSocketError, OSError, ValueError) as e:
+                if self.running:
+                    print(f"Price stream disconnected: {e}")
+            finally:
+                with self.lock:
+                    self.connected = False
+                    self.conn = None
+
+            if not self.running:
+                return
+
+            backoff = min(self.max_backoff, self.min_backoff * (2 ** attempt))
+            backoff *= random.uniform(0.5, 1.0)
+            attempt += 1
+            self.reconnects += 1
+            if self.stop_event.wait(backoff):
+                return
+
+    def session(self, conn):
+        """Satu koneksi: subscribe seluruh watchlist lalu baca ticker sampai putus"""
+        with self.lock:
+            self.conn = conn
+            self.connected = True
+            streams = list(self.stream_to_coin)
+
+        try:
+            if streams:
+                self.send_command(conn, "SUBSCRIBE", streams)
+            print(f"Price stream connected: {len(streams)} streams")
+
+            while self.running:
+                self.handle_message(conn.recv())
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Messages
+    # ------------------------------------------------------------------
+
+    def handle_message(self, raw):
+        """Parse ticker message dan simpan sebagai pending update untuk coin-nya"""
+        message = json.loads(raw)
+        if not isinstance(message, dict) or message.get('e') != '24hrTicker':
+            return
+
+        stream = str(message.get('s', '')).lower()
+        try:
+            price = float(message['c'])
+            change = float(message.get('P', 0))
+        except (KeyError, TypeError, ValueError):
+            return
+        if price <= 0:
+            return
+
+        timestamp = message.get('E')
+        timestamp = timestamp / 1000.0 if isinstance(timestamp, (int, float)) else time.time()
+
+        with self.lock:
+            coin_id = self.stream_to_coin.get(stream)
+            if coin_id is None:
+                return
+            self.messages += 1
+            if stream in self.pending:
+                self.coalesced += 1
+            self.pending[stream] = (coin_id, Quote(price, change, timestamp, source='stream'))
+            self.last_update[coin_id] = time.monotonic()
+
+    def flush_loop(self):
+        """Publish update yang sudah di-coalesce setiap flush_interval"""
+        while not self.stop_event.wait(self.flush_interval):
+            with self.lock:
+                pending = self.pending
+                self.pending = {}
+            if not pending:
+                continue
+
+            quotes = dict(pending.values())
+            self.published += len(quotes)
+            try:
+                self.on_quotes(quotes)
+            except Exception as e:
+                print(f"Error publishing stream quotes: {e}")
+
+    # ------------------------------------------------------------------
+    # Status
+    # ------------------------------------------------------------------
+
+    def is_fresh(self, coin_id):
+        """True jika coin dapat update stream dalam stale_after detik terakhir"""
+        last = self.last_update.get(coin_id)
+        return self.connected and last is not None and time.monotonic() - last < self.stale_after
+
+    def stale_coins(self, coin_ids):
+        """Coins yang perlu di-poll karena tidak ter-cover stream"""
+        return [coin_id for coin_id in coin_ids if not self.is_fresh(coin_id)]
+
+    def stats(self):
+        with self.lock:
+            return {
+                'connected': self.connected,
+                'streams': len(self.stream_to_coin),
+                'messages': self.messages,
+                'published': self.published,
+                'coalesced': self.coalesced,
+                'reconnects': self.reconnects,
+            }
+
+
+def main():
+    """Benchmark streaming ingestion terhadap stand-in exchange lokal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark streaming price ingestion")
+    parser.add_argument("--url", default=None, help="WebSocket url (default: stand-in server lokal)")
+    parser.add_argument("--local", action="store_true", help="Jalankan stand-in exchange lokal")
+    parser.add_argument("--coins", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=5.0, help="Update per detik per coin (server lokal)")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--flush", type=float, default=0.5, help="Flush interval (detik)")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if args.local or url is None:
+        from fake_exchange import FakeExchangeServer
+        server = FakeExchangeServer(rate=args.rate).start()
+        url = server.url
+
+    coin_ids = [f"coin{i}" for i in range(args.coins)]
+    ages = []
+
+    def on_quotes(quotes):
+        now = time.time()
+        ages.extend(now - quote.timestamp for quote in quotes.values())
+
+    ingestor = StreamIngestor(url, lambda coin_id: coin_id.upper(), on_quotes, flush_interval=args.flush)
+    ingestor.set_watchlist(coin_ids)
+    ingestor.start()
+    time.sleep(args.seconds)
+    ingestor.stop()
+    if server is not None:
+        server.stop()
+
+    stats = ingestor.stats()
+    ages.sort()
+    print(f"messages received : {stats['messages']} ({stats['messages'] / args.seconds:.0f}/s)")
+    print(f"updates published : {stats['published']} (coalesced {stats['coalesced']})")
+    if ages:
+        print(f"quote age at publish p50={ages[len(ages) // 2] * 1000:.0f}ms "
+              f"p99={ages[min(len(ages) - 1, int(len(ages) * 0.99))] * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
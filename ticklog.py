@@ -0,0 +1,243 @@
+"""
+Append-only binary tick log dengan mmap reads dan sparse timestamp index.
+
+Layout: <root>/<YYYY-MM-DD>/<coin_id>.bin, satu segment per coin per hari
+(UTC). Setiap record fixed 24 byte: timestamp, price, change_percent
+(little-endian float64). Range query = binary search di sparse index +
+di dalam satu block, lalu slice zero-copy dari mmap.
+"""
+
+import bisect
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+RECORD = struct.Struct('<ddd')  # timestamp, price, change_percent
+RECORD_SIZE = RECORD.size
+FIELDS = 3
+INDEX_STRIDE = 64  # Satu entry sparse index setiap 64 record
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([('timestamp', '<f8'), ('price', '<f8'), ('change_percent', '<f8')])
+
+
+def day_for(timestamp):
+    """Nama segment harian (UTC) untuk timestamp"""
+    return time.strftime('%Y-%m-%d', time.gmtime(timestamp))
+
+
+def safe_name(coin_id):
+    """Coin id -> nama file yang aman"""
+    return re.sub(r'[^a-z0-9._-]', '_', coin_id.lower())
+
+
+class TickSlice:
+    """Zero-copy view ke sejumlah record di satu segment"""
+
+    __slots__ = ('segment', 'start', 'count')
+
+    def __init__(self, segment, start, count):
+        self.segment = segment
+        self.start = start
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def records(self):
+        """memoryview float64 flat tanpa copy: timestamp, price, change_percent berulang"""
+        offset = self.start * RECORD_SIZE
+        return memoryview(self.segment.map)[offset:offset + self.count * RECORD_SIZE].cast('d')
+
+    def array(self):
+        """NumPy structured array (zero-copy) jika NumPy tersedia, selain itu list of tuples"""
+        if np is not None:
+            return np.frombuffer(self.segment.map, dtype=RECORD_DTYPE,
+                                 count=self.count, offset=self.start * RECORD_SIZE)
+        return [RECORD.unpack_from(self.segment.map, (self.start + i) * RECORD_SIZE)
+                for i in range(self.count)]
+
+    def timestamps(self):
+        if np is not None:
+            return self.array()['timestamp']
+        return self.records()[0::FIELDS]
+
+    def prices(self):
+        if np is not None:
+            return self.array()['price']
+        return self.records()[1::FIELDS]
+
+
+class TickSegment:
+    """Read-only mmap dari satu file segment, dengan sparse timestamp index"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        # Abaikan record terakhir yang mungkin setengah tertulis
+        self.count = size // RECORD_SIZE
+
+        if self.count:
+            self.map = mmap.mmap(self.file.fileno(), self.count * RECORD_SIZE, access=mmap.ACCESS_READ)
+        else:
+            self.map = b''
+
+        self.index = [self.timestamp_at(i) for i in range(0, self.count, INDEX_STRIDE)]
+
+    def timestamp_at(self, i):
+        return struct.unpack_from('<d', self.map, i * RECORD_SIZE)[0]
+
+    def lower_bound(self, timestamp):
+        """Index record pertama dengan timestamp >= timestamp"""
+        block = max(0, bisect.bisect_left(self.index, timestamp) - 1)
+        lo = block * INDEX_STRIDE
+        hi = min(self.count, lo + 2 * INDEX_STRIDE)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamp_at(mid) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def upper_bound(self, timestamp):
+        """Index record pertama dengan timestamp > timestamp"""
+        block = max(0, bisect.bisect_right(self.index, timestamp) - 1)
+        lo = block * INDEX_STRIDE
+        hi = min(self.count, lo + INDEX_STRIDE)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamp_at(mid) <= timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def range(self, start=None, end=None):
+        """TickSlice untuk record dengan start <= timestamp <= end"""
+        lo = 0 if start is None else self.lower_bound(start)
+        hi = self.count if end is None else self.upper_bound(end)
+        return TickSlice(self, lo, max(0, hi - lo))
+
+    def close(self):
+        if self.count:
+            self.map.close()
+        self.file.close()
+
+
+class TickLog:
+    def __init__(self, root="ticks"):
+        self.root = root
+        self.lock = threading.Lock()
+        self.last_timestamps = {}  # coin_id -> timestamp terakhir yang ditulis
+        self.segments = {}  # (day, coin_id) -> (size, TickSegment)
+        self.records_written = 0
+
+    def segment_path(self, day, coin_id):
+        return os.path.join(self.root, day, f"{safe_name(coin_id)}.bin")
+
+    def write(self, quotes, timestamp=None):
+        """Append satu record per coin dari dict coin_id -> Quote"""
+        written = 0
+        with self.lock:
+            for coin_id, quote in quotes.items():
+                ts = quote.timestamp if quote.timestamp is not None else timestamp
+                if ts is None:
+                    ts = time.time()
+                if ts <= self.last_timestamps.get(coin_id, 0):
+                    continue
+
+                path = self.segment_path(day_for(ts), coin_id)
+                try:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(path, 'ab') as f:
+                        f.write(RECORD.pack(ts, quote.current_price, quote.change_percent))
+                except OSError as e:
+                    print(f"Error writing tick log for {coin_id}: {e}")
+                    continue
+
+                self.last_timestamps[coin_id] = ts
+                written += 1
+            self.records_written += written
+        return written
+
+    def segment(self, day, coin_id):
+        """TickSegment (di-cache, di-map ulang jika file sudah bertambah), None jika tidak ada"""
+        path = self.segment_path(day, coin_id)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+
+        key = (day, coin_id)
+        with self.lock:
+            cached = self.segments.get(key)
+            if cached is not None and cached[0] == size:
+                return cached[1]
+
+            segment = TickSegment(path)
+            # Segment lama tidak di-close di sini: slice yang sudah dikembalikan
+            # mungkin masih dipakai; mmap dilepas saat di-garbage collect
+            self.segments[key] = (size, segment)
+            return segment
+
+    def days(self):
+        """Semua hari yang punya segment, urut"""
+        try:
+            return sorted(name for name in os.listdir(self.root)
+                          if os.path.isdir(os.path.join(self.root, name)))
+        except OSError:
+            return []
+
+    def query(self, coin_id, start, end):
+        """List TickSlice (satu per hari) untuk coin dalam range [start, end]"""
+        slices = []
+        first_day, last_day = day_for(start), day_for(end)
+        for day in self.days():
+            if day < first_day or day > last_day:
+                continue
+            segment = self.segment(day, coin_id)
+            if segment is None:
+                continue
+            tick_slice = segment.range(start, end)
+            if len(tick_slice):
+                slices.append(tick_slice)
+        return slices
+
+    def replay(self, day, coin_ids=None):
+        """Semua tick satu hari: dict coin_id -> TickSlice"""
+        day_dir = os.path.join(self.root, day)
+        if coin_ids is None:
+            try:
+                coin_ids = [name[:-4] for name in os.listdir(day_dir) if name.endswith('.bin')]
+            except OSError:
+                return {}
+
+        result = {}
+        for coin_id in coin_ids:
+            segment = self.segment(day, coin_id)
+            if segment is not None and segment.count:
+                result[coin_id] = segment.range()
+        return result
+
+    def close(self):
+        """Lepas semua mmap"""
+        with self.lock:
+            segments = self.segments
+            self.segments = {}
+        for _, segment in segments.values():
+            try:
+                segment.close()
+            except (BufferError, ValueError):
+                # Masih ada view yang dipakai, biarkan GC yang melepas
+                pass
@@ -0,0 +1,228 @@
+"""
+HTTP transport dengan pooled keep-alive session untuk semua CoinGecko calls.
+
+Satu requests.Session dipakai bersama oleh semua fetch path supaya koneksi
+TCP+TLS di-reuse, response di-compress (gzip/deflate) dan timeout connect
+dipisah dari timeout read. requests (dan urllib3) baru di-import saat
+session pertama dibuat, bukan saat startup.
+
+Bandingkan latency tanpa pooling vs dengan pooling:
+
+    python3 transport.py --requests 30
+"""
+
+import math
+import threading
+import time
+import warnings
+from collections import deque
+
+
+COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
+
+# Module requests, di-import saat pertama dibutuhkan (lihat import_requests)
+requests = None
+
+
+def import_requests():
+    """Import requests saat pertama dipakai (~150 ms, tidak perlu untuk frame pertama)
+
+    Warning urllib3 (mis. NotOpenSSLWarning dengan LibreSSL bawaan macOS)
+    di-suppress sebelum import.
+    """
+    global requests
+    if requests is None:
+        warnings.filterwarnings('ignore', category=UserWarning, module='urllib3')
+        warnings.filterwarnings('ignore', message='.*urllib3.*')
+        import requests as module
+        requests = module
+    return requests
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile dari list samples (None jika kosong)"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize_latencies(samples):
+    """Return dict count/p50/p99 (ms) dari latency samples (detik)"""
+    p50 = percentile(samples, 50)
+    p99 = percentile(samples, 99)
+    return {
+        'count': len(samples),
+        'p50_ms': p50 * 1000 if p50 is not None else None,
+        'p99_ms': p99 * 1000 if p99 is not None else None,
+    }
+
+
+def pool_timeout_adapter():
+    """HTTPAdapter yang membatasi waktu tunggu slot pool (pool_block=True)
+
+    requests tidak meneruskan pool_timeout ke urllib3, jadi nilainya dititipkan
+    per thread lewat adapter.local sebelum request dikirim.
+    """
+    import_requests()
+    from requests.adapters import HTTPAdapter
+
+    class PoolTimeoutAdapter(HTTPAdapter):
+        def __init__(self, *args, **kwargs):
+            self.local = threading.local()
+            super().__init__(*args, **kwargs)
+
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            local = self.local
+            pool_classes = {}
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items():
+                class DeadlinePool(pool_class):
+                    def urlopen(self, method, url, *args, **kwargs):
+                        if kwargs.get('pool_timeout') is None:
+                            kwargs['pool_timeout'] = getattr(local, 'pool_timeout', None)
+                        return super().urlopen(method, url, *args, **kwargs)
+                pool_classes[scheme] = DeadlinePool
+            self.poolmanager.pool_classes_by_scheme = pool_classes
+
+    return PoolTimeoutAdapter
+
+
+class HttpTransport:
+    def __init__(self, pool_connections=2, pool_maxsize=4, connect_timeout=5.0,
+                 read_timeout=20.0, max_samples=512):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+
+        # Latency samples (detik) untuk p50/p99
+        self.latencies = deque(maxlen=max_samples)
+        self.latency_lock = threading.Lock()
+
+        self.session_lock = threading.Lock()
+        self.session = None
+        self.adapter = None
+
+    def build_session(self):
+        """Buat Session dengan pool terbatas, keep-alive dan compression"""
+        session = import_requests().Session()
+
+        # pool_block=True supaya jumlah koneksi tidak melebihi pool_maxsize
+        # (tunggu slot dibatasi deadline, lihat get); retry ditangani PriceEngine
+        self.adapter = pool_timeout_adapter()(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=0,
+            pool_block=True
+        )
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+
+        session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+            "User-Agent": "CryptoTicker/1.0",
+        })
+        return session
+
+    def get_session(self):
+        """Lazy init session (thread safe)"""
+        with self.session_lock:
+            if self.session is None:
+                self.session = self.build_session()
+            return self.session
+
+    def get(self, url, timeout=None, headers=None, deadline=None):
+        """GET url lewat pooled session, timeout = read timeout (detik)
+
+        deadline (time.monotonic()) membatasi tunggu slot pool, connect dan read
+        sekaligus; slot pool yang tidak didapat sebelum deadline jadi ConnectTimeout.
+        """
+        read_timeout = timeout if timeout is not None else self.read_timeout
+        connect_timeout = self.connect_timeout
+        pool_timeout = None
+        if deadline is not None:
+            remaining = max(0.1, deadline - time.monotonic())
+            connect_timeout = min(connect_timeout, remaining)
+            read_timeout = min(read_timeout, remaining)
+            pool_timeout = remaining
+        session = self.get_session()
+
+        from urllib3.exceptions import EmptyPoolError
+        start = time.perf_counter()
+        self.adapter.local.pool_timeout = pool_timeout
+        try:
+            return session.get(url, timeout=(connect_timeout, read_timeout), headers=headers)
+        except EmptyPoolError as e:
+            raise requests.exceptions.ConnectTimeout(f"No pooled connection within {pool_timeout:.1f}s") from e
+        finally:
+            self.adapter.local.pool_timeout = None
+            self.record_latency(time.perf_counter() - start)
+
+    def record_latency(self, seconds):
+        """Simpan satu latency sample"""
+        with self.latency_lock:
+            self.latencies.append(seconds)
+
+    def latency_stats(self):
+        """Return dict count/p50/p99 (ms) dari latency samples terakhir"""
+        with self.latency_lock:
+            samples = list(self.latencies)
+        return summarize_latencies(samples)
+
+    def close(self):
+        """Tutup semua koneksi di pool"""
+        with self.session_lock:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+
+
+def format_stats(label, stats):
+    """Format latency stats untuk output CLI"""
+    if not stats['count']:
+        return f"{label}: no samples"
+    return f"{label}: n={stats['count']} p50={stats['p50_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms"
+
+
+def main():
+    """Ukur p50/p99 latency: requests.get per call vs pooled session"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare unpooled vs pooled fetch latency")
+    parser.add_argument("--url", default=f"{COINGECKO_BASE_URL}/simple/price?ids=bitcoin,ethereum&vs_currencies=usd&include_24hr_change=true")
+    parser.add_argument("--requests", type=int, default=20, help="Jumlah request per mode")
+    parser.add_argument("--delay", type=float, default=2.0, help="Jeda antar request (detik)")
+    args = parser.parse_args()
+    import_requests()
+
+    # Before: requests.get tanpa session (handshake baru setiap call)
+    before = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        try:
+            requests.get(args.url, timeout=20)
+        except requests.exceptions.RequestException as e:
+            print(f"Request error: {e}")
+        before.append(time.perf_counter() - start)
+        time.sleep(args.delay)
+
+    # After: pooled keep-alive session
+    transport = HttpTransport()
+    for _ in range(args.requests):
+        try:
+            transport.get(args.url)
+        except requests.exceptions.RequestException as e:
+            print(f"Request error: {e}")
+        time.sleep(args.delay)
+    transport.close()
+
+    print(format_stats("requests.get (before)", summarize_latencies(before)))
+    print(format_stats("pooled session (after)", transport.latency_stats()))
+
+
+if __name__ == "__main__":
+    main()
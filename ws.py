@@ -0,0 +1,238 @@
+"""
+Minimal WebSocket (RFC 6455) client/server di atas stdlib socket.
+
+Cukup untuk ticker stream: text frames, fragmentation, ping/pong dan
+close handshake. Dipakai oleh streaming.py dan fake_exchange.py supaya
+streaming mode tidak butuh dependency tambahan.
+"""
+
+import base64
+import hashlib
+import os
+import socket
+import ssl
+import struct
+import threading
+from urllib.parse import urlparse
+
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+class WebSocketError(Exception):
+    pass
+
+
+class ConnectionClosed(WebSocketError):
+    pass
+
+
+def accept_key(key):
+    """Sec-WebSocket-Accept untuk Sec-WebSocket-Key"""
+    digest = hashlib.sha1((key + GUID).encode()).digest()
+    return base64.b64encode(digest).decode()
+
+
+def apply_mask(payload, mask_key):
+    """XOR payload dengan 4-byte mask (dipakai untuk mask dan unmask)"""
+    length = len(payload)
+    if not length:
+        return payload
+    key = (mask_key * (length // 4 + 1))[:length]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')).to_bytes(length, 'big')
+
+
+def encode_frame(opcode, payload, mask):
+    """Encode satu frame FIN (client harus mask, server tidak)"""
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    length = len(payload)
+
+    if length < 126:
+        header.append(mask_bit | length)
+    elif length < 65536:
+        header.append(mask_bit | 126)
+        header += struct.pack('!H', length)
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack('!Q', length)
+
+    if mask:
+        mask_key = os.urandom(4)
+        return bytes(header) + mask_key + apply_mask(payload, mask_key)
+    return bytes(header) + payload
+
+
+def read_http_headers(rfile):
+    """Baca status/request line dan headers sampai baris kosong"""
+    first_line = rfile.readline(65537).decode('latin-1').strip()
+    if not first_line:
+        raise ConnectionClosed("connection closed during handshake")
+
+    headers = {}
+    while True:
+        line = rfile.readline(65537).decode('latin-1')
+        if line in ('\r\n', '\n', ''):
+            break
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return first_line, headers
+
+
+class WebSocket:
+    def __init__(self, sock, rfile, is_client):
+        self.sock = sock
+        self.rfile = rfile
+        self.is_client = is_client
+        self.send_lock = threading.Lock()
+        self.closed = False
+
+    def settimeout(self, timeout):
+        self.sock.settimeout(timeout)
+
+    def send(self, opcode, payload):
+        if self.closed:
+            raise ConnectionClosed("socket already closed")
+        frame = encode_frame(opcode, payload, mask=self.is_client)
+        with self.send_lock:
+            self.sock.sendall(frame)
+
+    def send_text(self, text):
+        self.send(OP_TEXT, text.encode('utf-8'))
+
+    def read_exact(self, count):
+        data = self.rfile.read(count)
+        if data is None or len(data) < count:
+            raise ConnectionClosed("connection closed")
+        return data
+
+    def read_frame(self):
+        """Return (fin, opcode, payload) dari satu frame"""
+        first, second = self.read_exact(2)
+        fin = bool(first & 0x80)
+        opcode = first & 0x0F
+        masked = bool(second & 0x80)
+        length = second & 0x7F
+
+        if length == 126:
+            length = struct.unpack('!H', self.read_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', self.read_exact(8))[0]
+
+        mask_key = self.read_exact(4) if masked else None
+        payload = self.read_exact(length) if length else b''
+        if mask_key:
+            payload = apply_mask(payload, mask_key)
+        return fin, opcode, payload
+
+    def recv(self):
+        """Return pesan text/binary berikutnya; raise ConnectionClosed saat close"""
+        fragments = []
+        message_opcode = None
+
+        while True:
+            fin, opcode, payload = self.read_frame()
+
+            if opcode == OP_PING:
+                self.send(OP_PONG, payload)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                if not self.closed:
+                    try:
+                        self.send(OP_CLOSE, payload[:2])
+                    except OSError:
+                        pass
+                self.closed = True
+                raise ConnectionClosed("close frame received")
+
+            if opcode != OP_CONTINUATION:
+                message_opcode = opcode
+            fragments.append(payload)
+
+            if fin:
+                data = b''.join(fragments)
+                return data.decode('utf-8') if message_opcode == OP_TEXT else data
+
+    def close(self, code=1000):
+        """Kirim close frame (best effort) lalu tutup socket"""
+        if not self.closed:
+            try:
+                self.send(OP_CLOSE, struct.pack('!H', code))
+            except OSError:
+                pass
+            self.closed = True
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def connect(url, timeout=10.0):
+    """Buka koneksi WebSocket client ke ws:// atau wss:// url"""
+    parsed = urlparse(url)
+    secure = parsed.scheme == 'wss'
+    host = parsed.hostname
+    port = parsed.port or (443 if secure else 80)
+    path = parsed.path or '/'
+    if parsed.query:
+        path += '?' + parsed.query
+
+    sock = socket.create_connection((host, port), timeout=timeout)
+    try:
+        if secure:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=host)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        key = base64.b64encode(os.urandom(16)).decode()
+        request = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n"
+            "\r\n"
+        )
+        sock.sendall(request.encode('latin-1'))
+
+        rfile = sock.makefile('rb')
+        status_line, headers = read_http_headers(rfile)
+        if ' 101 ' not in f"{status_line} ":
+            raise WebSocketError(f"handshake failed: {status_line}")
+        if headers.get('sec-websocket-accept') != accept_key(key):
+            raise WebSocketError("handshake failed: invalid Sec-WebSocket-Accept")
+
+        return WebSocket(sock, rfile, is_client=True)
+    except Exception:
+        sock.close()
+        raise
+
+
+def accept(sock):
+    """Server side handshake untuk socket yang baru di-accept"""
+    rfile = sock.makefile('rb')
+    _, headers = read_http_headers(rfile)
+    key = headers.get('sec-websocket-key')
+    if not key or headers.get('upgrade', '').lower() != 'websocket':
+        sock.sendall(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+        raise WebSocketError("not a websocket upgrade request")
+
+    response = (
+        "HTTP/1.1 101 Switching Protocols\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept_key(key)}\r\n"
+        "\r\n"
+    )
+    sock.sendall(response.encode('latin-1'))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return WebSocket(sock, rfile, is_client=False)